@@ -21,8 +21,11 @@ feature_flags = flask_featureflags.FeatureFlag()
 csrf = CsrfProtect()
 
 
+from app import metrics, profiling
 from app.main.helpers.services import parse_document_upload_time
 from app.main.helpers.frameworks import question_references
+from app.main.helpers.templates import FragmentCacheExtension
+from app.main.helpers import throttling
 
 
 def create_app(config_name):
@@ -38,7 +41,7 @@ def create_app(config_name):
         login_manager=login_manager,
     )
 
-    from .main import main as main_blueprint
+    from .main import main as main_blueprint, content_loader
     from .status import status as status_blueprint
 
     application.register_blueprint(status_blueprint,
@@ -48,6 +51,10 @@ def create_app(config_name):
     login_manager.login_message_category = "must_login"
     main_blueprint.config = application.config.copy()
 
+    metrics.init_app(application, data_api_client=data_api_client, content_loader=content_loader)
+    profiling.init_app(application)
+    throttling.init_app(application)
+
     csrf.init_app(application)
 
     @csrf.error_handler
@@ -75,6 +82,7 @@ def create_app(config_name):
         session.permanent = True
         session.modified = True
 
+    application.jinja_env.add_extension(FragmentCacheExtension)
     application.add_template_filter(question_references)
     application.add_template_filter(parse_document_upload_time)
 
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Small in-process caches, one set per application.
+
+Each cache is a thread-safe LRU whose entries expire after a number of
+seconds. Caches are created on first use from the app config, so a cache
+called `search_index` takes its size and lifetime from
+DM_SEARCH_INDEX_CACHE_SIZE and DM_SEARCH_INDEX_CACHE_TTL. A size of 0 turns
+the cache off.
+
+Every process has its own caches, so anything cached here can be out of date
+by up to the TTL when the data is changed by another process.
+"""
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+
+from flask import current_app
+
+_MISSING = object()
+_create_lock = threading.Lock()
+
+
+class LRUCache(object):
+
+    def __init__(self, max_size, ttl=None, clock=default_timer):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires, value = entry
+            if expires is not None and expires <= self._clock():
+                return default
+            self._entries[key] = entry
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store `value`; `ttl` overrides the cache's lifetime for this entry."""
+        if not self.max_size:
+            return
+        ttl = ttl or self.ttl
+        expires = self._clock() + ttl if ttl else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_cache(name):
+    """The current app's cache called `name`, created if needed."""
+    caches = current_app.extensions.setdefault('caches', {})
+    cache = caches.get(name)
+    if cache is None:
+        with _create_lock:
+            cache = caches.get(name)
+            if cache is None:
+                prefix = 'DM_{}_CACHE_'.format(name.upper())
+                cache = caches[name] = LRUCache(
+                    current_app.config[prefix + 'SIZE'], current_app.config[prefix + 'TTL']
+                )
+    return cache
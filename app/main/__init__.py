@@ -1,6 +1,9 @@
-from flask import Blueprint
+from flask import Blueprint, current_app
 from dmutils.content_loader import ContentLoader
 
+from ..metrics import current_timings, server_timing_header
+from .helpers.content import get_brief_response_section, get_question_references
+
 main = Blueprint('main', __name__)
 
 content_loader = ContentLoader('app/content')
@@ -32,9 +35,22 @@ content_loader.load_manifest('inoket-2', 'services', 'edit_submission')
 content_loader.load_manifest('inoket-2', 'declaration', 'declaration')
 content_loader.load_messages('inoket-2', ['dates'])
 
+# Only declaration pages show question text with [[questionId]] references
+for framework_slug in ['g-cloud-7', 'digital-outcomes-and-specialists', 'g-cloud-8', 'inoket-1', 'inoket-2']:
+    get_question_references(content_loader, framework_slug, 'declaration')
+
+for lot_slug in ['digital-outcomes', 'digital-specialists', 'user-research-participants']:
+    get_brief_response_section(content_loader, 'digital-outcomes-and-specialists', lot_slug)
+
 @main.after_request
 def add_cache_control(response):
     response.cache_control.no_cache = True
+
+    timings = current_timings()
+    # A streamed body hasn't been rendered yet, so its timings aren't known
+    if timings is not None and current_app.config['DM_SERVER_TIMING_ENABLED'] and not response.is_streamed:
+        response.headers['Server-Timing'] = server_timing_header(timings)
+
     return response
 
 
@@ -1,5 +1,5 @@
 from flask.ext.wtf import Form
-from wtforms import PasswordField
+from wtforms import PasswordField, TextAreaField
 from wtforms.validators import DataRequired, Email, EqualTo, Length
 from dmutils.forms import StripWhitespaceStringField
 
@@ -21,6 +21,12 @@ class EmailAddressForm(Form):
     ])
 
 
+class BulkInviteForm(Form):
+    email_addresses = TextAreaField('Email addresses', validators=[
+        DataRequired(message="Email addresses must be provided")
+    ])
+
+
 class ChangePasswordForm(Form):
     password = PasswordField('Password', validators=[
         DataRequired(message="Please enter a new password"),
@@ -1,5 +1,5 @@
 from flask.ext.wtf import Form
-from wtforms import IntegerField, FieldList
+from wtforms import IntegerField, FieldList, TextAreaField
 from wtforms.validators import DataRequired, ValidationError, Length, Optional, Regexp, Email
 from dmutils.forms import StripWhitespaceStringField
 
@@ -54,6 +54,12 @@ class DunsNumberForm(Form):
     ])
 
 
+class DunsNumbersForm(Form):
+    duns_numbers = TextAreaField('DUNS numbers', validators=[
+        DataRequired(message="You must enter at least one DUNS number.")
+    ])
+
+
 class CompaniesHouseNumberForm(Form):
     companies_house_number = StripWhitespaceStringField('Companies house number', validators=[
         Optional(),
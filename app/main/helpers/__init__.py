@@ -3,7 +3,7 @@ import base64
 import flask_login
 import six
 from functools import wraps
-from flask import current_app, flash
+from flask import abort, current_app, flash, request
 from flask_login import current_user
 
 
@@ -23,3 +23,18 @@ def login_required(func):
             return current_app.login_manager.unauthorized()
         return func(*args, **kwargs)
     return decorated_view
+
+
+def support_required(func):
+    """For pages only support staff, with one of DM_SUPPORT_ROLES, can use."""
+    @wraps(func)
+    @flask_login.login_required
+    def decorated_view(*args, **kwargs):
+        if current_user.role not in current_app.config['DM_SUPPORT_ROLES']:
+            abort(403)
+        return func(*args, **kwargs)
+    return decorated_view
+
+
+def request_wants_json():
+    return request.accept_mimetypes.best == 'application/json'
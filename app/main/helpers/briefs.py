@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import copy
 import six
 import datetime
 
@@ -9,6 +10,10 @@ from flask_login import current_user
 from dmapiclient.audit import AuditTypes
 from cirrus.email import send_email
 
+from ...cache import get_cache
+from .concurrency import run_concurrently
+from .frameworks import get_framework_and_lot
+
 
 def get_brief(data_api_client, brief_id, allowed_statuses=None):
     if allowed_statuses is None:
@@ -31,6 +36,106 @@ def supplier_has_a_brief_response(data_api_client, supplier_id, brief_id):
     return len(brief_responses) != 0
 
 
+class BriefContext(object):
+    """A brief and what one supplier can do with it.
+
+    Eligibility, the supplier's responses and the brief's framework and lot
+    are fetched the first time they're asked for and kept with the brief, so
+    each step of responding to a brief doesn't repeat the same API calls.
+    """
+
+    def __init__(self, brief_id, supplier_id, brief):
+        self.brief_id = brief_id
+        self.supplier_id = supplier_id
+        self.brief = brief
+        self._values = {}
+
+    def _fetch(self, name, fetch):
+        if name not in self._values:
+            self._values[name] = fetch()
+        return self._values[name]
+
+    def is_loaded(self, name):
+        return name in self._values
+
+    def is_supplier_eligible(self, data_api_client):
+        return self._fetch('is_supplier_eligible', lambda: is_supplier_eligible_for_brief(
+            data_api_client, self.supplier_id, self.brief
+        ))
+
+    def brief_responses(self, data_api_client):
+        return self._fetch('brief_responses', lambda: data_api_client.find_brief_responses(
+            brief_id=self.brief_id, supplier_id=self.supplier_id
+        )['briefResponses'])
+
+    def has_brief_response(self, data_api_client):
+        return len(self.brief_responses(data_api_client)) != 0
+
+    def framework_and_lot(self, data_api_client):
+        return self._fetch('framework_and_lot', lambda: get_framework_and_lot(
+            data_api_client, self.brief['frameworkSlug'], self.brief['lotSlug'], allowed_statuses=['live']
+        ))
+
+
+def get_brief_context(data_api_client, brief_id, supplier_id, allowed_statuses=None, prefetch=(), fresh_brief=False):
+    """The `BriefContext` for a supplier and brief, from the cache if it's there.
+
+    The brief's status is checked on every call, like `get_brief`, but a
+    cached brief can be up to DM_BRIEF_CONTEXT_CACHE_TTL seconds old. Views
+    that act on the brief pass `fresh_brief=True`, so the brief is fetched
+    again and checks like its status and `clarificationQuestionsAreClosed`
+    use the current one.
+
+    After that, the supplier's eligibility and anything named in `prefetch`
+    (the names of other `BriefContext` methods) that isn't cached yet are
+    fetched at the same time.
+    """
+    cache = get_cache('brief_context')
+    context = cache.get((brief_id, supplier_id))
+    if context is None:
+        context = BriefContext(brief_id, supplier_id, data_api_client.get_brief(brief_id)['briefs'])
+        cache.set((brief_id, supplier_id), context)
+    elif fresh_brief:
+        context.brief = data_api_client.get_brief(brief_id)['briefs']
+
+    if allowed_statuses and context.brief['status'] not in allowed_statuses:
+        abort(404)
+
+    _prefetch(data_api_client, context, ['is_supplier_eligible'] + list(prefetch))
+
+    return context
+
+
+def _prefetch(data_api_client, context, names):
+    # Anything that fails isn't kept, so the view gets the error when it asks
+    # for it, at the same point it would have done without prefetching.
+    missing = [name for name in names if not context.is_loaded(name)]
+    if len(missing) > 1:
+        run_concurrently(lambda name: getattr(context, name)(data_api_client), missing, len(missing))
+
+
+def forget_brief_context(brief_id, supplier_id):
+    """Drop the cached `BriefContext` after the supplier has responded to the brief."""
+    get_cache('brief_context').delete((brief_id, supplier_id))
+
+
+def brief_response_section(section, brief):
+    """A copy of a shared brief response section with the brief's title and requirements.
+
+    Only the section and its `boolean_list` questions are copied, as they're
+    the only parts that change; every other question is still shared.
+    """
+    section = copy.copy(section)
+    section.questions = [
+        copy.copy(question) if question.get('type') == 'boolean_list' else question
+        for question in section.questions
+    ]
+    # replace generic 'Apply for opportunity' title with title including the name of the brief
+    section.name = u"Apply for ‘{}’".format(brief['title'])
+    section.inject_brief_questions_into_boolean_list_question(brief)
+    return section
+
+
 def send_brief_clarification_question(data_api_client, brief, clarification_question):
     # Email the question to brief owners
     email_body = render_template(
@@ -0,0 +1,48 @@
+import hashlib
+import json
+
+import six
+from flask import abort, current_app, make_response, request, session
+from flask_login import current_user
+
+
+def page_etag(*versions):
+    """An ETag for the current page, made from the versions of the data on it.
+
+    `versions` should change whenever the data shown changes, e.g. a
+    service's `updatedAt`. The page URL, the logged-in user, the session's
+    CSRF token (which is in the page's forms) and the app version are added
+    here, so the same ETag is never given for a different page.
+    """
+    identity = [
+        current_app.config['VERSION'],
+        request.full_path,
+        current_user.get_id(),
+        getattr(current_user, 'email_address', None),
+        getattr(current_user, 'supplier_name', None),
+        session.get('csrf_token'),
+    ]
+    return hashlib.sha1(
+        json.dumps([identity, versions], sort_keys=True, default=six.text_type).encode('utf-8')
+    ).hexdigest()
+
+
+def check_etag(etag):
+    """Stop with a 304 if the client already has the current page.
+
+    Views call this as soon as they know the page's ETag, before doing the
+    work of building the page. Pages with flash messages waiting to be shown
+    are always sent in full.
+    """
+    if request.method == 'GET' and request.if_none_match.contains(etag) and not session.get('_flashes'):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        abort(response)
+
+
+def etag_response(etag, rv):
+    """Make a response from a view's return value, with `etag` if it's a 200."""
+    response = make_response(rv)
+    if request.method == 'GET' and response.status_code == 200:
+        response.set_etag(etag)
+    return response
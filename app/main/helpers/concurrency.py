@@ -0,0 +1,44 @@
+import threading
+
+from flask import current_app
+
+from ...metrics import bind_timings, current_timings
+
+
+def run_concurrently(func, items, max_workers):
+    """Call `func` on each item using at most `max_workers` threads.
+
+    Returns a `(result, exception)` pair for each item, in the same order as
+    `items`; exceptions are caught so one failure doesn't stop the others.
+    Workers run inside an app context but not a request context, so `func`
+    mustn't use `request` or `current_user`.
+    """
+    items = list(items)
+    outcomes = [None] * len(items)
+    if not items:
+        return outcomes
+
+    app = current_app._get_current_object()
+    timings = current_timings()
+    pending = iter(enumerate(items))
+    lock = threading.Lock()
+
+    def worker():
+        with app.app_context(), bind_timings(timings):
+            while True:
+                with lock:
+                    position, item = next(pending, (None, None))
+                if position is None:
+                    return
+                try:
+                    outcomes[position] = (func(item), None)
+                except Exception as e:
+                    outcomes[position] = (None, e)
+
+    threads = [threading.Thread(target=worker) for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return outcomes
@@ -0,0 +1,151 @@
+import re
+import threading
+
+import six
+
+QUESTION_REFERENCE_RE = re.compile(r"\[\[([^\]]+)\]\]")  # anything that looks like [[nameOfQuestion]]
+
+_question_references = {}
+_question_references_lock = threading.Lock()
+_brief_response_sections = {}
+_brief_response_sections_lock = threading.Lock()
+
+
+def substitute_question_references(text, get_question):
+    return QUESTION_REFERENCE_RE.sub(
+        lambda question_id: str(get_question(question_id.group(1))['number']),
+        text
+    )
+
+
+def manifest_text(manifest):
+    """Every piece of text in a manifest that can be shown with a question."""
+    for section in manifest.sections:
+        yield getattr(section, 'description', None)
+        for question in all_questions(section.questions):
+            yield question.get('question')
+            yield question.get('hint')
+            for validation in question.get('validations') or []:
+                yield validation.get('message')
+
+
+def all_questions(questions):
+    """Each of `questions` followed by any questions nested in it."""
+    for question in questions:
+        yield question
+        for nested_question in all_questions(question.get('questions') or []):
+            yield nested_question
+
+
+class QuestionTable(object):
+    """Questions, their numbers and their section positions for a manifest.
+
+    `ContentManifest.get_question` searches every section, and a section's
+    first question number means counting the questions in all the sections
+    before it. This walks the manifest once so both are dictionary lookups.
+    """
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.question_ids = []
+        self.section_indexes = {}
+        self.section_offsets = []
+        self._questions = {}
+        self._section_positions = {}
+
+        for index, section in enumerate(manifest.sections):
+            self._section_positions[id(section)] = index
+            self.section_offsets.append(len(self.question_ids))
+            for question_id in section.get_question_ids():
+                self.question_ids.append(question_id)
+                self.section_indexes.setdefault(question_id, index)
+            for question in all_questions(section.questions):
+                self._questions.setdefault(question.get('id'), question)
+
+    def get_question(self, question_id):
+        question = self._questions.get(question_id)
+        if question is None:
+            return self.manifest.get_question(question_id)
+        return question
+
+    def number(self, question_id):
+        return self.get_question(question_id).get('number')
+
+    def first_question_index(self, section):
+        """How many questions there are in the sections before `section`."""
+        return self.section_offsets[self._section_positions[id(section)]]
+
+
+def get_question_table(manifest):
+    """The `QuestionTable` for a manifest, built the first time it's asked for.
+
+    Filtering a manifest makes a new one, which gets its own table.
+    """
+    table = getattr(manifest, '_question_table', None)
+    if table is None or table.manifest is not manifest:
+        table = QuestionTable(manifest)
+        manifest._question_table = table
+    return table
+
+
+class QuestionReferences(object):
+    """A manifest's text with `[[questionId]]` placeholders already replaced.
+
+    Content doesn't change while the app is running, so every placeholder in
+    the manifest is looked up once when this is built and templates only do
+    a dictionary lookup. Text that isn't from the manifest is substituted
+    when it's first seen and remembered after that.
+
+    Calling it looks up a question, like the manifest's `get_question`.
+    """
+
+    def __init__(self, manifest):
+        self.get_question = manifest.get_question
+        self._resolved = {}
+        for text in manifest_text(manifest):
+            if text and isinstance(text, six.string_types) and text not in self._resolved:
+                self._resolved[text] = substitute_question_references(text, self.get_question)
+
+    def __call__(self, question_id):
+        return self.get_question(question_id)
+
+    def resolve(self, text):
+        resolved = self._resolved.get(text)
+        if resolved is None:
+            resolved = self._resolved[text] = substitute_question_references(text, self.get_question)
+        return resolved
+
+    def __len__(self):
+        return len(self._resolved)
+
+
+def get_question_references(content_loader, framework_slug, manifest_name):
+    """The `QuestionReferences` for a manifest, built the first time it's asked for."""
+    key = (framework_slug, manifest_name)
+    references = _question_references.get(key)
+    if references is None:
+        with _question_references_lock:
+            references = _question_references.get(key)
+            if references is None:
+                references = _question_references[key] = QuestionReferences(
+                    content_loader.get_manifest(framework_slug, manifest_name)
+                )
+    return references
+
+
+def get_brief_response_section(content_loader, framework_slug, lot_slug):
+    """The section of a lot's `edit_brief_response` manifest that suppliers fill in.
+
+    Filtering the manifest copies every question in it, so it's done once for
+    each framework and lot. The section is shared: use
+    `briefs.brief_response_section` for a copy that can be changed.
+    """
+    key = (framework_slug, lot_slug)
+    section = _brief_response_sections.get(key)
+    if section is None:
+        with _brief_response_sections_lock:
+            section = _brief_response_sections.get(key)
+            if section is None:
+                content = content_loader.get_manifest(framework_slug, 'edit_brief_response').filter({'lot': lot_slug})
+                section = _brief_response_sections[key] = content.get_section(content.get_next_editable_section_id())
+    return section
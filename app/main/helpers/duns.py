@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Checking whether DUNS numbers already belong to a supplier.
+
+People registering a supplier go back and forth between the steps, so the
+same number is checked many times. Lookups are kept in the `duns_numbers`
+cache for DM_DUNS_NUMBERS_CACHE_TTL seconds.
+"""
+import re
+
+from dmapiclient import APIError
+from flask import current_app
+
+from ...cache import get_cache
+from .concurrency import run_concurrently
+
+DUNS_NUMBER_RE = re.compile(r'^\d{9}$')
+DUNS_NUMBER_SEPARATOR_RE = re.compile(r'[\s,;]+')
+
+
+def parse_duns_numbers(text):
+    """Split pasted DUNS numbers into `(valid, invalid)` lists, dropping repeats."""
+    valid, invalid, seen = [], [], set()
+    for duns_number in DUNS_NUMBER_SEPARATOR_RE.split(text or ''):
+        if not duns_number or duns_number in seen:
+            continue
+        seen.add(duns_number)
+        (valid if DUNS_NUMBER_RE.match(duns_number) else invalid).append(duns_number)
+    return valid, invalid
+
+
+def suppliers_with_duns_number(data_api_client, duns_number):
+    """The `id` and `name` of each supplier with this DUNS number."""
+    cache = get_cache('duns_numbers')
+    key = str(duns_number)
+    suppliers = cache.get(key)
+    if suppliers is None:
+        suppliers = tuple(
+            {'id': supplier.get('id'), 'name': supplier.get('name')}
+            for supplier in data_api_client.find_suppliers(duns_number=duns_number)['suppliers']
+        )
+        cache.set(key, suppliers)
+    return suppliers
+
+
+def duns_number_registered(duns_number, supplier):
+    """Remember that a new supplier has taken a DUNS number."""
+    cache = get_cache('duns_numbers')
+    key = str(duns_number)
+    others = tuple(other for other in cache.get(key, ()) if other['id'] != supplier.get('id'))
+    cache.set(key, others + ({'id': supplier.get('id'), 'name': supplier.get('name')},))
+
+
+def check_duns_numbers(data_api_client, duns_numbers):
+    """Look up a list of valid DUNS numbers, DM_DUNS_CHECK_MAX_WORKERS at a time.
+
+    Returns a result for each number, in the same order, with the suppliers
+    using it or the API's error message if it couldn't be looked up.
+    """
+    cache = get_cache('duns_numbers')
+    found = {duns_number: (cache.get(duns_number), None) for duns_number in duns_numbers}
+    missing = [duns_number for duns_number in duns_numbers if found[duns_number][0] is None]
+    found.update(zip(missing, run_concurrently(
+        lambda duns_number: suppliers_with_duns_number(data_api_client, duns_number),
+        missing,
+        current_app.config['DM_DUNS_CHECK_MAX_WORKERS']
+    )))
+
+    results = []
+    for duns_number in duns_numbers:
+        suppliers, error = found[duns_number]
+        if error is not None and not isinstance(error, APIError):
+            raise error
+        results.append({
+            'dunsNumber': duns_number,
+            'inUse': bool(suppliers),
+            'suppliers': list(suppliers or ()),
+            'error': error.message if error is not None else None,
+        })
+    return results
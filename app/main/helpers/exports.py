@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Exporting a supplier's drafts and declaration for a framework.
+
+An export is a pipeline of generators: drafts are summarised one at a time,
+each summary is written out as CSV, JSON or a ZIP entry, and the chunks are
+sent as soon as they're made. Only the draft list and declaration from the
+API are held in memory, never the export itself.
+
+The bytes of an export depend only on the drafts, the declaration and the
+format, so an export has a stable ETag and an interrupted download can carry
+on from where it stopped with a Range request.
+"""
+import csv
+import hashlib
+import json
+import zipfile
+from io import BytesIO
+
+import six
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'zip': 'application/zip',
+}
+
+CSV_HEADER = ['service_id', 'lot', 'status', 'section', 'question', 'answer']
+
+# ZIP entries normally carry the time they were written; a fixed time means
+# the same export always gives the same archive.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, default=six.text_type).encode('utf-8')
+
+
+def _text(value):
+    if value is None:
+        return u''
+    if isinstance(value, bool):
+        return u'Yes' if value else u'No'
+    if isinstance(value, (list, tuple)):
+        return u'\n'.join(_text(item) for item in value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return six.text_type(value)
+
+
+def _csv_row(values):
+    values = [_text(value) for value in values]
+    if six.PY2:
+        buffer = BytesIO()
+        csv.writer(buffer).writerow([value.encode('utf-8') for value in values])
+        return buffer.getvalue()
+    buffer = six.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode('utf-8')
+
+
+def serialize_summary(sections):
+    return [
+        {
+            'section': section.name,
+            'questions': [
+                {'id': question.id, 'question': question.label, 'answer': question.value}
+                for question in section.questions
+            ],
+        }
+        for section in sections
+    ]
+
+
+class _ZipStream(object):
+    """A write-only file for `ZipFile` that gives back whatever was written.
+
+    It can't seek, so `ZipFile` writes each entry in one pass.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(data)
+        self._position += len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class SubmissionExport(object):
+    """A supplier's drafts and declaration for one framework.
+
+    `version` is the app version. The exported file also depends on the
+    content and code, so it's part of the ETag and a deploy gives every
+    export a new one.
+    """
+
+    def __init__(self, content_loader, framework_slug, drafts, declaration, version=None):
+        self.content_loader = content_loader
+        self.version = version
+        self.framework_slug = framework_slug
+        self.drafts = sorted(drafts, key=lambda draft: (draft['lot'], draft['id']))
+        self.declaration = declaration
+
+    def etag(self, export_format):
+        return hashlib.sha1(_dumps(
+            [self.version, export_format, self.framework_slug, self.drafts, self.declaration]
+        )).hexdigest()
+
+    def declaration_summary(self):
+        if not self.declaration:
+            return []
+        content = self.content_loader.get_manifest(self.framework_slug, 'declaration')
+        return serialize_summary(content.summary(self.declaration))
+
+    def summaries(self):
+        """Each draft with its summary, made one draft at a time."""
+        manifest = self.content_loader.get_manifest(self.framework_slug, 'edit_submission')
+        for draft in self.drafts:
+            yield draft, serialize_summary(manifest.filter(draft).summary(draft))
+
+    def chunks(self, export_format):
+        return getattr(self, '_{}_chunks'.format(export_format))()
+
+    def _csv_chunks(self):
+        yield _csv_row(CSV_HEADER)
+        for section in self.declaration_summary():
+            for question in section['questions']:
+                yield _csv_row(['', '', '', section['section'], question['question'], question['answer']])
+        for draft, summary in self.summaries():
+            yield b''.join(
+                _csv_row([draft['id'], draft['lot'], draft['status'],
+                          section['section'], question['question'], question['answer']])
+                for section in summary for question in section['questions']
+            )
+
+    def _json_chunks(self):
+        yield b'{"declaration": ' + _dumps({
+            'answers': self.declaration,
+            'summary': self.declaration_summary(),
+        }) + b', "framework": ' + _dumps(self.framework_slug) + b', "services": ['
+        for position, (draft, summary) in enumerate(self.summaries()):
+            yield (b', ' if position else b'') + _dumps({'service': draft, 'summary': summary})
+        yield b']}'
+
+    def _zip_chunks(self):
+        stream = _ZipStream()
+        archive = zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED)
+
+        def add(filename, value):
+            entry = zipfile.ZipInfo(filename, date_time=ZIP_DATE_TIME)
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            entry.external_attr = 0o644 << 16
+            archive.writestr(entry, _dumps(value))
+            return stream.drain()
+
+        yield add('declaration.json', {'answers': self.declaration, 'summary': self.declaration_summary()})
+        for draft, summary in self.summaries():
+            yield add('services/{}/{}.json'.format(draft['lot'], draft['id']), {'service': draft, 'summary': summary})
+        archive.close()
+        yield stream.drain()
+
+
+def content_length(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def byte_range(chunks, start, stop):
+    """The bytes from `start` up to (not including) `stop` of a stream of chunks."""
+    position = 0
+    for chunk in chunks:
+        end = position + len(chunk)
+        if end > start:
+            yield chunk[max(start - position, 0):stop - position]
+        position = end
+        if position >= stop:
+            return
@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 from dmutils.documents import get_agreement_document_path, COUNTERSIGNED_AGREEMENT_FILENAME
-import re
 
 from flask import abort
 from flask_login import current_user
 from dmapiclient import APIError
 from dmutils import s3
 
+from .content import QuestionReferences, get_question_table, substitute_question_references
+
 
 def get_framework(client, framework_slug, allowed_statuses=None):
     if allowed_statuses is None:
@@ -59,11 +60,7 @@ def get_last_modified_from_first_matching_file(key_list, framework_slug, prefix)
 
 
 def get_first_question_index(content, section):
-    questions_so_far = 0
-    ind = content.sections.index(section)
-    for i in range(0, ind):
-        questions_so_far += len(content.sections[i].get_question_ids())
-    return questions_so_far
+    return get_question_table(content).first_question_index(section)
 
 
 def get_declaration_status(data_api_client, framework_slug):
@@ -112,11 +109,9 @@ def get_supplier_on_framework_from_info(supplier_framework_info):
 def question_references(data, get_question):
     if not data:
         return data
-    return re.sub(
-        r"\[\[([^\]]+)\]\]",  # anything that looks like [[nameOfQuestion]]
-        lambda question_id: str(get_question(question_id.group(1))['number']),
-        data
-    )
+    if isinstance(get_question, QuestionReferences):
+        return get_question.resolve(data)
+    return substitute_question_references(data, get_question)
 
 
 def get_frameworks_by_status(frameworks, status, extra_condition=False):
@@ -127,12 +122,6 @@ def get_frameworks_by_status(frameworks, status, extra_condition=False):
     ]
 
 
-def count_drafts_by_lot(drafts, lot):
-    return len([
-        draft for draft in drafts if draft['lot'] == lot
-    ])
-
-
 def get_statuses_for_lot(
     has_one_service_limit,
     drafts_count,
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""Importing draft services from a CSV or JSON file.
+
+Each row is one service: keys are the form field names from the lot's
+`edit_submission` manifest, and a row with an `id` updates that draft
+instead of creating a new one. In CSV files, answers to list and checkbox
+questions go one per line within the cell.
+
+Rows are read and checked one at a time. If every row is valid the API calls
+are made by a background thread, and the `ImportJob` records the outcome for
+each row as it goes.
+
+Jobs are kept in the `import_jobs` cache of the process that started them.
+Progress can only be read from that process: polling the job's URL on
+another worker gives a 404, so the import pages need sticky sessions when
+the app runs as several processes.
+"""
+import codecs
+import csv
+import json
+import re
+import threading
+import uuid
+
+import six
+from flask import current_app
+from werkzeug.datastructures import MultiDict
+
+from dmapiclient import HTTPError
+
+from ...cache import get_cache
+from .concurrency import run_concurrently
+from .content import all_questions
+
+BOOLEAN_VALUES = {'true': 'true', 'yes': 'true', 'false': 'false', 'no': 'false'}
+MULTIPLE_VALUE_TYPES = ('list', 'checkboxes')
+NOT_IMPORTABLE_TYPES = ('upload',)
+
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_DECODER = json.JSONDecoder()
+JSON_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+DEFAULT_MESSAGES = {
+    'answer_required': 'You need to answer this question.',
+    'unknown_field': "This isn't a question for this lot.",
+    'not_importable': "Documents can't be imported. Upload them after the import has finished.",
+    'invalid_choice': "This answer isn't one of the options for this question.",
+    'invalid_boolean': 'This answer must be yes or no.',
+    'invalid_number': 'This answer must be a number.',
+    'draft_not_found': "You don't have a draft service with this ID in this lot.",
+    'too_many_rows': "Files can't have more than {} services.",
+    'invalid_file': "This file can't be read.",
+}
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def read_csv(stream):
+    if six.PY2:
+        rows = csv.DictReader(stream)
+    else:
+        rows = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+
+    try:
+        for row in rows:
+            yield dict(
+                (_text(key).lstrip(u'\ufeff'), _text(value))
+                for key, value in row.items() if key is not None and value not in (None, '')
+            )
+    except (csv.Error, UnicodeDecodeError):
+        raise ImportFileError('invalid_file')
+
+
+def read_json(stream):
+    """Rows from a JSON list of objects, decoded one at a time.
+
+    The file is read JSON_CHUNK_SIZE bytes at a time, so when reading stops
+    after the row limit the rest of the file is never loaded.
+    """
+    try:
+        for row in _json_list_items(_json_chunks(stream)):
+            yield dict((key, value) for key, value in row.items() if value not in (None, '', []))
+    except (ValueError, UnicodeDecodeError):
+        raise ImportFileError('invalid_file')
+
+
+def _json_chunks(stream):
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    while True:
+        chunk = stream.read(JSON_CHUNK_SIZE)
+        yield decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            return
+
+
+def _json_list_items(chunks):
+    # Each item must be an object, and a complete object can't be the start
+    # of a longer value, so an item is known to be whole as soon as it can
+    # be decoded.
+    buffer, position, state = u'', 0, '['
+    for chunk in chunks:
+        buffer, position = buffer[position:] + chunk, 0
+        while True:
+            position = JSON_WHITESPACE_RE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if state == '[':
+                if buffer[position] != '[':
+                    raise ValueError('Not a list')
+                position, state = position + 1, 'first item'
+            elif state == 'first item' and buffer[position] == ']':
+                position, state = position + 1, 'end'
+            elif state in ('first item', 'item'):
+                if buffer[position] != '{':
+                    raise ValueError('Not an object')
+                try:
+                    item, position = JSON_DECODER.raw_decode(buffer, position)
+                except ValueError:
+                    break  # Not all read yet
+                state = 'separator'
+                yield item
+            elif state == 'separator' and buffer[position] in ',]':
+                position, state = position + 1, 'item' if buffer[position] == ',' else 'end'
+            else:
+                raise ValueError('Unexpected {!r}'.format(buffer[position]))
+    if state != 'end':
+        raise ValueError('Incomplete list')
+
+
+def read_rows(file_storage):
+    """Rows from an uploaded `.csv` or `.json` file, one at a time."""
+    filename = (file_storage.filename or '').lower()
+    if filename.endswith('.csv'):
+        return read_csv(file_storage.stream)
+    if filename.endswith('.json'):
+        return read_json(file_storage.stream)
+    raise ImportFileError('invalid_file')
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def _form_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return u'{}'.format(value).strip()
+
+
+class RowValidator(object):
+    """Checks import rows against a lot's `edit_submission` manifest."""
+
+    def __init__(self, content, draft_ids):
+        self.content = content
+        self.draft_ids = set(str(draft_id) for draft_id in draft_ids)
+        self.questions = {}
+        for section in content.sections:
+            for question in section.questions:
+                # A multiquestion's fields are checked against the nested
+                # question each one is for
+                nested_questions = dict((nested.get('id'), nested) for nested in all_questions([question]))
+                for field in question.form_fields:
+                    self.questions[field] = nested_questions.get(field, question)
+        self.required_to_create = 'serviceName' in self.questions
+
+    def error(self, field, message_key):
+        question = self.questions.get(field)
+        message = None
+        if question is not None:
+            for validation in question.get('validations', []):
+                if validation['name'] == message_key:
+                    message = validation['message']
+        return {
+            'input_name': field,
+            'question': question.get('question') if question is not None else field,
+            'message': message or DEFAULT_MESSAGES.get(
+                message_key, 'There was a problem with the answer to this question'),
+        }
+
+    def field_errors(self, field, values):
+        question = self.questions.get(field)
+        if question is None:
+            return 'unknown_field'
+        question_type = question.get('type')
+        if question_type in NOT_IMPORTABLE_TYPES:
+            return 'not_importable'
+        if question_type == 'boolean' and any(value.lower() not in BOOLEAN_VALUES for value in values):
+            return 'invalid_boolean'
+        if question_type in ('number', 'percentage'):
+            try:
+                [float(value) for value in values]
+            except ValueError:
+                return 'invalid_number'
+        options = question.get('options') or []
+        if question_type in ('radios', 'checkboxes') and options:
+            allowed = set(option.get('value', option.get('label')) for option in options)
+            if any(value not in allowed for value in values):
+                return 'invalid_choice'
+
+    def validate(self, row):
+        """Return `(draft_id, data, errors)` for a row.
+
+        `data` is in the same format as answers submitted through the forms,
+        so it can be sent straight to the API.
+        """
+        row = dict(row)
+        draft_id = row.pop('id', None)
+        draft_id = _form_value(draft_id) if draft_id is not None else None
+        errors = []
+        form = MultiDict()
+
+        if draft_id is not None and draft_id not in self.draft_ids:
+            errors.append(self.error('id', 'draft_not_found'))
+
+        for field, value in sorted(row.items()):
+            question_type = self.questions.get(field, {}).get('type')
+            if isinstance(value, list):
+                values = [_form_value(item) for item in value]
+            elif question_type in MULTIPLE_VALUE_TYPES:
+                values = [item.strip() for item in _form_value(value).split(u'\n')]
+            else:
+                values = [_form_value(value)]
+            values = [item for item in values if item]
+            if question_type == 'boolean':
+                values = [BOOLEAN_VALUES.get(item.lower(), item) for item in values]
+            error = self.field_errors(field, values)
+            if error:
+                errors.append(self.error(field, error))
+            else:
+                form.setlist(field, values)
+
+        if draft_id is None and self.required_to_create and not form.get('serviceName'):
+            errors.append(self.error('serviceName', 'answer_required'))
+
+        data = {}
+        for section in self.content.sections:
+            if section.get_field_names() and any(field in form for field in section.get_field_names()):
+                data.update(section.get_data(form))
+        data = dict((key, value) for key, value in data.items() if key in form)
+
+        return draft_id, data, errors
+
+
+class ImportJob(object):
+    """The progress and per-row outcome of an import."""
+
+    PENDING, RUNNING, FINISHED = 'pending', 'running', 'finished'
+
+    def __init__(self, supplier_id, framework_slug, lot_slug, rows):
+        self.id = uuid.uuid4().hex
+        self.supplier_id = supplier_id
+        self.framework_slug = framework_slug
+        self.lot_slug = lot_slug
+        self.rows = rows
+        self.status = self.PENDING
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def record(self, row_number, draft_id=None, errors=None):
+        with self._lock:
+            self.results[row_number] = {'row': row_number, 'id': draft_id, 'errors': errors or []}
+
+    def serialize(self):
+        with self._lock:
+            results = [self.results[row_number] for row_number in sorted(self.results)]
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': len(self.rows),
+            'processed': len(results),
+            'succeeded': len([result for result in results if not result['errors']]),
+            'results': results,
+        }
+
+
+def validate_rows(validator, rows, max_rows):
+    """Check every row, returning `(valid_rows, row_errors)`.
+
+    `valid_rows` is a list of `(row_number, draft_id, data)`; row numbers
+    start at 1 for the first service in the file. Reading stops after
+    `max_rows`, and the errors found so far are returned with one saying the
+    file is too long.
+    """
+    valid_rows, row_errors = [], []
+    for row_number, row in enumerate(rows, start=1):
+        if row_number > max_rows:
+            return valid_rows, row_errors + [{'row': row_number, 'errors': [{
+                'input_name': None, 'question': None,
+                'message': DEFAULT_MESSAGES['too_many_rows'].format(max_rows),
+            }]}]
+        draft_id, data, errors = validator.validate(row)
+        if errors:
+            row_errors.append({'row': row_number, 'errors': errors})
+        else:
+            valid_rows.append((row_number, draft_id, data))
+    return valid_rows, row_errors
+
+
+def get_import_job(job_id):
+    return get_cache('import_jobs').get(job_id)
+
+
+def start_import_job(apiclient, validator, job, user):
+    """Make the API calls for `job` on a background thread."""
+    get_cache('import_jobs').set(job.id, job)
+    app = current_app._get_current_object()
+
+    def import_row(row):
+        row_number, draft_id, data = row
+        try:
+            if draft_id is None:
+                draft_id = apiclient.create_new_draft_service(
+                    job.framework_slug, job.lot_slug, job.supplier_id, data, user, page_questions=list(data)
+                )['services']['id']
+            else:
+                apiclient.update_draft_service(draft_id, data, user, page_questions=list(data))
+        except HTTPError as e:
+            if isinstance(e.message, dict):
+                errors = [validator.error(field, message_key) for field, message_key in sorted(e.message.items())]
+            else:
+                errors = [{'input_name': None, 'question': None, 'message': e.message}]
+            job.record(row_number, draft_id, errors)
+        else:
+            job.record(row_number, draft_id)
+
+    def run():
+        with app.app_context():
+            job.status = job.RUNNING
+            try:
+                outcomes = run_concurrently(import_row, job.rows, app.config['DM_IMPORT_MAX_WORKERS'])
+                for (row_number, draft_id, _), (_, error) in zip(job.rows, outcomes):
+                    if error is not None:
+                        app.logger.error(
+                            "Draft service import failed. error={error} job_id={job_id} row={row}",
+                            extra={'error': six.text_type(error), 'job_id': job.id, 'row': row_number})
+                        job.record(row_number, draft_id, [{
+                            'input_name': None, 'question': None,
+                            'message': 'There was a problem importing this service.',
+                        }])
+            finally:
+                # The supplier's search index has missed these changes
+                get_cache('search_index').delete(job.supplier_id)
+                job.status = job.FINISHED
+
+    thread = threading.Thread(target=run, name='import-{}'.format(job.id))
+    thread.daemon = True
+    thread.start()
+    return thread
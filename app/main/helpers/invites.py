@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Inviting several people to become contributors at once."""
+import re
+
+import six
+from dmutils.email import generate_token
+from flask import current_app, render_template, url_for
+
+from cirrus.email import send_email
+
+from . import hash_email
+from .concurrency import run_concurrently
+from .text import is_email_address
+
+EMAIL_ADDRESS_SEPARATOR_RE = re.compile(r'[\s,;]+')
+
+# Stands in for each recipient's own link while the email is rendered
+URL_PLACEHOLDER = 'INVITE-URL-PLACEHOLDER'
+
+
+def parse_email_addresses(text):
+    """Split pasted email addresses into `(valid, invalid)` lists.
+
+    Addresses can be separated by new lines, spaces, commas or semicolons.
+    Repeats are dropped, ignoring case.
+    """
+    valid, invalid, seen = [], [], set()
+    for email_address in EMAIL_ADDRESS_SEPARATOR_RE.split(text or ''):
+        if not email_address or email_address.lower() in seen:
+            continue
+        seen.add(email_address.lower())
+        (valid if is_email_address(email_address) else invalid).append(email_address)
+    return valid, invalid
+
+
+def _invite_url(supplier_id, supplier_name, email_address):
+    token = generate_token(
+        {
+            "supplier_id": supplier_id,
+            "supplier_name": supplier_name,
+            "email_address": email_address
+        },
+        current_app.config['SHARED_EMAIL_KEY'],
+        current_app.config['INVITE_EMAIL_SALT']
+    )
+    return url_for('main.create_user', encoded_token=token, _external=True)
+
+
+def send_invites(user_name, supplier_id, supplier_name, email_addresses):
+    """Email an invitation to each address, returning the addresses that failed.
+
+    The email is rendered once and each recipient's link put into it, then
+    the emails are sent DM_BULK_INVITE_MAX_WORKERS at a time.
+    """
+    email_body = render_template(
+        "emails/invite_user_email.html",
+        url=URL_PLACEHOLDER,
+        user=user_name,
+        supplier=supplier_name)
+    invites = [
+        (email_address, email_body.replace(URL_PLACEHOLDER, _invite_url(supplier_id, supplier_name, email_address)))
+        for email_address in email_addresses
+    ]
+
+    def send(invite):
+        email_address, body = invite
+        send_email(
+            email_address,
+            body,
+            current_app.config['INVITE_EMAIL_SUBJECT'],
+            current_app.config['INVITE_EMAIL_FROM'],
+            current_app.config['INVITE_EMAIL_NAME'],
+            ["user-invite"]
+        )
+
+    failed = []
+    outcomes = run_concurrently(send, invites, current_app.config['DM_BULK_INVITE_MAX_WORKERS'])
+    for (email_address, _), (_, error) in zip(invites, outcomes):
+        if error is not None:
+            current_app.logger.error(
+                "Invitation email failed to send. "
+                "error {error} supplier_id {supplier_id} email_hash {email_hash}",
+                extra={'error': six.text_type(error),
+                       'supplier_id': supplier_id,
+                       'email_hash': hash_email(email_address)})
+            failed.append(email_address)
+    return failed
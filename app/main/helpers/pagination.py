@@ -0,0 +1,25 @@
+from flask import abort, request
+
+
+def get_page():
+    """The `page` query argument, or 404 if it isn't a page number."""
+    try:
+        page = int(request.args.get('page', 1))
+    except ValueError:
+        abort(404)
+    if page < 1:
+        abort(404)
+    return page
+
+
+def paginate(items, page, per_page):
+    """The items on `page`, and whether there's another page after it."""
+    start = (page - 1) * per_page
+    return items[start:start + per_page], len(items) > start + per_page
+
+
+def pagination_links(page, has_next):
+    return {
+        'prev': page - 1 if page > 1 else None,
+        'next': page + 1 if has_next else None,
+    }
@@ -0,0 +1,176 @@
+import re
+import threading
+from bisect import bisect_left
+
+from flask_login import current_user
+
+from ...cache import get_cache
+
+SERVICE = 'service'
+DRAFT = 'draft'
+
+INDEXED_FIELDS = [
+    'id', 'serviceName', 'serviceSummary', 'serviceTypes', 'lot', 'lotName', 'frameworkSlug', 'frameworkName',
+    'status',
+]
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def document_tokens(document):
+    tokens = set()
+    for field in INDEXED_FIELDS:
+        value = document.get(field)
+        if value is None:
+            continue
+        for item in (value if isinstance(value, list) else [value]):
+            tokens.update(tokenize(u'{}'.format(item)))
+    return tokens
+
+
+class SearchIndex(object):
+    """An inverted index over one supplier's services and drafts.
+
+    Documents are keyed by (kind, id). Every word in a query has to match the
+    start of a word in one of the indexed fields, so "clo host" finds
+    "Cloud hosting".
+    """
+
+    def __init__(self, services=(), drafts=()):
+        self._documents = {}
+        self._sort_keys = {}
+        self._tokens = {}
+        self._postings = {}
+        self._vocabulary = None
+        self._lock = threading.Lock()
+
+        for service in services:
+            self._add(SERVICE, service)
+        for draft in drafts:
+            self._add(DRAFT, draft)
+
+    def _add(self, kind, document):
+        key = (kind, str(document['id']))
+        self._remove(key)
+        tokens = document_tokens(document)
+        self._documents[key] = document
+        self._sort_keys[key] = ((document.get('serviceName') or document.get('lotName') or u'').lower(), key)
+        self._tokens[key] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(key)
+        self._vocabulary = None
+
+    def _remove(self, key):
+        self._documents.pop(key, None)
+        self._sort_keys.pop(key, None)
+        for token in self._tokens.pop(key, ()):
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+
+    def add(self, kind, document):
+        with self._lock:
+            self._add(kind, dict(document))
+
+    def update(self, kind, document_id, changes):
+        """Apply a partial update; documents that aren't indexed are ignored."""
+        with self._lock:
+            document = self._documents.get((kind, str(document_id)))
+            if document is not None:
+                self._add(kind, dict(document, **changes))
+
+    def remove(self, kind, document_id):
+        with self._lock:
+            self._remove((kind, str(document_id)))
+
+    def _matching(self, term):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        keys = set()
+        for position in range(bisect_left(self._vocabulary, term), len(self._vocabulary)):
+            token = self._vocabulary[position]
+            if not token.startswith(term):
+                break
+            keys.update(self._postings[token])
+        return keys
+
+    def search(self, query, kind=None, framework=None, lot=None):
+        """Matching documents as (kind, document) pairs, ordered by name.
+
+        An empty query matches everything, so this also filters by kind,
+        framework and lot.
+        """
+        with self._lock:
+            terms = sorted(set(tokenize(query or u'')), key=len, reverse=True)
+            if terms:
+                keys = self._matching(terms[0])
+                for term in terms[1:]:
+                    if not keys:
+                        break
+                    keys &= self._matching(term)
+            else:
+                keys = set(self._documents)
+
+            documents = self._documents
+            keys = [
+                key for key in keys
+                if (kind is None or key[0] == kind) and
+                (framework is None or documents[key].get('frameworkSlug') == framework) and
+                (lot is None or documents[key].get('lot') == lot)
+            ]
+            return [(key[0], documents[key]) for key in sorted(keys, key=self._sort_keys.__getitem__)]
+
+    def __len__(self):
+        return len(self._documents)
+
+
+def find_all_services(apiclient, supplier_id):
+    services, page = [], 1
+    while True:
+        response = apiclient.find_services(supplier_id=supplier_id, page=page)
+        services.extend(response['services'])
+        if 'next' not in response.get('links', {}):
+            return services
+        page += 1
+
+
+def get_search_index(apiclient):
+    """The current supplier's search index, built from the API if it isn't cached."""
+    cache = get_cache('search_index')
+    index = cache.get(current_user.supplier_id)
+    if index is None:
+        index = SearchIndex(
+            find_all_services(apiclient, current_user.supplier_id),
+            apiclient.find_draft_services(current_user.supplier_id)['services'],
+        )
+        cache.set(current_user.supplier_id, index)
+    return index
+
+
+def _cached_search_index():
+    return get_cache('search_index').get(current_user.supplier_id)
+
+
+def index_added(kind, document):
+    """Keep the current supplier's search index (if there is one) up to date."""
+    index = _cached_search_index()
+    if index is not None:
+        index.add(kind, document)
+
+
+def index_updated(kind, document_id, changes):
+    index = _cached_search_index()
+    if index is not None:
+        index.update(kind, document_id, changes)
+
+
+def index_removed(kind, document_id):
+    index = _cached_search_index()
+    if index is not None:
+        index.remove(kind, document_id)
@@ -11,7 +11,39 @@ except ImportError:
     import urllib.parse as urlparse
 
 
-def get_drafts(apiclient, framework_slug):
+class DraftIndex(object):
+    """A supplier's drafts for a framework, grouped by status and lot.
+
+    Built in a single pass over the drafts, so views can look up the drafts
+    (or the number of drafts) for any status and lot without scanning the
+    whole list again. Drafts keep the order the API returned them in.
+    """
+    DRAFT = 'not-submitted'
+    COMPLETE = 'submitted'
+
+    def __init__(self, drafts):
+        self._by_status = {self.DRAFT: [], self.COMPLETE: []}
+        self._by_status_and_lot = {}
+        for draft in drafts:
+            self._by_status.setdefault(draft['status'], []).append(draft)
+            self._by_status_and_lot.setdefault((draft['status'], draft['lot']), []).append(draft)
+
+    def get(self, status, lot=None):
+        if lot is None:
+            return self._by_status.get(status, [])
+        return self._by_status_and_lot.get((status, lot), [])
+
+    def drafts(self, lot=None):
+        return self.get(self.DRAFT, lot)
+
+    def complete_drafts(self, lot=None):
+        return self.get(self.COMPLETE, lot)
+
+    def count(self, status, lot=None):
+        return len(self.get(status, lot))
+
+
+def get_draft_index(apiclient, framework_slug):
     try:
         drafts = apiclient.find_draft_services(
             current_user.supplier_id,
@@ -21,18 +53,7 @@ def get_drafts(apiclient, framework_slug):
     except APIError as e:
         abort(e.status_code)
 
-    complete_drafts = [draft for draft in drafts if draft['status'] == 'submitted']
-    drafts = [draft for draft in drafts if draft['status'] == 'not-submitted']
-
-    return drafts, complete_drafts
-
-
-def get_lot_drafts(apiclient, framework_slug, lot_slug):
-    drafts, complete_drafts = get_drafts(apiclient, framework_slug)
-    return (
-        [draft for draft in drafts if draft['lot'] == lot_slug],
-        [draft for draft in complete_drafts if draft['lot'] == lot_slug]
-    )
+    return DraftIndex(drafts)
 
 
 def count_unanswered_questions(service_attributes):
@@ -0,0 +1,92 @@
+import hashlib
+import json
+
+import six
+from flask import current_app, get_flashed_messages, Response, stream_with_context
+from jinja2 import nodes, Undefined
+from jinja2.ext import Extension
+
+from ...cache import get_cache
+from ...metrics import timer
+
+
+def stream_template(template_name, **context):
+    """Render a template in chunks as the response body is sent.
+
+    Flask 0.10 has no `stream_template`, so this does the same thing: the
+    first chunk goes out as soon as the top of the page is rendered, and long
+    lists are never held in memory as one string.
+
+    Rendering each chunk is timed as `render`, so it still reaches the
+    request's metrics when the stream closes. The Server-Timing header goes
+    out before the body, so streamed responses don't get one.
+    """
+    app = current_app._get_current_object()
+    app.update_template_context(context)
+
+    # The session cookie is written before the body is streamed, so flashed
+    # messages have to be taken out of the session now or they'd show again
+    # on the next page. The template still gets them from the request context.
+    get_flashed_messages()
+
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(current_app.config['DM_TEMPLATE_STREAM_BUFFER'])
+
+    return Response(stream_with_context(_timed_chunks(stream)))
+
+
+def _timed_chunks(stream):
+    chunks = iter(stream)
+    while True:
+        with timer('render'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def fragment_key(key):
+    """The cache key for a template fragment.
+
+    The app version is part of every key, so fragments rendered from older
+    templates or content aren't used after a deploy.
+    """
+    return hashlib.sha1(
+        json.dumps([current_app.config['VERSION'], key], sort_keys=True, default=six.text_type).encode('utf-8')
+    ).hexdigest()
+
+
+class FragmentCacheExtension(Extension):
+    """Adds `{% cache key, ttl %}...{% endcache %}` to templates.
+
+    The rendered block is kept in the `template_fragments` cache for `ttl`
+    seconds (or the cache's TTL if it's left out). The key should contain
+    the IDs and versions (e.g. `updatedAt`) of everything the block shows; a
+    key that's `none` or undefined renders the block without caching it. Blocks mustn't
+    contain anything that's different for each user or session, like CSRF
+    tokens, unless that's part of the key.
+    """
+    tags = set(['cache'])
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache', args), [], [], body).set_lineno(lineno)
+
+    def _cache(self, key, ttl, caller):
+        if key is None or isinstance(key, Undefined):
+            return caller()
+
+        cache = get_cache('template_fragments')
+        key = fragment_key(key)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment, ttl)
+        return fragment
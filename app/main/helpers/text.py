@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Limits on free-text answers.
+
+Each check looks at every character at most once, however the text is made
+up, so a long answer can't make a check take much longer than a short one.
+"""
+import itertools
+import re
+
+import six
+
+WORD_RE = re.compile(r'\S+', re.UNICODE)
+NOT_IN_EMAIL_ADDRESS_RE = re.compile(r'[@^\s]', re.UNICODE)
+
+
+def count_words(text, stop_after=None):
+    """The number of words in `text`, or `stop_after` + 1 if there are more than that."""
+    words = WORD_RE.finditer(text)
+    if stop_after is not None:
+        words = itertools.islice(words, stop_after + 1)
+    return sum(1 for _ in words)
+
+
+def over_character_limit(text, limit):
+    return limit is not None and len(text or '') > limit
+
+
+def over_word_limit(text, limit):
+    return limit is not None and count_words(text or '', stop_after=limit) > limit
+
+
+def is_email_address(value):
+    """Whether `value` looks like `name@example.com`.
+
+    Needs something before the `@` and at least two dot-separated parts
+    after it, with no spaces, `^` or other `@` anywhere.
+    """
+    if not isinstance(value, six.string_types):
+        return False
+    local_part, _, domain = value.partition('@')
+    labels = domain.split('.')
+    return (
+        bool(local_part) and len(labels) > 1 and all(labels) and
+        NOT_IN_EMAIL_ADDRESS_RE.search(local_part) is None and
+        NOT_IN_EMAIL_ADDRESS_RE.search(domain) is None
+    )
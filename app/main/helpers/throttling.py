@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Stopping the same form being acted on twice, and limiting how often it can be.
+
+Where submissions and rate limits are kept is picked with DM_THROTTLING_STORE:
+
+* `cache` keeps them in the app's in-process caches, so each process has its
+  own. With several workers, a repeat submission that lands on another
+  worker isn't caught, and a supplier gets each rate limit once per worker.
+* `sqlite` keeps them in the SQLite database at DM_THROTTLING_STORE_PATH.
+  Every process on a host can share a database file, so the limits hold
+  across workers, but hosts can't share one with each other. The path must
+  be absolute (or `:memory:` for tests), so workers started from different
+  directories still use the same file.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from timeit import default_timer
+
+import six
+from flask import abort, current_app
+
+from ...cache import get_cache
+
+_create_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """Allows bursts of up to `capacity` actions, refilled at `rate` a second."""
+
+    def __init__(self, capacity, rate, clock=default_timer):
+        self.capacity = capacity
+        self.rate = rate
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Use up a token, returning False if there aren't any left."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CacheThrottlingStore(object):
+    """Keeps submissions and rate limits in this process's caches."""
+
+    def __init__(self, app):
+        self._submissions_lock = threading.Lock()
+        self._rate_limits_lock = threading.Lock()
+
+    def claim(self, key):
+        """Remember `key`, returning False if it was already remembered."""
+        cache = get_cache('submissions')
+        with self._submissions_lock:
+            if cache.get(key) is not None:
+                return False
+            cache.set(key, True)
+            return True
+
+    def release(self, key):
+        get_cache('submissions').delete(key)
+
+    def take(self, key, capacity, rate):
+        """Use up a token from the bucket for `key`, returning False if there aren't any left."""
+        cache = get_cache('rate_limits')
+        with self._rate_limits_lock:
+            bucket = cache.get(key)
+            if bucket is None:
+                bucket = TokenBucket(capacity, rate)
+            # Setting it again keeps a bucket that's in use from expiring
+            cache.set(key, bucket)
+        return bucket.take()
+
+
+class SQLiteThrottlingStore(object):
+    """Keeps submissions and rate limits in SQLite, shared by every process using the file.
+
+    Each check runs in its own `BEGIN IMMEDIATE` transaction, so two
+    processes can't both claim a submission or take the last token.
+    """
+
+    def __init__(self, app, clock=time.time):
+        self.submissions_ttl = app.config['DM_SUBMISSIONS_CACHE_TTL']
+        self.rate_limits_ttl = app.config['DM_RATE_LIMITS_CACHE_TTL']
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            app.config['DM_THROTTLING_STORE_PATH'], check_same_thread=False, isolation_level=None
+        )
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS submissions (key TEXT PRIMARY KEY, expires REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def claim(self, key):
+        """Remember `key`, returning False if it was already remembered."""
+        now = self._clock()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM submissions WHERE expires <= ?", (now,))
+            return connection.execute(
+                "INSERT OR IGNORE INTO submissions (key, expires) VALUES (?, ?)",
+                (key, now + self.submissions_ttl)
+            ).rowcount == 1
+
+    def release(self, key):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM submissions WHERE key = ?", (key,))
+
+    def take(self, key, capacity, rate):
+        """Use up a token from the bucket for `key`, returning False if there aren't any left."""
+        now = self._clock()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM rate_limits WHERE updated <= ?", (now - self.rate_limits_ttl,))
+            row = connection.execute("SELECT tokens, updated FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tokens = float(capacity) if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            taken = tokens >= 1
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens - 1 if taken else tokens, now)
+            )
+        return taken
+
+
+THROTTLING_STORES = {
+    'cache': CacheThrottlingStore,
+    'sqlite': SQLiteThrottlingStore,
+}
+
+
+def init_app(app):
+    """Check the store's config when the app starts, not on the first throttled request."""
+    path = app.config['DM_THROTTLING_STORE_PATH']
+    if app.config['DM_THROTTLING_STORE'] == 'sqlite' and path != ':memory:' and not (path and os.path.isabs(path)):
+        raise ValueError("DM_THROTTLING_STORE_PATH must be an absolute path, not {!r}".format(path))
+
+
+def get_throttling_store(app=None):
+    """The app's throttling store, created from its config the first time it's asked for."""
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('throttling_store')
+    if store is None:
+        with _create_lock:
+            store = app.extensions.get('throttling_store')
+            if store is None:
+                store = app.extensions['throttling_store'] = THROTTLING_STORES[app.config['DM_THROTTLING_STORE']](app)
+    return store
+
+
+def submission_key(*parts):
+    return hashlib.sha1(json.dumps(parts, default=six.text_type).encode('utf-8')).hexdigest()
+
+
+@contextmanager
+def single_submission(*parts):
+    """Give True the first time `parts` are submitted, and False for repeats.
+
+    A submission counts as a repeat for DM_SUBMISSIONS_CACHE_TTL seconds.
+    If the block raises, the submission is forgotten so it can be retried.
+
+        with single_submission('clarification-question', supplier_id, question) as first:
+            if first:
+                send_question(question)
+    """
+    store = get_throttling_store()
+    key = submission_key(*parts)
+    first = store.claim(key)
+    try:
+        yield first
+    except Exception:
+        if first:
+            store.release(key)
+        raise
+
+
+def check_rate_limit(name, supplier_id):
+    """Stop with a 429 if the supplier has used up their allowance for `name`.
+
+    The allowance is DM_<NAME>_RATE_LIMIT actions an hour, in bursts of up
+    to DM_<NAME>_RATE_BURST.
+    """
+    prefix = 'DM_{}_'.format(name.upper())
+    taken = get_throttling_store().take(
+        '{}:{}'.format(name, supplier_id),
+        current_app.config[prefix + 'RATE_BURST'], current_app.config[prefix + 'RATE_LIMIT'] / 3600.0
+    )
+    if not taken:
+        current_app.logger.warning(
+            "Rate limit reached. limit={limit} supplier_id={supplier_id}",
+            extra={'limit': name, 'supplier_id': supplier_id})
+        abort(429)
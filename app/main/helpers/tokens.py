@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Decoding the tokens in invitation links.
+
+People refresh the create user page and old links get replayed, so each
+token's signature is only checked once. Tokens that fail the check are
+remembered for DM_INVALID_TOKENS_CACHE_TTL seconds and turned away without
+checking again. Tokens that pass are remembered for
+DM_INVITATION_TOKENS_CACHE_TTL seconds, so a link can keep working for up to
+that long after it would have expired.
+"""
+import hashlib
+
+from dmutils.email import decode_invitation_token
+
+from ...cache import get_cache
+
+
+def token_key(encoded_token):
+    return hashlib.sha1(encoded_token.encode('utf-8')).hexdigest()
+
+
+def decode_invitation(encoded_token):
+    """The contents of a supplier invitation token, or None if it isn't valid."""
+    key = token_key(encoded_token)
+    if get_cache('invalid_tokens').get(key):
+        return None
+
+    tokens = get_cache('invitation_tokens')
+    token = tokens.get(key)
+    if token is None:
+        token = decode_invitation_token(encoded_token, role='supplier')
+        if token is None:
+            get_cache('invalid_tokens').set(key, True)
+            return None
+        tokens.set(key, token)
+    return dict(token)
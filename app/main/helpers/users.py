@@ -0,0 +1,55 @@
+from ...cache import get_cache
+
+
+def _directory_entry(user):
+    return {
+        'id': user.get('id'),
+        'name': user.get('name'),
+        'emailAddress': user.get('emailAddress'),
+        'role': user.get('role'),
+        'supplierId': (user.get('supplier') or {}).get('supplierId'),
+    }
+
+
+def get_supplier_users(data_api_client, supplier_id):
+    """A supplier's active users, from the cache if they're there.
+
+    Only the fields the supplier pages use are kept. The cache entry is
+    dropped by `supplier_users_changed` whenever the app adds, invites or
+    deactivates one of the supplier's users.
+    """
+    cache = get_cache('supplier_users')
+    users = cache.get(supplier_id)
+    if users is None:
+        users = tuple(
+            _directory_entry(user)
+            for user in data_api_client.find_users(supplier_id=supplier_id).get('users')
+            if user['active']
+        )
+        cache.set(supplier_id, users)
+    return users
+
+
+def find_supplier_user(data_api_client, supplier_id, user_id):
+    """A user by ID, looking in the supplier's active users first, or None.
+
+    A user who isn't in the cached list may have been added by another
+    process, so the list is fetched again. A user who isn't active at all
+    is fetched on their own, so they may belong to another supplier;
+    checking that is left to the caller.
+    """
+    for refresh in (False, True):
+        if refresh:
+            supplier_users_changed(supplier_id)
+        for user in get_supplier_users(data_api_client, supplier_id):
+            if user['id'] == user_id:
+                return user
+
+    user = data_api_client.get_user(user_id=user_id)
+    if not user or not user.get('users'):
+        return None
+    return _directory_entry(user['users'])
+
+
+def supplier_users_changed(supplier_id):
+    get_cache('supplier_users').delete(supplier_id)
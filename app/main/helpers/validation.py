@@ -1,10 +1,9 @@
-from functools import reduce
-from operator import add
-import re
 import six
 from werkzeug.datastructures import ImmutableOrderedMultiDict
 
-EMAIL_REGEX = r'^[^@^\s]+@[^@^\.^\s]+(\.[^@^\.^\s]+)+$'
+from ...metrics import timed
+from .content import get_question_table
+from .text import is_email_address, over_character_limit
 
 
 def get_validator(framework, content, answers):
@@ -27,30 +26,37 @@ class DeclarationValidator(object):
         self.content = content
         self.answers = answers
 
+    @property
+    def questions(self):
+        return get_question_table(self.content)
+
+    @timed('validate')
     def get_error_messages_for_page(self, section):
         all_errors = self.get_error_messages()
         page_ids = section.get_question_ids()
         page_errors = ImmutableOrderedMultiDict(filter(lambda err: err[0] in page_ids, all_errors))
         return page_errors
 
+    @timed('validate')
     def get_error_messages(self):
         raw_errors_map = self.errors()
         errors_map = list()
         for question_id in self.all_fields():
             if question_id in raw_errors_map:
-                question_number = self.content.get_question(question_id).get('number')
+                question = self.questions.get_question(question_id)
+                question_number = question.get('number')
                 validation_message = self.get_error_message(question_id, raw_errors_map[question_id])
                 errors_map.append((question_id, {
                     'input_name': question_id,
                     'question': "Question {}".format(question_number)
-                    if question_number else self.content.get_question(question_id).get('question'),
+                    if question_number else question.get('question'),
                     'message': validation_message,
                 }))
 
         return errors_map
 
     def get_error_message(self, question_id, message_key):
-        for validation in self.content.get_question(question_id).get('validations', []):
+        for validation in self.questions.get_question(question_id).get('validations', []):
             if validation['name'] == message_key:
                 return validation['message']
         default_messages = {
@@ -65,7 +71,7 @@ class DeclarationValidator(object):
         raise NotImplementedError("only a subclass should be used")
 
     def all_fields(self):
-        return reduce(add, (section.get_question_ids() for section in self.content))
+        return list(self.questions.question_ids)
 
     def fields_with_values(self):
         return set(key for key, value in self.answers.items()
@@ -91,9 +97,8 @@ class DeclarationValidator(object):
     def character_limit_errors(self):
         errors_map = {}
         for question_id in self.all_fields():
-            if self.content.get_question(question_id).get('type') in ['text', 'textbox_large']:
-                answer = self.answers.get(question_id) or ''
-                if self.character_limit is not None and len(answer) > self.character_limit:
+            if self.questions.get_question(question_id).get('type') in ['text', 'textbox_large']:
+                if over_character_limit(self.answers.get(question_id), self.character_limit):
                     errors_map[question_id] = "under_character_limit"
 
         return errors_map
@@ -102,7 +107,7 @@ class DeclarationValidator(object):
         errors_map = {}
         if self.email_validation_fields is not None and len(self.email_validation_fields) > 0:
             for field in self.email_validation_fields:
-                if self.answers.get(field) is None or not re.match(EMAIL_REGEX, self.answers.get(field, '')):
+                if not is_email_address(self.answers.get(field)):
                     errors_map[field] = 'invalid_format'
         return errors_map
 
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Somewhere to keep the answers given while creating a new supplier.
+
+The store is picked with DM_WIZARD_STORE:
+
+* `session` keeps the answers in the session cookie itself.
+* `sqlite` keeps them in the SQLite database at DM_WIZARD_STORE_PATH and only
+  an opaque ID in the cookie, so the cookie stays small however many steps
+  have been answered. Answers that haven't been touched for DM_WIZARD_TTL
+  seconds are thrown away. Every process on a host can share a database
+  file, but hosts can't share one with each other.
+"""
+import binascii
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, session
+
+_create_lock = threading.Lock()
+
+
+class SessionWizardStore(object):
+    """Keeps the answers in the session."""
+
+    key = 'wizard'
+
+    def __init__(self, app):
+        pass
+
+    def load(self, session):
+        return dict(session.get(self.key) or {})
+
+    def save(self, session, answers):
+        session[self.key] = dict(answers)
+
+    def clear(self, session):
+        session.pop(self.key, None)
+
+
+class SQLiteWizardStore(object):
+    """Keeps the answers in SQLite, with the row's ID in the session."""
+
+    key = 'wizard_id'
+
+    def __init__(self, app, clock=time.time):
+        self.ttl = app.config['DM_WIZARD_TTL']
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(app.config['DM_WIZARD_STORE_PATH'], check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS wizard_answers "
+                "(id TEXT PRIMARY KEY, answers TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS wizard_answers_updated ON wizard_answers (updated)"
+            )
+
+    def load(self, session):
+        wizard_id = session.get(self.key)
+        if wizard_id is None:
+            return {}
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT answers FROM wizard_answers WHERE id = ? AND updated > ?",
+                (wizard_id, self._clock() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save(self, session, answers):
+        wizard_id = session.get(self.key)
+        if wizard_id is None:
+            wizard_id = session[self.key] = binascii.hexlify(os.urandom(16)).decode('ascii')
+        now = self._clock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO wizard_answers (id, answers, updated) VALUES (?, ?, ?)",
+                (wizard_id, json.dumps(answers), now)
+            )
+            self._connection.execute("DELETE FROM wizard_answers WHERE updated <= ?", (now - self.ttl,))
+
+    def clear(self, session):
+        wizard_id = session.pop(self.key, None)
+        if wizard_id is not None:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM wizard_answers WHERE id = ?", (wizard_id,))
+
+
+WIZARD_STORES = {
+    'session': SessionWizardStore,
+    'sqlite': SQLiteWizardStore,
+}
+
+
+def get_wizard_store(app=None):
+    """The app's wizard store, created from its config the first time it's asked for."""
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('wizard_store')
+    if store is None:
+        with _create_lock:
+            store = app.extensions.get('wizard_store')
+            if store is None:
+                store = app.extensions['wizard_store'] = WIZARD_STORES[app.config['DM_WIZARD_STORE']](app)
+    return store
+
+
+def wizard_answers():
+    """The current user's answers so far. Changes need `save_wizard_answers`."""
+    return get_wizard_store().load(session)
+
+
+def save_wizard_answers(answers):
+    get_wizard_store().save(session, answers)
+
+
+def clear_wizard_answers():
+    get_wizard_store().clear(session)
@@ -1,8 +1,6 @@
 # coding: utf-8
 from __future__ import unicode_literals
 
-import re
-
 from flask import abort, flash, redirect, render_template, request, url_for
 from flask_login import current_user
 
@@ -10,12 +8,15 @@ from dmapiclient import HTTPError
 
 from ..helpers import login_required
 from ..helpers.briefs import (
-    get_brief,
-    is_supplier_eligible_for_brief,
-    send_brief_clarification_question,
-    supplier_has_a_brief_response
+    brief_response_section,
+    forget_brief_context,
+    get_brief_context,
+    send_brief_clarification_question
 )
-from ..helpers.frameworks import get_framework_and_lot, get_supplier_framework_info
+from ..helpers.content import get_brief_response_section
+from ..helpers.frameworks import get_supplier_framework_info
+from ..helpers.text import over_character_limit, over_word_limit
+from ..helpers.throttling import check_rate_limit, single_submission
 from ...main import main, content_loader
 from ... import data_api_client
 
@@ -23,12 +24,13 @@ from ... import data_api_client
 @main.route('/opportunities/<int:brief_id>/question-and-answer-session', methods=['GET'])
 @login_required
 def question_and_answer_session(brief_id):
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(data_api_client, brief_id, current_user.supplier_id, allowed_statuses=['live'])
+    brief = context.brief
 
     if brief['clarificationQuestionsAreClosed']:
         abort(404)
 
-    if not is_supplier_eligible_for_brief(data_api_client, current_user.supplier_id, brief):
+    if not context.is_supplier_eligible(data_api_client):
         return _render_not_eligible_for_brief_error_page(brief, clarification_question=True)
 
     return render_template(
@@ -40,12 +42,16 @@ def question_and_answer_session(brief_id):
 @main.route('/opportunities/<int:brief_id>/ask-a-question', methods=['GET', 'POST'])
 @login_required
 def ask_brief_clarification_question(brief_id):
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(
+        data_api_client, brief_id, current_user.supplier_id, allowed_statuses=['live'],
+        fresh_brief=request.method == 'POST'
+    )
+    brief = context.brief
 
     if brief['clarificationQuestionsAreClosed']:
         abort(404)
 
-    if not is_supplier_eligible_for_brief(data_api_client, current_user.supplier_id, brief):
+    if not context.is_supplier_eligible(data_api_client):
         return _render_not_eligible_for_brief_error_page(brief, clarification_question=True)
 
     error_message = None
@@ -55,14 +61,19 @@ def ask_brief_clarification_question(brief_id):
         clarification_question = request.form.get('clarification-question', '').strip()
         if not clarification_question:
             error_message = "Question cannot be empty"
-        elif len(clarification_question) > 5000:
+        elif over_character_limit(clarification_question, 5000):
             clarification_question_value = clarification_question
             error_message = "Question cannot be longer than 5000 characters"
-        elif not re.match("^$|(^(?:\\S+\\s+){0,99}\\S+$)", clarification_question):
+        elif over_word_limit(clarification_question, 100):
             clarification_question_value = clarification_question
             error_message = "Question must be no more than 100 words"
         else:
-            send_brief_clarification_question(data_api_client, brief, clarification_question)
+            with single_submission(
+                'brief-clarification-question', current_user.supplier_id, brief_id, clarification_question
+            ) as first:
+                if first:
+                    check_rate_limit('clarification_questions', current_user.supplier_id)
+                    send_brief_clarification_question(data_api_client, brief, clarification_question)
             flash('message_sent', 'success')
 
     return render_template(
@@ -78,24 +89,24 @@ def ask_brief_clarification_question(brief_id):
 @login_required
 def brief_response(brief_id):
 
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(
+        data_api_client, brief_id, current_user.supplier_id, allowed_statuses=['live'],
+        prefetch=['brief_responses', 'framework_and_lot']
+    )
+    brief = context.brief
 
-    if not is_supplier_eligible_for_brief(data_api_client, current_user.supplier_id, brief):
+    if not context.is_supplier_eligible(data_api_client):
         return _render_not_eligible_for_brief_error_page(brief)
 
-    if supplier_has_a_brief_response(data_api_client, current_user.supplier_id, brief_id):
+    if context.has_brief_response(data_api_client):
         flash('already_applied', 'error')
         return redirect(url_for(".view_response_result", brief_id=brief_id))
 
-    framework, lot = get_framework_and_lot(
-        data_api_client, brief['frameworkSlug'], brief['lotSlug'], allowed_statuses=['live'])
-
-    content = content_loader.get_manifest(framework['slug'], 'edit_brief_response').filter({'lot': lot['slug']})
-    section = content.get_section(content.get_next_editable_section_id())
+    framework, lot = context.framework_and_lot(data_api_client)
 
-    # replace generic 'Apply for opportunity' title with title including the name of the brief
-    section.name = "Apply for ‘{}’".format(brief['title'])
-    section.inject_brief_questions_into_boolean_list_question(brief)
+    section = brief_response_section(
+        get_brief_response_section(content_loader, framework['slug'], lot['slug']), brief
+    )
 
     return render_template(
         "briefs/brief_response.html",
@@ -112,20 +123,22 @@ def brief_response(brief_id):
 def submit_brief_response(brief_id):
     """Hits up the data API to create a new brief response."""
 
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(
+        data_api_client, brief_id, current_user.supplier_id, allowed_statuses=['live'],
+        prefetch=['brief_responses', 'framework_and_lot'], fresh_brief=True
+    )
+    brief = context.brief
 
-    if not is_supplier_eligible_for_brief(data_api_client, current_user.supplier_id, brief):
+    if not context.is_supplier_eligible(data_api_client):
         return _render_not_eligible_for_brief_error_page(brief)
 
-    if supplier_has_a_brief_response(data_api_client, current_user.supplier_id, brief_id):
+    if context.has_brief_response(data_api_client):
         flash('already_applied', 'error')
         return redirect(url_for(".view_response_result", brief_id=brief_id))
 
-    framework, lot = get_framework_and_lot(
-        data_api_client, brief['frameworkSlug'], brief['lotSlug'], allowed_statuses=['live'])
+    framework, lot = context.framework_and_lot(data_api_client)
 
-    content = content_loader.get_manifest(framework['slug'], 'edit_brief_response').filter({'lot': lot['slug']})
-    section = content.get_section(content.get_next_editable_section_id())
+    section = get_brief_response_section(content_loader, framework['slug'], lot['slug'])
     response_data = section.get_data(request.form)
 
     try:
@@ -133,9 +146,7 @@ def submit_brief_response(brief_id):
             brief_id, current_user.supplier_id, response_data, current_user.email_address
         )['briefResponses']
     except HTTPError as e:
-        # replace generic 'Apply for opportunity' title with title including the name of the brief
-        section.name = "Apply for ‘{}’".format(brief['title'])
-        section.inject_brief_questions_into_boolean_list_question(brief)
+        section = brief_response_section(section, brief)
         section_summary = section.summary(response_data)
 
         errors = section_summary.get_error_messages(e.message)
@@ -149,6 +160,8 @@ def submit_brief_response(brief_id):
             **dict(main.config['BASE_TEMPLATE_DATA'])
         ), 400
 
+    forget_brief_context(brief_id, current_user.supplier_id)
+
     if all(brief_response['essentialRequirements']):
         flash('Your response to ‘{}’ has been submitted.'.format(brief['title']))
         return redirect(url_for(".dashboard"))
@@ -158,15 +171,15 @@ def submit_brief_response(brief_id):
 
 @main.route('/opportunities/<int:brief_id>/responses/result')
 def view_response_result(brief_id):
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(
+        data_api_client, brief_id, current_user.supplier_id, allowed_statuses=['live'], prefetch=['brief_responses']
+    )
+    brief = context.brief
 
-    if not is_supplier_eligible_for_brief(data_api_client, current_user.supplier_id, brief):
+    if not context.is_supplier_eligible(data_api_client):
         return _render_not_eligible_for_brief_error_page(brief)
 
-    brief_response = data_api_client.find_brief_responses(
-        brief_id=brief_id,
-        supplier_id=current_user.supplier_id
-    )['briefResponses']
+    brief_response = context.brief_responses(data_api_client)
 
     if len(brief_response) == 0:
         return redirect(url_for(".brief_response", brief_id=brief_id))
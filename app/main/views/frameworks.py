@@ -3,7 +3,7 @@ import itertools
 from datetime import datetime
 
 from dateutil.parser import parse as date_parse
-from flask import render_template, request, abort, flash, redirect, url_for, current_app
+from flask import render_template, request, abort, flash, redirect, url_for, current_app, Response
 from flask_login import current_user
 import six
 
@@ -24,12 +24,21 @@ from ..helpers import hash_email, login_required
 from ..helpers.frameworks import (
     get_declaration_status, get_last_modified_from_first_matching_file, register_interest_in_framework,
     get_supplier_on_framework_from_info, get_declaration_status_from_info, get_supplier_framework_info,
-    get_framework, get_framework_and_lot, count_drafts_by_lot, get_statuses_for_lot, has_one_service_limit,
+    get_framework, get_framework_and_lot, get_statuses_for_lot, has_one_service_limit,
     countersigned_framework_agreement_exists_in_bucket
 )
+from ..helpers.caching import check_etag, etag_response, page_etag
+from ..helpers.content import get_question_references
+from ..helpers.exports import MIMETYPES, SubmissionExport, byte_range, content_length
+from ..helpers.pagination import get_page, paginate, pagination_links
+from ..helpers.search import index_added, DRAFT
+from ..helpers.templates import stream_template
+from ..helpers.text import over_character_limit
+from ..helpers.throttling import check_rate_limit, single_submission
+from ..helpers.users import get_supplier_users
 from ..helpers.validation import get_validator
 from ..helpers.services import (
-    get_signed_document_url, get_drafts, get_lot_drafts, count_unanswered_questions
+    get_signed_document_url, get_draft_index, count_unanswered_questions
 )
 from cirrus.email import send_email
 
@@ -43,12 +52,12 @@ def framework_dashboard(framework_slug):
 
     if request.method == 'POST':
         register_interest_in_framework(data_api_client, framework_slug)
-        supplier_users = data_api_client.find_users(supplier_id=current_user.supplier_id)
+        supplier_users = get_supplier_users(data_api_client, current_user.supplier_id)
 
         try:
             email_body = render_template('emails/{}_application_started.html'.format(framework_slug))
             send_email(
-                [user['emailAddress'] for user in supplier_users['users'] if user['active']],
+                [user['emailAddress'] for user in supplier_users],
                 email_body,
                 'You have started your {} application'.format(framework['name']),
                 current_app.config['CLARIFICATION_EMAIL_FROM'],
@@ -61,7 +70,8 @@ def framework_dashboard(framework_slug):
                 extra={'error': six.text_type(e), 'supplier_id': current_user.supplier_id}
             )
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    complete_drafts_count = draft_index.count(draft_index.COMPLETE)
 
     supplier_framework_info = get_supplier_framework_info(data_api_client, framework_slug)
     declaration_status = get_declaration_status_from_info(supplier_framework_info)
@@ -87,18 +97,18 @@ def framework_dashboard(framework_slug):
 
     return render_template(
         "frameworks/dashboard.html",
-        application_made=supplier_is_on_framework or (len(complete_drafts) > 0 and declaration_status == 'complete'),
+        application_made=supplier_is_on_framework or (complete_drafts_count > 0 and declaration_status == 'complete'),
         completed_lots=[{
             'name': lot['name'],
-            'complete_count': count_drafts_by_lot(complete_drafts, lot['slug']),
+            'complete_count': draft_index.count(draft_index.COMPLETE, lot['slug']),
             'one_service_limit': lot['oneServiceLimit'],
             'unit': 'lab' if framework['slug'] == 'digital-outcomes-and-specialists' else 'service',
             'unit_plural': 'labs' if framework['slug'] == 'digital-outcomes-and-specialists' else 'service'
             # TODO: ^ make this dynamic, eg, lab, service, unit
-        } for lot in framework['lots'] if count_drafts_by_lot(complete_drafts, lot['slug'])],
+        } for lot in framework['lots'] if draft_index.count(draft_index.COMPLETE, lot['slug'])],
         counts={
-            "draft": len(drafts),
-            "complete": len(complete_drafts)
+            "draft": draft_index.count(draft_index.DRAFT),
+            "complete": complete_drafts_count
         },
         dates=content_loader.get_message(framework_slug, 'dates'),
         declaration_status=declaration_status,
@@ -124,7 +134,8 @@ def framework_dashboard(framework_slug):
 def framework_submission_lots(framework_slug):
     framework = get_framework(data_api_client, framework_slug)
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    drafts, complete_drafts = draft_index.drafts(), draft_index.complete_drafts()
     declaration_status = get_declaration_status(data_api_client, framework_slug)
     application_made = len(complete_drafts) > 0 and declaration_status == 'complete'
     if framework['status'] not in ["open", "pending", "standstill"]:
@@ -134,8 +145,8 @@ def framework_submission_lots(framework_slug):
 
     lots = [
         dict(lot,
-             draft_count=count_drafts_by_lot(drafts, lot['slug']),
-             complete_count=count_drafts_by_lot(complete_drafts, lot['slug']))
+             draft_count=draft_index.count(draft_index.DRAFT, lot['slug']),
+             complete_count=draft_index.count(draft_index.COMPLETE, lot['slug']))
         for lot in framework['lots']]
     lot_question = {
         option["value"]: option
@@ -173,7 +184,8 @@ def framework_submission_lots(framework_slug):
 def framework_submission_services(framework_slug, lot_slug):
     framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug)
 
-    drafts, complete_drafts = get_lot_drafts(data_api_client, framework_slug, lot_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    drafts, complete_drafts = draft_index.drafts(lot_slug), draft_index.complete_drafts(lot_slug)
     declaration_status = get_declaration_status(data_api_client, framework_slug)
     if framework['status'] == 'pending' and declaration_status != 'complete':
         abort(404)
@@ -184,13 +196,23 @@ def framework_submission_services(framework_slug, lot_slug):
             draft = data_api_client.create_new_draft_service(
                 framework_slug, lot_slug, current_user.supplier_id, {}, current_user.email_address,
             )['services']
+            index_added(DRAFT, draft)
 
         return redirect(
             url_for('.view_service_submission',
                     framework_slug=framework_slug, lot_slug=lot_slug, service_id=draft['id'])
         )
 
-    for draft in itertools.chain(drafts, complete_drafts):
+    # The drafts API isn't paginated, so page through the list here. Only the
+    # drafts on this page get summarised, which is most of the work.
+    page = get_page()
+    per_page = current_app.config['DM_DRAFTS_PER_PAGE']
+    drafts_page, more_drafts = paginate(list(reversed(drafts)), page, per_page)
+    complete_drafts_page, more_complete_drafts = paginate(list(reversed(complete_drafts)), page, per_page)
+    if page > 1 and not (drafts_page or complete_drafts_page):
+        abort(404)
+
+    for draft in itertools.chain(drafts_page, complete_drafts_page):
         draft['priceString'] = format_service_price(draft)
         content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft)
         sections = content.summary(draft)
@@ -201,14 +223,74 @@ def framework_submission_services(framework_slug, lot_slug):
             'unanswered_optional': unanswered_optional,
         })
 
-    return render_template(
+    return stream_template(
         "frameworks/services.html",
-        complete_drafts=list(reversed(complete_drafts)),
-        drafts=list(reversed(drafts)),
+        complete_drafts=complete_drafts_page,
+        complete_drafts_count=len(complete_drafts),
+        drafts=drafts_page,
         declaration_status=declaration_status,
         framework=framework,
-        lot=lot
-    ), 200
+        lot=lot,
+        page=page,
+        pagination=pagination_links(page, more_drafts or more_complete_drafts),
+        delete_draft_ids=request.args.getlist('delete_draft_id')
+    )
+
+
+@main.route('/frameworks/<framework_slug>/submission.<any(csv, json, zip):export_format>', methods=['GET'])
+@login_required
+def export_framework_submission(framework_slug, export_format):
+    """Download all of a supplier's drafts and their declaration in one file.
+
+    The file is streamed as it's made. Range requests are answered by making
+    the export twice: once to find its length and once to send the range.
+    """
+    get_framework(data_api_client, framework_slug)
+
+    try:
+        drafts = data_api_client.find_draft_services(current_user.supplier_id, framework=framework_slug)['services']
+    except APIError as e:
+        abort(e.status_code)
+
+    declaration = {}
+    try:
+        declaration = data_api_client.get_supplier_declaration(
+            current_user.supplier_id, framework_slug)['declaration'] or {}
+    except APIError as e:
+        if e.status_code != 404:
+            abort(e.status_code)
+
+    export = SubmissionExport(content_loader, framework_slug, drafts, declaration, current_app.config['VERSION'])
+    etag = export.etag(export_format)
+
+    response = Response(mimetype=MIMETYPES[export_format])
+    response.set_etag(etag)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Disposition'] = 'attachment; filename="{}-submission.{}"'.format(
+        framework_slug, export_format)
+
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+
+    requested_range = request.range
+    if requested_range is not None and requested_range.units == 'bytes' and len(requested_range.ranges) == 1 \
+            and request.if_range.date is None and request.if_range.etag in (None, etag):
+        length = content_length(export.chunks(export_format))
+        content_range = requested_range.range_for_length(length)
+        if content_range is None:
+            response.status_code = 416
+            response.headers['Content-Range'] = 'bytes */{}'.format(length)
+            return response
+        start, stop = content_range
+        response.status_code = 206
+        response.headers['Content-Range'] = requested_range.make_content_range(length).to_header()
+        response.headers['Content-Length'] = str(stop - start)
+        response.response = byte_range(export.chunks(export_format), start, stop)
+        return response
+
+    response.response = export.chunks(export_format)
+    return response
 
 
 @main.route('/frameworks/<framework_slug>/declaration', methods=['GET'])
@@ -291,7 +373,7 @@ def framework_supplier_declaration(framework_slug, section_id=None):
         section=section,
         declaration_answers=all_answers,
         is_last_page=is_last_page,
-        get_question=content.get_question,
+        get_question=get_question_references(content_loader, framework_slug, 'declaration'),
         errors=errors
     ), status_code
 
@@ -339,12 +421,25 @@ def framework_updates(framework_slug, error_message=None, default_textbox_value=
         'communications': [],
         'clarifications': [],
     }
+    agreement_countersigned = countersigned_framework_agreement_exists_in_bucket(
+        framework_slug, current_app.config['DM_AGREEMENTS_BUCKET'])
+
+    # Every framework field the template uses. The dates come from the
+    # content loader, which only changes with the app version.
+    etag = page_etag(
+        framework['status'],
+        framework['name'],
+        framework['clarificationQuestionsOpen'],
+        [(file['path'], file.get('last_modified')) for file in file_list],
+        agreement_countersigned)
+    check_etag(etag)
+
     for file in file_list:
         path_parts = file['path'].split('/')
         file['path'] = '/'.join(path_parts[2:])
         files[path_parts[3]].append(file)
 
-    return render_template(
+    return etag_response(etag, (render_template(
         "frameworks/updates.html",
         framework=framework,
         clarification_question_name=CLARIFICATION_QUESTION_NAME,
@@ -352,9 +447,8 @@ def framework_updates(framework_slug, error_message=None, default_textbox_value=
         error_message=error_message,
         files=files,
         dates=content_loader.get_message(framework_slug, 'dates'),
-        agreement_countersigned=countersigned_framework_agreement_exists_in_bucket(
-            framework_slug, current_app.config['DM_AGREEMENTS_BUCKET'])
-    ), 200 if not error_message else 400
+        agreement_countersigned=agreement_countersigned
+    ), 200 if not error_message else 400))
 
 
 @main.route('/frameworks/<framework_slug>/updates', methods=['POST'])
@@ -367,13 +461,25 @@ def framework_updates_email_clarification_question(framework_slug):
 
     if not clarification_question:
         return framework_updates(framework_slug, "Question cannot be empty")
-    elif len(clarification_question) > 5000:
+    elif over_character_limit(clarification_question, 5000):
         return framework_updates(
             framework_slug,
             error_message="Question cannot be longer than 5000 characters",
             default_textbox_value=clarification_question
         )
 
+    with single_submission(
+        'framework-clarification-question', current_user.supplier_id, framework['slug'], clarification_question
+    ) as first:
+        if first:
+            check_rate_limit('clarification_questions', current_user.supplier_id)
+            _send_framework_clarification_question(framework, clarification_question)
+
+    flash('message_sent', 'success')
+    return framework_updates(framework['slug'])
+
+
+def _send_framework_clarification_question(framework, clarification_question):
     # Submit email to Zendesk so the question can be answered
     # Fail if this email does not send
     if framework['clarificationQuestionsOpen']:
@@ -460,9 +566,6 @@ def framework_updates_email_clarification_question(framework_slug):
         object_id=current_user.supplier_id,
         data={"question": clarification_question, 'framework': framework['slug']})
 
-    flash('message_sent', 'success')
-    return framework_updates(framework['slug'])
-
 
 @main.route('/frameworks/<framework_slug>/agreement', methods=['GET'])
 @login_required
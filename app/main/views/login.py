@@ -9,11 +9,14 @@ from cirrus.email import send_email
 from dmapiclient import HTTPError
 from dmapiclient.audit import AuditTypes
 from dmutils.user import User
-from dmutils.email import decode_invitation_token, generate_token
+from dmutils.email import generate_token
 
 from .. import main
-from ..forms.auth_forms import EmailAddressForm, CreateUserForm
+from ..forms.auth_forms import BulkInviteForm, EmailAddressForm, CreateUserForm
 from ..helpers import hash_email, login_required
+from ..helpers.invites import parse_email_addresses, send_invites
+from ..helpers.tokens import decode_invitation
+from ..helpers.users import supplier_users_changed
 from ... import data_api_client
 
 
@@ -21,7 +24,7 @@ from ... import data_api_client
 def create_user(encoded_token):
     form = CreateUserForm()
 
-    token = decode_invitation_token(encoded_token, role='supplier')
+    token = decode_invitation(encoded_token)
 
     if token is None:
         current_app.logger.warning(
@@ -52,7 +55,7 @@ def create_user(encoded_token):
 def submit_create_user(encoded_token):
     form = CreateUserForm()
 
-    token = decode_invitation_token(encoded_token, role='supplier')
+    token = decode_invitation(encoded_token)
     if token is None:
         current_app.logger.warning("createuser.token_invalid: {encoded_token}",
                                    extra={'encoded_token': encoded_token})
@@ -80,6 +83,7 @@ def submit_create_user(encoded_token):
                 'role': 'supplier',
                 'supplierId': token.get('supplier_id')
             })
+            supplier_users_changed(token.get('supplier_id'))
 
             user = User.from_json(user)
             login_user(user)
@@ -152,6 +156,7 @@ def send_invite_user():
             object_id=current_user.supplier_id,
             data={'invitedEmail': form.email_address.data},
         )
+        supplier_users_changed(current_user.supplier_id)
 
         flash('user_invited', 'success')
         return redirect(url_for('.list_users'))
@@ -159,3 +164,65 @@ def send_invite_user():
         return render_template(
             "auth/submit_email_address.html",
             form=form), 400
+
+
+@main.route('/invite-users', methods=["GET"])
+@login_required
+def bulk_invite_users():
+    form = BulkInviteForm()
+
+    return render_template(
+        "auth/invite_users.html",
+        form=form), 200
+
+
+@main.route('/invite-users', methods=["POST"])
+@login_required
+def send_bulk_invite_users():
+    form = BulkInviteForm()
+
+    if not form.validate_on_submit():
+        return render_template(
+            "auth/invite_users.html",
+            form=form,
+            error=form.email_addresses.errors[0]), 400
+
+    email_addresses, invalid_email_addresses = parse_email_addresses(form.email_addresses.data)
+    limit = current_app.config['DM_BULK_INVITE_LIMIT']
+
+    if invalid_email_addresses:
+        error = u"These aren't valid email addresses: {}".format(', '.join(invalid_email_addresses))
+    elif len(email_addresses) > limit:
+        error = "You can invite up to {} contributors at a time".format(limit)
+    else:
+        error = None
+    if error:
+        return render_template(
+            "auth/invite_users.html",
+            form=form,
+            error=error), 400
+
+    failed = send_invites(current_user.name, current_user.supplier_id, current_user.supplier_name, email_addresses)
+    invited = [email_address for email_address in email_addresses if email_address not in failed]
+
+    for email_address in invited:
+        data_api_client.create_audit_event(
+            audit_type=AuditTypes.invite_user,
+            user=current_user.email_address,
+            object_type='suppliers',
+            object_id=current_user.supplier_id,
+            data={'invitedEmail': email_address},
+        )
+    if invited:
+        supplier_users_changed(current_user.supplier_id)
+
+    if failed:
+        form.email_addresses.data = '\n'.join(failed)
+        return render_template(
+            "auth/invite_users.html",
+            form=form,
+            invited_count=len(invited),
+            error="These invitations couldn't be sent. Try again."), 503
+
+    flash({'users_invited': len(invited)}, 'success')
+    return redirect(url_for('.list_users'))
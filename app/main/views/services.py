@@ -1,14 +1,24 @@
+from collections import OrderedDict
+import itertools
+
 from flask_login import current_user
-from flask import render_template, request, redirect, url_for, abort, flash, current_app
+from flask import render_template, request, redirect, url_for, abort, flash, current_app, jsonify
 
 from ... import data_api_client, flask_featureflags
 from ...main import main, content_loader
-from ..helpers import login_required
+from ..helpers import login_required, request_wants_json
+from ..helpers.caching import check_etag, etag_response, page_etag
+from ..helpers.concurrency import run_concurrently
 from ..helpers.services import is_service_associated_with_supplier, get_signed_document_url, count_unanswered_questions, \
-    get_next_section_name
+    get_next_section_name, get_draft_index
 from ..helpers.frameworks import get_framework_and_lot, get_declaration_status, has_one_service_limit
+from ..helpers.imports import DEFAULT_MESSAGES, ImportFileError, ImportJob, RowValidator, get_import_job, read_rows, \
+    start_import_job, validate_rows
+from ..helpers.pagination import get_page, pagination_links
+from ..helpers.search import get_search_index, index_added, index_updated, index_removed, SERVICE, DRAFT
+from ..helpers.templates import stream_template
 
-from dmapiclient import HTTPError
+from dmapiclient import APIError, HTTPError
 from dmutils import s3
 from dmutils.documents import upload_service_documents
 
@@ -16,15 +26,45 @@ from dmutils.documents import upload_service_documents
 @main.route('/services')
 @login_required
 def list_services():
-    suppliers_services = sorted(
-        data_api_client.find_services(supplier_id=current_user.supplier_id)["services"],
-        key=lambda service: service['frameworkSlug'],
-        reverse=True
-    )
+    page = get_page()
+    response = data_api_client.find_services(supplier_id=current_user.supplier_id, page=page)
+    if page > 1 and not response["services"]:
+        abort(404)
 
-    return render_template(
+    # Services are shown in the API's order. Sorting them here would only
+    # sort each page, not the list as a whole.
+    suppliers_services = response["services"]
+
+    etag = page_etag(
+        [(service['id'], service.get('updatedAt'), service.get('status')) for service in suppliers_services],
+        response.get('links'))
+    check_etag(etag)
+
+    return etag_response(etag, stream_template(
         "services/list_services.html",
-        services=suppliers_services), 200
+        services=suppliers_services,
+        pagination=pagination_links(page, 'next' in response.get('links', {}))))
+
+
+@main.route('/services/search')
+@login_required
+def search_services():
+    kind = request.args.get('type') or None
+    if kind not in (None, SERVICE, DRAFT):
+        abort(400)
+
+    query = request.args.get('q', '').strip()
+    framework = request.args.get('framework') or None
+    lot = request.args.get('lot') or None
+
+    results = get_search_index(data_api_client).search(query, kind=kind, framework=framework, lot=lot)
+
+    return render_template(
+        "services/search_services.html",
+        query=query,
+        results=results,
+        SERVICE=SERVICE,
+        DRAFT=DRAFT), 200
 
 
 #  #######################  EDITING LIVE SERVICES #############################
@@ -42,10 +82,14 @@ def edit_service(service_id):
 
     framework = data_api_client.get_framework(service['frameworkSlug'])['frameworks']
 
+    etag = page_etag(service.get('updatedAt'), service.get('status'), service_unavailability_information,
+                     framework['status'])
+    check_etag(etag)
+
     content = content_loader.get_manifest(framework['slug'], 'edit_service').filter(service)
     remove_requested = True if request.args.get('remove_requested') else False
 
-    return render_template(
+    return etag_response(etag, render_template(
         "services/service.html",
         service_id=service.get('id'),
         service_data=service,
@@ -53,7 +97,7 @@ def edit_service(service_id):
         framework=framework,
         sections=content.summary(service),
         remove_requested=remove_requested
-    )
+    ))
 
 
 @main.route('/services/<string:service_id>/remove', methods=['POST'])
@@ -76,6 +120,7 @@ def remove_service(service_id):
             current_user.email_address)
 
         updated_service = updated_service.get('services')
+        index_updated(SERVICE, service_id, {'status': updated_service.get('status', 'enabled')})
 
         flash({
             'updated_service_name': updated_service.get('serviceName')
@@ -138,6 +183,7 @@ def update_section(service_id, section_id):
             service_id,
             posted_data,
             current_user.email_address)
+        index_updated(SERVICE, service_id, posted_data)
     except HTTPError as e:
         errors = section.get_error_messages(e.message)
         if not posted_data.get('serviceName', None):
@@ -197,6 +243,7 @@ def create_new_draft_service(framework_slug, lot_slug):
             framework_slug, lot['slug'], current_user.supplier_id, update_data,
             current_user.email_address, page_questions=section.get_field_names()
         )['services']
+        index_added(DRAFT, draft_service)
     except HTTPError as e:
         update_data = section.unformat_data(update_data)
         errors = section.get_error_messages(e.message)
@@ -236,6 +283,7 @@ def copy_draft_service(framework_slug, lot_slug, service_id):
         service_id,
         current_user.email_address
     )['services']
+    index_added(DRAFT, draft_copy)
 
     return redirect(url_for(".edit_service_submission",
                             framework_slug=framework['slug'],
@@ -259,6 +307,7 @@ def complete_draft_service(framework_slug, lot_slug, service_id):
         service_id,
         current_user.email_address
     )
+    index_updated(DRAFT, service_id, {'status': 'submitted'})
 
     flash({
         'service_name': draft.get('serviceName') or draft.get('lotName'),
@@ -292,6 +341,7 @@ def delete_draft_service(framework_slug, lot_slug, service_id):
             service_id,
             current_user.email_address
         )
+        index_removed(DRAFT, service_id)
 
         flash({'service_name': draft.get('serviceName', draft['lotName'])}, 'service_deleted')
         if lot['oneServiceLimit']:
@@ -308,6 +358,186 @@ def delete_draft_service(framework_slug, lot_slug, service_id):
                                 delete_requested=True))
 
 
+BULK_DRAFT_ACTIONS = ('complete', 'copy', 'delete')
+
+
+@main.route('/frameworks/<framework_slug>/submissions/<lot_slug>/bulk', methods=['POST'])
+@login_required
+def bulk_draft_services_action(framework_slug, lot_slug):
+    """Complete, copy or delete several drafts, making the API calls concurrently."""
+    framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug, allowed_statuses=['open'])
+    if lot['oneServiceLimit']:
+        abort(404)
+
+    action = request.form.get('action')
+    draft_ids = list(OrderedDict.fromkeys(request.form.getlist('draft_id')))
+    if action not in BULK_DRAFT_ACTIONS or len(draft_ids) > current_app.config['DM_BULK_DRAFT_ACTION_LIMIT']:
+        abort(400)
+
+    if action == 'delete' and draft_ids and request.form.get('delete_confirmed') != 'true':
+        return redirect(url_for(".framework_submission_services",
+                                framework_slug=framework['slug'],
+                                lot_slug=lot_slug,
+                                delete_draft_id=draft_ids))
+
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    owned_drafts = {
+        str(draft['id']): draft
+        for draft in itertools.chain(draft_index.drafts(lot_slug), draft_index.complete_drafts(lot_slug))
+    }
+
+    api_method = getattr(data_api_client, '{}_draft_service'.format(action))
+    user = current_user.email_address
+    supplier_id = current_user.supplier_id
+
+    def act(draft_id):
+        try:
+            return api_method(draft_id, user)
+        except APIError:
+            raise
+        except Exception:
+            # Logged here, where the traceback is still available
+            current_app.logger.exception(
+                "Bulk draft action failed. action={action} draft_id={draft_id} supplier_id={supplier_id}",
+                extra={'action': action, 'draft_id': draft_id, 'supplier_id': supplier_id})
+            raise
+
+    found_ids = [draft_id for draft_id in draft_ids if draft_id in owned_drafts]
+    outcomes = dict(zip(found_ids, run_concurrently(
+        act,
+        found_ids,
+        current_app.config['DM_BULK_DRAFT_ACTION_MAX_WORKERS']
+    )))
+
+    results = []
+    for draft_id in draft_ids:
+        draft = owned_drafts.get(draft_id, {})
+        result, error = outcomes.get(draft_id, (None, None))
+        if draft_id not in outcomes:
+            message = 'Service not found'
+        elif error is None:
+            message = None
+        elif isinstance(error, APIError):
+            message = error.message
+        else:
+            # Other drafts may already have changed, so this is reported
+            # with them rather than stopping with a 500
+            message = 'Something went wrong'
+
+        if message is None:
+            if action == 'complete':
+                index_updated(DRAFT, draft_id, {'status': 'submitted'})
+            elif action == 'copy':
+                index_added(DRAFT, result['services'])
+            else:
+                index_removed(DRAFT, draft_id)
+
+        results.append({
+            'id': draft_id,
+            'serviceName': draft.get('serviceName') or draft.get('lotName'),
+            'success': message is None,
+            'error': message,
+        })
+
+    if request_wants_json():
+        return jsonify(action=action, results=results)
+
+    failed = [result for result in results if not result['success']]
+    flash({
+        'action': action,
+        'succeeded': len(results) - len(failed),
+        'failed': [result['serviceName'] or result['id'] for result in failed[:10]],
+        'failed_count': len(failed),
+    }, 'bulk_action')
+
+    return redirect(url_for(".framework_submission_services",
+                            framework_slug=framework['slug'],
+                            lot_slug=lot_slug))
+
+
+@main.route('/frameworks/<framework_slug>/submissions/<lot_slug>/import', methods=['GET'])
+@login_required
+def import_draft_services_form(framework_slug, lot_slug):
+    framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug, allowed_statuses=['open'])
+    if lot['oneServiceLimit']:
+        abort(404)
+
+    return render_template(
+        "services/import_draft_services.html",
+        framework=framework,
+        lot=lot
+    ), 200
+
+
+@main.route('/frameworks/<framework_slug>/submissions/<lot_slug>/import', methods=['POST'])
+@login_required
+def import_draft_services(framework_slug, lot_slug):
+    """Check an uploaded file of services, then import it in the background."""
+    framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug, allowed_statuses=['open'])
+    if lot['oneServiceLimit']:
+        abort(404)
+
+    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter({'lot': lot['slug']})
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    validator = RowValidator(content, [
+        draft['id'] for draft in itertools.chain(draft_index.drafts(lot_slug), draft_index.complete_drafts(lot_slug))
+    ])
+
+    file_error, valid_rows, row_errors = None, [], []
+    try:
+        if 'import_file' not in request.files:
+            raise ImportFileError('invalid_file')
+        valid_rows, row_errors = validate_rows(
+            validator, read_rows(request.files['import_file']), current_app.config['DM_IMPORT_MAX_ROWS']
+        )
+    except ImportFileError as e:
+        file_error = DEFAULT_MESSAGES[e.args[0]]
+
+    if file_error or row_errors or not valid_rows:
+        file_error = file_error or ("This file doesn't have any services in it." if not row_errors else None)
+        if request_wants_json():
+            return jsonify(error=file_error, rows=row_errors), 400
+        return render_template(
+            "services/import_draft_services.html",
+            framework=framework,
+            lot=lot,
+            file_error=file_error,
+            row_errors=row_errors
+        ), 400
+
+    job = ImportJob(current_user.supplier_id, framework_slug, lot_slug, valid_rows)
+    start_import_job(data_api_client, validator, job, current_user.email_address)
+
+    progress_url = url_for(".import_draft_services_progress",
+                           framework_slug=framework_slug,
+                           lot_slug=lot_slug,
+                           job_id=job.id)
+    if request_wants_json():
+        return jsonify(job.serialize()), 202, {'Location': progress_url}
+    return redirect(progress_url)
+
+
+@main.route('/frameworks/<framework_slug>/submissions/<lot_slug>/import/<job_id>', methods=['GET'])
+@login_required
+def import_draft_services_progress(framework_slug, lot_slug, job_id):
+    job = get_import_job(job_id)
+    if job is None or (job.supplier_id, job.framework_slug, job.lot_slug) != \
+            (current_user.supplier_id, framework_slug, lot_slug):
+        abort(404)
+
+    if request_wants_json():
+        return jsonify(job.serialize())
+
+    framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug)
+
+    return render_template(
+        "services/import_draft_services_progress.html",
+        framework=framework,
+        lot=lot,
+        job=job.serialize()
+    ), 200
+
+
 @main.route('/assets/<framework_slug>/submissions/<int:supplier_id>/<document_name>', methods=['GET'])
 @login_required
 def service_submission_document(framework_slug, supplier_id, document_name):
@@ -337,6 +567,11 @@ def view_service_submission(framework_slug, lot_slug, service_id):
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
+    declaration_status = get_declaration_status(data_api_client, framework['slug'])
+    etag = page_etag(draft.get('updatedAt'), draft.get('status'), last_edit, validation_errors,
+                     framework['status'], declaration_status)
+    check_etag(etag)
+
     content = content_loader.get_manifest(framework['slug'], 'edit_submission').filter(draft)
 
     sections = content.summary(draft)
@@ -344,7 +579,7 @@ def view_service_submission(framework_slug, lot_slug, service_id):
     unanswered_required, unanswered_optional = count_unanswered_questions(sections)
     delete_requested = True if request.args.get('delete_requested') else False
 
-    return render_template(
+    return etag_response(etag, render_template(
         "services/service_submission.html",
         framework=framework,
         confirm_remove=request.args.get("confirm_remove", None),
@@ -357,9 +592,9 @@ def view_service_submission(framework_slug, lot_slug, service_id):
         unanswered_optional=unanswered_optional,
         can_mark_complete=not validation_errors,
         delete_requested=delete_requested,
-        declaration_status=get_declaration_status(data_api_client, framework['slug']),
+        declaration_status=declaration_status,
         dates=content_loader.get_message(framework_slug, 'dates')
-    ), 200
+    ))
 
 
 @main.route('/frameworks/<framework_slug>/submissions/<lot_slug>/<service_id>/edit/<section_id>', methods=['GET'])
@@ -444,6 +679,7 @@ def update_section_submission(framework_slug, lot_slug, service_id, section_id,
                 current_user.email_address,
                 page_questions=section.get_field_names()
             )
+            index_updated(DRAFT, service_id, update_data)
         except HTTPError as e:
             update_data = section.unformat_data(update_data)
             errors = section.get_error_messages(e.message)
@@ -514,6 +750,7 @@ def remove_subsection(framework_slug, lot_slug, service_id, section_id, question
                 update_json,
                 current_user.email_address
             )
+            index_updated(DRAFT, service_id, update_json)
             flash({'service_name': question_to_remove.label}, 'service_deleted')
         except HTTPError as e:
             if e.status_code == 400:
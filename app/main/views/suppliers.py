@@ -2,7 +2,7 @@
 
 from itertools import chain
 
-from flask import render_template, request, redirect, url_for, abort, session, Markup
+from flask import render_template, request, redirect, url_for, abort, session, Markup, jsonify
 from flask_login import current_user, current_app
 import six
 
@@ -15,10 +15,14 @@ from ...main import main, content_loader
 from ... import data_api_client
 from ..forms.suppliers import (
     EditSupplierForm, EditContactInformationForm, DunsNumberForm, CompaniesHouseNumberForm,
-    CompanyContactDetailsForm, CompanyNameForm, EmailAddressForm
+    CompanyContactDetailsForm, CompanyNameForm, DunsNumbersForm, EmailAddressForm
 )
 from ..helpers.frameworks import get_frameworks_by_status
-from ..helpers import hash_email, login_required
+from ..helpers import hash_email, login_required, request_wants_json, support_required
+from ..helpers.duns import (
+    check_duns_numbers, duns_number_registered, parse_duns_numbers, suppliers_with_duns_number
+)
+from ..helpers.wizard import clear_wizard_answers, save_wizard_answers, wizard_answers
 from .users import get_current_suppliers_users
 
 from cirrus.email import send_email
@@ -159,9 +163,10 @@ def create_new_supplier():
 @main.route('/duns-number', methods=['GET'])
 def duns_number():
     form = DunsNumberForm()
+    answers = wizard_answers()
 
-    if form.duns_number.name in session:
-        form.duns_number.data = session[form.duns_number.name]
+    if form.duns_number.name in answers:
+        form.duns_number.data = answers[form.duns_number.name]
 
     return render_template(
         "suppliers/duns_number.html",
@@ -175,8 +180,7 @@ def submit_duns_number():
 
     if form.validate_on_submit():
 
-        suppliers = data_api_client.find_suppliers(duns_number=form.duns_number.data)
-        if len(suppliers["suppliers"]) > 0:
+        if suppliers_with_duns_number(data_api_client, form.duns_number.data):
             form.duns_number.errors = ["DUNS number already used"]
             current_app.logger.warning(
                 "suppliercreate.fail: duns:{duns} {duns_errors}",
@@ -187,7 +191,9 @@ def submit_duns_number():
                 "suppliers/duns_number.html",
                 form=form
             ), 400
-        session[form.duns_number.name] = form.duns_number.data
+        answers = wizard_answers()
+        answers[form.duns_number.name] = form.duns_number.data
+        save_wizard_answers(answers)
         return redirect(url_for(".companies_house_number"))
     else:
         current_app.logger.warning(
@@ -201,12 +207,60 @@ def submit_duns_number():
         ), 400
 
 
+@main.route('/duns-numbers', methods=['GET'])
+@support_required
+def check_duns_numbers_form():
+    return render_template(
+        "suppliers/check_duns_numbers.html",
+        form=DunsNumbersForm()
+    ), 200
+
+
+@main.route('/duns-numbers', methods=['POST'])
+@support_required
+def submit_check_duns_numbers():
+    """Show which of a list of DUNS numbers already belong to a supplier."""
+    form = DunsNumbersForm()
+
+    if not form.validate_on_submit():
+        error = form.duns_numbers.errors[0]
+    else:
+        duns_numbers, invalid_duns_numbers = parse_duns_numbers(form.duns_numbers.data)
+        limit = current_app.config['DM_DUNS_CHECK_LIMIT']
+        if invalid_duns_numbers:
+            error = u"These aren't 9 digit DUNS numbers: {}".format(', '.join(invalid_duns_numbers))
+        elif len(duns_numbers) > limit:
+            error = "You can check up to {} DUNS numbers at a time".format(limit)
+        else:
+            error = None
+
+    if error:
+        if request_wants_json():
+            return jsonify(error=error), 400
+        return render_template(
+            "suppliers/check_duns_numbers.html",
+            form=form,
+            error=error
+        ), 400
+
+    results = check_duns_numbers(data_api_client, duns_numbers)
+    if request_wants_json():
+        return jsonify(results=results)
+
+    return render_template(
+        "suppliers/check_duns_numbers.html",
+        form=form,
+        results=results
+    ), 200
+
+
 @main.route('/companies-house-number', methods=['GET'])
 def companies_house_number():
     form = CompaniesHouseNumberForm()
+    answers = wizard_answers()
 
-    if form.companies_house_number.name in session:
-        form.companies_house_number.data = session[form.companies_house_number.name]
+    if form.companies_house_number.name in answers:
+        form.companies_house_number.data = answers[form.companies_house_number.name]
 
     return render_template(
         "suppliers/companies_house_number.html",
@@ -217,18 +271,20 @@ def companies_house_number():
 @main.route('/companies-house-number', methods=['POST'])
 def submit_companies_house_number():
     form = CompaniesHouseNumberForm()
+    answers = wizard_answers()
 
     if form.validate_on_submit():
         if form.companies_house_number.data:
-            session[form.companies_house_number.name] = form.companies_house_number.data
+            answers[form.companies_house_number.name] = form.companies_house_number.data
         else:
-            session.pop(form.companies_house_number.name, None)
+            answers.pop(form.companies_house_number.name, None)
+        save_wizard_answers(answers)
         return redirect(url_for(".company_name"))
     else:
         current_app.logger.warning(
             "suppliercreate.fail: duns:{duns} {duns_errors}",
             extra={
-                'duns': session.get('duns_number'),
+                'duns': answers.get('duns_number'),
                 'duns_errors': ",".join(chain.from_iterable(form.errors.values()))})
         return render_template(
             "suppliers/companies_house_number.html",
@@ -239,9 +295,10 @@ def submit_companies_house_number():
 @main.route('/company-name', methods=['GET'])
 def company_name():
     form = CompanyNameForm()
+    answers = wizard_answers()
 
-    if form.company_name.name in session:
-        form.company_name.data = session[form.company_name.name]
+    if form.company_name.name in answers:
+        form.company_name.data = answers[form.company_name.name]
 
     return render_template(
         "suppliers/company_name.html",
@@ -252,16 +309,18 @@ def company_name():
 @main.route('/company-name', methods=['POST'])
 def submit_company_name():
     form = CompanyNameForm()
+    answers = wizard_answers()
 
     if form.validate_on_submit():
-        session[form.company_name.name] = form.company_name.data
+        answers[form.company_name.name] = form.company_name.data
+        save_wizard_answers(answers)
         return redirect(url_for(".company_contact_details"))
     else:
         current_app.logger.warning(
             "suppliercreate.fail: duns:{duns} company_name:{company_name} {duns_errors}",
             extra={
-                'duns': session.get('duns_number'),
-                'company_name': session.get('company_name'),
+                'duns': answers.get('duns_number'),
+                'company_name': answers.get('company_name'),
                 'duns_errors': ",".join(chain.from_iterable(form.errors.values()))})
         return render_template(
             "suppliers/company_name.html",
@@ -272,15 +331,16 @@ def submit_company_name():
 @main.route('/company-contact-details', methods=['GET'])
 def company_contact_details():
     form = CompanyContactDetailsForm()
+    answers = wizard_answers()
 
-    if form.email_address.name in session:
-        form.email_address.data = session[form.email_address.name]
+    if form.email_address.name in answers:
+        form.email_address.data = answers[form.email_address.name]
 
-    if form.phone_number.name in session:
-        form.phone_number.data = session[form.phone_number.name]
+    if form.phone_number.name in answers:
+        form.phone_number.data = answers[form.phone_number.name]
 
-    if form.contact_name.name in session:
-        form.contact_name.data = session[form.contact_name.name]
+    if form.contact_name.name in answers:
+        form.contact_name.data = answers[form.contact_name.name]
 
     return render_template(
         "suppliers/company_contact_details.html",
@@ -291,18 +351,20 @@ def company_contact_details():
 @main.route('/company-contact-details', methods=['POST'])
 def submit_company_contact_details():
     form = CompanyContactDetailsForm()
+    answers = wizard_answers()
 
     if form.validate_on_submit():
-        session[form.email_address.name] = form.email_address.data
-        session[form.phone_number.name] = form.phone_number.data
-        session[form.contact_name.name] = form.contact_name.data
+        answers[form.email_address.name] = form.email_address.data
+        answers[form.phone_number.name] = form.phone_number.data
+        answers[form.contact_name.name] = form.contact_name.data
+        save_wizard_answers(answers)
         return redirect(url_for(".create_your_account"))
     else:
         current_app.logger.warning(
             "suppliercreate.fail: duns:{duns} company_name:{company_name} {duns_errors}",
             extra={
-                'duns': session.get('duns_number'),
-                'company_name': session.get('company_name'),
+                'duns': answers.get('duns_number'),
+                'company_name': answers.get('company_name'),
                 'duns_errors': ",".join(chain.from_iterable(form.errors.values()))})
         return render_template(
             "suppliers/company_contact_details.html",
@@ -312,27 +374,30 @@ def submit_company_contact_details():
 
 @main.route('/create-your-account', methods=['GET'])
 def create_your_account():
+    answers = wizard_answers()
     current_app.logger.info(
         "suppliercreate: get create-your-account supplier_id:{}".format(
-            session.get('email_supplier_id', 'unknown')))
+            answers.get('email_supplier_id', 'unknown')))
     form = EmailAddressForm()
 
     return render_template(
         "suppliers/create_your_account.html",
         form=form,
-        email_address=session.get('account_email_address', '')
+        email_address=answers.get('account_email_address', '')
     ), 200
 
 
 @main.route('/create-your-account', methods=['POST'])
 def submit_create_your_account():
+    answers = wizard_answers()
     current_app.logger.info(
         "suppliercreate: post create-your-account supplier_id:{}".format(
-            session.get('email_supplier_id', 'unknown')))
+            answers.get('email_supplier_id', 'unknown')))
     form = EmailAddressForm()
 
     if form.validate_on_submit():
-        session['account_email_address'] = form.email_address.data
+        answers['account_email_address'] = form.email_address.data
+        save_wizard_answers(answers)
         return redirect(url_for(".company_summary"))
     else:
         return render_template(
@@ -345,12 +410,14 @@ def submit_create_your_account():
 @main.route('/company-summary', methods=['GET'])
 def company_summary():
     return render_template(
-        "suppliers/company_summary.html"
+        "suppliers/company_summary.html",
+        answers=wizard_answers()
     ), 200
 
 
 @main.route('/company-summary', methods=['POST'])
 def submit_company_summary():
+    answers = wizard_answers()
 
     required_fields = [
         "email_address",
@@ -361,34 +428,39 @@ def submit_company_summary():
         "account_email_address"
     ]
 
-    missing_fields = [field for field in required_fields if field not in session]
+    missing_fields = [field for field in required_fields if field not in answers]
 
     if not missing_fields:
         supplier = {
-            "name": session["company_name"],
-            "dunsNumber": str(session["duns_number"]),
+            "name": answers["company_name"],
+            "dunsNumber": str(answers["duns_number"]),
             "contactInformation": [{
-                "email": session["email_address"],
-                "phoneNumber": session["phone_number"],
-                "contactName": session["contact_name"]
+                "email": answers["email_address"],
+                "phoneNumber": answers["phone_number"],
+                "contactName": answers["contact_name"]
             }]
         }
 
-        if session.get("companies_house_number", None):
-            supplier["companiesHouseNumber"] = session.get("companies_house_number")
+        if answers.get("companies_house_number", None):
+            supplier["companiesHouseNumber"] = answers.get("companies_house_number")
 
-        account_email_address = session.get("account_email_address", None)
+        account_email_address = answers.get("account_email_address", None)
 
         supplier = data_api_client.create_supplier(supplier)
+        duns_number_registered(answers["duns_number"], supplier['suppliers'])
+        clear_wizard_answers()
         session.clear()
-        session['email_company_name'] = supplier['suppliers']['name']
-        session['email_supplier_id'] = supplier['suppliers']['id']
+        answers = {
+            'email_company_name': supplier['suppliers']['name'],
+            'email_supplier_id': supplier['suppliers']['id'],
+        }
+        save_wizard_answers(answers)
 
         token = generate_token(
             {
                 "email_address":  account_email_address,
-                "supplier_id": session['email_supplier_id'],
-                "supplier_name": session['email_company_name']
+                "supplier_id": answers['email_supplier_id'],
+                "supplier_name": answers['email_company_name']
             },
             current_app.config['SHARED_EMAIL_KEY'],
             current_app.config['INVITE_EMAIL_SALT']
@@ -398,7 +470,7 @@ def submit_company_summary():
 
         email_body = render_template(
             "emails/create_user_email.html",
-            company_name=session['email_company_name'],
+            company_name=answers['email_company_name'],
             url=url
         )
         try:
@@ -410,39 +482,39 @@ def submit_company_summary():
                 current_app.config['RESET_PASSWORD_EMAIL_NAME'],
                 ["user-creation"]
             )
-            session['email_sent_to'] = account_email_address
+            answers['email_sent_to'] = account_email_address
+            save_wizard_answers(answers)
         except Exception as e:
             current_app.logger.error(
                 "suppliercreate.fail: Create user email failed to send. "
                 "error {error} supplier_id {supplier_id} email_hash {email_hash}",
                 extra={
                     'error': six.text_type(e),
-                    'supplier_id': session['email_supplier_id'],
+                    'supplier_id': answers['email_supplier_id'],
                     'email_hash': hash_email(account_email_address)})
             abort(503, "Failed to send user creation email")
 
         data_api_client.create_audit_event(
             audit_type=AuditTypes.invite_user,
             object_type='suppliers',
-            object_id=session['email_supplier_id'],
+            object_id=answers['email_supplier_id'],
             data={'invitedEmail': account_email_address})
 
         return redirect(url_for('.create_your_account_complete'), 302)
     else:
         return render_template(
             "suppliers/company_summary.html",
+            answers=answers,
             missing_fields=missing_fields
         ), 400
 
 
 @main.route('/create-your-account-complete', methods=['GET'])
 def create_your_account_complete():
-    if 'email_sent_to' in session:
-        email_address = session['email_sent_to']
-    else:
-        email_address = "the email address you supplied"
+    email_address = wizard_answers().get('email_sent_to', "the email address you supplied")
+    clear_wizard_answers()
     session.clear()
-    session['email_sent_to'] = email_address
+    save_wizard_answers({'email_sent_to': email_address})
     return render_template(
         "suppliers/create_your_account_complete.html",
         email_address=email_address
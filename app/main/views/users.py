@@ -2,17 +2,14 @@ from flask_login import current_user
 from flask import render_template, abort, flash, url_for, redirect, current_app
 
 from ..helpers import login_required
+from ..helpers.users import find_supplier_user, get_supplier_users, supplier_users_changed
 from ...main import main
 from ... import data_api_client
 
 
 def get_current_suppliers_users():
 
-    users = data_api_client.find_users(
-        supplier_id=current_user.supplier_id
-    ).get('users')
-
-    active_users = [user for user in users if user['active']]
+    active_users = list(get_supplier_users(data_api_client, current_user.supplier_id))
 
     for index, user in enumerate(active_users):
         if user['id'] == current_user.id:
@@ -48,9 +45,9 @@ def deactivate_user(user_id):
         abort(404)
 
     # check that user exists
-    user_to_deactivate = data_api_client.get_user(user_id=user_id)
+    user_to_deactivate = find_supplier_user(data_api_client, current_user.supplier_id, user_id)
 
-    if not user_to_deactivate or not user_to_deactivate.get('users'):
+    if not user_to_deactivate:
         current_app.logger.error(
             "deactivate_user user to deactivate not found, "
             "user_id={user_id} supplier_id={supplier_id} user_id_to_deactivate={to_deactivate}",
@@ -59,11 +56,9 @@ def deactivate_user(user_id):
                 'to_deactivate': user_id})
         abort(404)
 
-    user_to_deactivate = user_to_deactivate.get('users')
-
     # check that user to deactivate belongs to supplier of current user
     if user_to_deactivate['role'] != 'supplier' \
-            or user_to_deactivate['supplier']['supplierId'] != current_user.supplier_id:
+            or user_to_deactivate['supplierId'] != current_user.supplier_id:
         current_app.logger.error(
             "deactivate_user cannot deactivate another suppliers' users, "
             "user_id={user_id} supplier_id={supplier_id} user_id_to_deactivate={to_deactivate}",
@@ -73,6 +68,7 @@ def deactivate_user(user_id):
         abort(404)
 
     data_api_client.update_user(user_id=user_to_deactivate['id'], active=False, updater=current_user.email_address)
+    supplier_users_changed(current_user.supplier_id)
 
     flash({
         'deactivate_user_name': user_to_deactivate['name'],
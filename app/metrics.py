@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""In-process timing of the upstream calls made while serving a request.
+
+Calls to the data API, S3, the content loader, the declaration validators and
+Jinja are timed and added up per request. At the end of the request the totals
+go into per-endpoint histograms, which `/_metrics` serves in the Prometheus
+text format when DM_METRICS_ENDPOINT_ENABLED is set.
+
+Recording a call takes a dictionary update, and the histograms are only
+touched once per request, so this can stay on in production.
+"""
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+import jinja2
+from flask import g, has_app_context, request
+
+COMPONENTS = ('api', 's3', 'content', 'validate', 'render')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = 'supplier_frontend'
+
+_local = threading.local()
+
+
+class Histogram(object):
+    """Bucketed counts of observed durations, in seconds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the final slot counts observations above the largest bucket (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        total = 0
+        for upper_bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield upper_bound, total
+
+
+class RequestTimings(object):
+    """Time spent in each upstream component during a single request."""
+
+    def __init__(self):
+        self.started = default_timer()
+        self.durations = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def record(self, component, duration):
+        with self._lock:
+            self.durations[component] = self.durations.get(component, 0.0) + duration
+            self.calls[component] = self.calls.get(component, 0) + 1
+
+    def elapsed(self):
+        return default_timer() - self.started
+
+
+class MetricsRegistry(object):
+    """Per-endpoint histograms of request and component durations."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._components = {}
+        self._calls = {}
+
+    def observe_request(self, endpoint, timings, duration):
+        with self._lock:
+            self._histogram(self._requests, endpoint).observe(duration)
+            for component, component_duration in timings.durations.items():
+                key = (endpoint, component)
+                self._histogram(self._components, key).observe(component_duration)
+                self._calls[key] = self._calls.get(key, 0) + timings.calls[component]
+
+    def _histogram(self, histograms, key):
+        if key not in histograms:
+            histograms[key] = Histogram(self.buckets)
+        return histograms[key]
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+
+            name = '{}_request_duration_seconds'.format(METRIC_PREFIX)
+            lines.append('# HELP {} Time taken to serve a request.'.format(name))
+            lines.append('# TYPE {} histogram'.format(name))
+            for endpoint, histogram in sorted(self._requests.items()):
+                lines.extend(_histogram_lines(name, {'endpoint': endpoint}, histogram))
+
+            name = '{}_upstream_duration_seconds'.format(METRIC_PREFIX)
+            lines.append('# HELP {} Time spent in an upstream component per request.'.format(name))
+            lines.append('# TYPE {} histogram'.format(name))
+            for (endpoint, component), histogram in sorted(self._components.items()):
+                labels = {'endpoint': endpoint, 'component': component}
+                lines.extend(_histogram_lines(name, labels, histogram))
+
+            name = '{}_upstream_calls_total'.format(METRIC_PREFIX)
+            lines.append('# HELP {} Number of calls made to an upstream component.'.format(name))
+            lines.append('# TYPE {} counter'.format(name))
+            for (endpoint, component), count in sorted(self._calls.items()):
+                labels = {'endpoint': endpoint, 'component': component}
+                lines.append('{}{} {}'.format(name, _format_labels(labels), count))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name, labels, histogram):
+    for upper_bound, count in histogram.cumulative_counts():
+        bucket_labels = dict(labels, le='+Inf' if upper_bound == float('inf') else repr(upper_bound))
+        yield '{}_bucket{} {}'.format(name, _format_labels(bucket_labels), count)
+    yield '{}_sum{} {!r}'.format(name, _format_labels(labels), histogram.sum)
+    yield '{}_count{} {}'.format(name, _format_labels(labels), histogram.count)
+
+
+def _format_labels(labels):
+    return '{{{}}}'.format(','.join(
+        '{}="{}"'.format(key, _escape_label_value(labels[key])) for key in sorted(labels)
+    ))
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def server_timing_header(timings):
+    """Format request timings as a `Server-Timing` header value, in milliseconds."""
+    metrics = []
+    for component in COMPONENTS:
+        if component in timings.calls:
+            calls = timings.calls[component]
+            metrics.append('{};dur={:.1f};desc="{} call{}"'.format(
+                component, timings.durations[component] * 1000, calls, '' if calls == 1 else 's'
+            ))
+    metrics.append('total;dur={:.1f}'.format(timings.elapsed() * 1000))
+    return ', '.join(metrics)
+
+
+def current_timings():
+    """The timings for the request being served by this thread, if any."""
+    timings = getattr(_local, 'timings', None)
+    if timings is None and has_app_context():
+        timings = getattr(g, '_request_timings', None)
+    return timings
+
+
+@contextmanager
+def bind_timings(timings):
+    """Record timers in this thread against `timings`.
+
+    For worker threads doing part of a request's work, which otherwise
+    wouldn't see the request's timings.
+    """
+    previous = getattr(_local, 'timings', None)
+    _local.timings = timings
+    try:
+        yield
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def timer(component):
+    """Add the time spent inside the block to `component` for this request.
+
+    Nested timers for the same component only count the outermost block, so
+    a validator method calling another validator method isn't counted twice.
+    """
+    active = _active_components()
+    if component in active:
+        yield
+        return
+
+    active.add(component)
+    start = default_timer()
+    try:
+        yield
+    finally:
+        active.discard(component)
+        timings = current_timings()
+        if timings is not None:
+            timings.record(component, default_timer() - start)
+
+
+def timed(component):
+    """Decorator version of `timer`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(component):
+                return func(*args, **kwargs)
+        wrapper._dm_timed = True
+        return wrapper
+    return decorator
+
+
+def instrument(target, component, names=None):
+    """Wrap the public methods of an object or class with a `timer`.
+
+    Safe to call more than once on the same target, which happens whenever
+    `create_app` is called again (eg in tests).
+    """
+    if names is None:
+        names = [name for name in dir(target) if not name.startswith('_')]
+
+    for name in names:
+        method = vars(target).get(name) if isinstance(target, type) else None
+        if method is None:
+            method = getattr(target, name, None)
+            if isinstance(target, type) and getattr(method, '__self__', None) is not None:
+                # an inherited classmethod
+                continue
+        if not callable(method) or isinstance(method, (type, staticmethod, classmethod)) or \
+                getattr(method, '_dm_timed', False) is True:
+            continue
+        setattr(target, name, timed(component)(method))
+
+
+class TimedTemplate(jinja2.Template):
+    def render(self, *args, **kwargs):
+        with timer('render'):
+            return super(TimedTemplate, self).render(*args, **kwargs)
+
+
+def _active_components():
+    active = getattr(_local, 'active', None)
+    if active is None:
+        active = _local.active = set()
+    return active
+
+
+def init_app(application, data_api_client=None, content_loader=None):
+    if not application.config.get('DM_REQUEST_METRICS_ENABLED'):
+        return
+
+    from dmutils import s3
+    from dmutils.content_loader import ContentManifest
+
+    registry = MetricsRegistry()
+    application.extensions['metrics'] = registry
+
+    if data_api_client is not None:
+        instrument(data_api_client, 'api', [
+            name for name in dir(data_api_client) if not name.startswith('_') and name != 'init_app'
+        ])
+    if content_loader is not None:
+        instrument(content_loader, 'content', ['get_manifest', 'get_message', 'get_question'])
+    instrument(ContentManifest, 'content', ['filter', 'summary'])
+    instrument(s3.S3, 's3')
+
+    application.jinja_env.template_class = TimedTemplate
+
+    @application.before_request
+    def start_request_timings():
+        g._request_timings = RequestTimings()
+
+    @application.teardown_request
+    def record_request_timings(exception=None):
+        timings = getattr(g, '_request_timings', None)
+        if timings is not None and request.endpoint is not None:
+            registry.observe_request(request.endpoint, timings, timings.elapsed())
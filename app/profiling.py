@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Opt-in statistical profiling of individual requests.
+
+A profiled request has a background thread that samples its stack at a fixed
+interval. When the request is torn down the samples are written out in the
+collapsed-stack format used by flamegraph.pl and speedscope, one file per
+request, to DM_PROFILER_OUTPUT_DIR.
+
+A request is profiled when it is picked at random (DM_PROFILER_SAMPLE_RATE)
+or when it carries an `X-Profile-Request` header signed with
+`sign_profile_request`.
+"""
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from timeit import default_timer
+
+from flask import g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+PROFILE_REQUEST_HEADER = 'X-Profile-Request'
+PROFILE_REQUEST_SALT = 'ProfileRequestSalt'
+MAX_INTERVAL = 0.5
+
+
+class SamplingProfiler(object):
+    """Samples the stack of a single thread from a background thread.
+
+    If taking samples uses more than `max_overhead` of the wall clock time
+    since the profiler started, the sampling interval is doubled (up to
+    MAX_INTERVAL) so a slow stack walk can't slow the request down much.
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_overhead=0.05):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.samples = Counter()
+        self.overhead = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler')
+        self._thread.daemon = True
+
+    def start(self):
+        self.started = default_timer()
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            sample_started = default_timer()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.samples[collapse_stack(frame)] += 1
+            del frame
+
+            now = default_timer()
+            self.overhead += now - sample_started
+            if self.overhead > self.max_overhead * (now - self.started):
+                self.interval = min(self.interval * 2, MAX_INTERVAL)
+
+    def collapsed(self):
+        """The samples as `frame;frame;frame count` lines."""
+        return ''.join(
+            '{} {}\n'.format(stack, count) for stack, count in sorted(self.samples.items())
+        )
+
+
+def collapse_stack(frame):
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append('{} ({}:{})'.format(code.co_name, _short_filename(code.co_filename), frame.f_lineno))
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+def _short_filename(filename):
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            return filename[len(path) + 1:]
+    return filename
+
+
+def sign_profile_request(secret_key, label):
+    """Value for the `X-Profile-Request` header, eg for a support engineer."""
+    return TimestampSigner(secret_key, salt=PROFILE_REQUEST_SALT).sign(label).decode('utf-8')
+
+
+def has_valid_profile_request_header(secret_key, max_age):
+    value = request.headers.get(PROFILE_REQUEST_HEADER)
+    if not value or not secret_key:
+        return False
+    try:
+        TimestampSigner(secret_key, salt=PROFILE_REQUEST_SALT).unsign(value, max_age=max_age)
+    except BadSignature:
+        return False
+    return True
+
+
+def profile_filename(endpoint):
+    return '{}-{}-{}-{}.collapsed'.format(
+        datetime.utcnow().strftime('%Y%m%dT%H%M%S.%f'),
+        os.getpid(),
+        threading.current_thread().ident,
+        (endpoint or 'unknown').replace('.', '-'),
+    )
+
+
+def init_app(application):
+    if not application.config.get('DM_PROFILER_ENABLED'):
+        return
+
+    config = application.config
+    secret_key = config['DM_PROFILER_SECRET'] or config['SECRET_KEY']
+    # Never have more than this many requests profiled at the same time
+    running = threading.BoundedSemaphore(config['DM_PROFILER_MAX_CONCURRENT'])
+
+    @application.before_request
+    def start_profiler():
+        if not (random.random() < config['DM_PROFILER_SAMPLE_RATE'] or
+                has_valid_profile_request_header(secret_key, config['DM_PROFILER_SIGNATURE_MAX_AGE'])):
+            return
+        if not running.acquire(False):
+            return
+
+        profiler = SamplingProfiler(
+            threading.current_thread().ident,
+            interval=config['DM_PROFILER_INTERVAL'],
+            max_overhead=config['DM_PROFILER_MAX_OVERHEAD'],
+        )
+        profiler.start()
+        g._profiler = profiler
+
+    @application.teardown_request
+    def write_profile(exception=None):
+        profiler = getattr(g, '_profiler', None)
+        if profiler is None:
+            return
+        g._profiler = None
+
+        try:
+            profiler.stop()
+            output_dir = config['DM_PROFILER_OUTPUT_DIR']
+            if not os.path.isdir(output_dir):
+                os.makedirs(output_dir)
+            with open(os.path.join(output_dir, profile_filename(request.endpoint)), 'w') as f:
+                f.write(profiler.collapsed())
+        except (IOError, OSError) as e:
+            application.logger.error(
+                "profiler.write_failed: {error}", extra={'error': str(e)})
+        finally:
+            running.release()
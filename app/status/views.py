@@ -1,4 +1,6 @@
-from flask import jsonify, current_app, request
+import hmac
+
+from flask import jsonify, current_app, request, abort, Response
 
 from . import status
 from .. import data_api_client
@@ -31,3 +33,22 @@ def status():
         message="Error connecting to the (Data) API.",
         flags=get_flags(current_app)
     ), 500
+
+
+@status.route('/_metrics')
+def metrics():
+    """Request timings in the Prometheus text format.
+
+    Off unless DM_METRICS_ENDPOINT_ENABLED is set. If DM_METRICS_AUTH_TOKEN is
+    set too, it has to be sent as `Authorization: Bearer <token>`.
+    """
+    registry = current_app.extensions.get('metrics')
+    if registry is None or not current_app.config['DM_METRICS_ENDPOINT_ENABLED']:
+        abort(404)
+
+    token = current_app.config['DM_METRICS_AUTH_TOKEN']
+    if token and not hmac.compare_digest(
+            request.headers.get('Authorization', '').encode('utf-8'), 'Bearer {}'.format(token).encode('utf-8')):
+        abort(403)
+
+    return Response(registry.render(), mimetype='text/plain')
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Realistic, deterministic API payloads for the benchmark stubs."""
+from datetime import datetime, timedelta
+
+SUPPLIER_ID = 1234
+USER_ID = 123
+BRIEF_ID = 1
+
+G7_LOTS = [
+    {'id': 1, 'slug': 'iaas', 'name': 'Infrastructure as a Service', 'oneServiceLimit': False},
+    {'id': 2, 'slug': 'paas', 'name': 'Platform as a Service', 'oneServiceLimit': False},
+    {'id': 3, 'slug': 'saas', 'name': 'Software as a Service', 'oneServiceLimit': False},
+    {'id': 4, 'slug': 'scs', 'name': 'Specialist Cloud Services', 'oneServiceLimit': False},
+]
+
+DOS_LOTS = [
+    {'id': 5, 'slug': 'digital-outcomes', 'name': 'Digital outcomes', 'oneServiceLimit': True},
+    {'id': 6, 'slug': 'digital-specialists', 'name': 'Digital specialists', 'oneServiceLimit': True},
+]
+
+BASE_DATE = datetime(2016, 3, 1, 9, 0, 0)
+
+
+def _timestamp(offset_minutes):
+    return (BASE_DATE + timedelta(minutes=offset_minutes)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def user(user_id=USER_ID, supplier_id=SUPPLIER_ID, active=True):
+    return {
+        'id': user_id,
+        'name': 'User {}'.format(user_id),
+        'emailAddress': 'user-{}@example.com'.format(user_id),
+        'role': 'supplier',
+        'locked': False,
+        'active': active,
+        'loggedInAt': _timestamp(user_id),
+        'passwordChangedAt': _timestamp(0),
+        'supplier': {'supplierId': supplier_id, 'name': 'Supplier {}'.format(supplier_id)},
+    }
+
+
+def users(count, supplier_id=SUPPLIER_ID):
+    return [user(USER_ID, supplier_id)] + [
+        user(USER_ID + index, supplier_id, active=bool(index % 5)) for index in range(1, count)
+    ]
+
+
+def supplier(supplier_id=SUPPLIER_ID):
+    return {
+        'id': supplier_id,
+        'name': 'Supplier {}'.format(supplier_id),
+        'description': 'A supplier with a large catalogue of services. ' * 5,
+        'dunsNumber': '{:09d}'.format(supplier_id),
+        'companiesHouseNumber': '{:08d}'.format(supplier_id),
+        'contactInformation': [{
+            'id': 1,
+            'contactName': 'Contact Name',
+            'email': 'contact@example.com',
+            'phoneNumber': '020 7946 0000',
+            'website': 'https://example.com',
+        }],
+        'clients': ['Client {}'.format(index) for index in range(10)],
+    }
+
+
+def framework(slug='g-cloud-7', status='open'):
+    return {
+        'slug': slug,
+        'name': 'G-Cloud 7' if slug == 'g-cloud-7' else 'Digital Outcomes and Specialists',
+        'framework': 'g-cloud' if slug == 'g-cloud-7' else 'dos',
+        'status': status,
+        'clarificationQuestionsOpen': True,
+        'lots': G7_LOTS if slug == 'g-cloud-7' else DOS_LOTS,
+    }
+
+
+def frameworks():
+    return [
+        framework('g-cloud-7', 'open'),
+        framework('digital-outcomes-and-specialists', 'live'),
+    ]
+
+
+def supplier_frameworks(drafts_count):
+    return [{
+        'frameworkSlug': 'g-cloud-7',
+        'supplierId': SUPPLIER_ID,
+        'declaration': {'status': 'complete'},
+        'onFramework': False,
+        'agreementReturned': False,
+        'drafts_count': drafts_count,
+        'complete_drafts_count': drafts_count // 2,
+        'services_count': 0,
+    }, {
+        'frameworkSlug': 'digital-outcomes-and-specialists',
+        'supplierId': SUPPLIER_ID,
+        'declaration': {'status': 'complete'},
+        'onFramework': True,
+        'agreementReturned': True,
+        'drafts_count': 0,
+        'complete_drafts_count': 0,
+        'services_count': 2,
+    }]
+
+
+def draft_service(draft_id, lot=None, status=None):
+    lot = lot or G7_LOTS[draft_id % len(G7_LOTS)]
+    return {
+        'id': draft_id,
+        'supplierId': SUPPLIER_ID,
+        'supplierName': 'Supplier {}'.format(SUPPLIER_ID),
+        'frameworkSlug': 'g-cloud-7',
+        'frameworkName': 'G-Cloud 7',
+        'lot': lot['slug'],
+        'lotName': lot['name'],
+        'status': status or ('submitted' if draft_id % 2 else 'not-submitted'),
+        'serviceName': 'Draft service {}'.format(draft_id),
+        'serviceSummary': 'A service that does a great many things. ' * 10,
+        'serviceFeatures': ['Feature {}'.format(index) for index in range(10)],
+        'serviceBenefits': ['Benefit {}'.format(index) for index in range(10)],
+        'priceMin': '{}.00'.format(draft_id % 100 + 1),
+        'priceMax': '{}.00'.format(draft_id % 100 + 100),
+        'priceUnit': 'Person',
+        'priceInterval': 'Day',
+        'vatIncluded': True,
+        'educationPricing': False,
+        'trialOption': True,
+        'freeOption': False,
+        'createdAt': _timestamp(draft_id),
+        'updatedAt': _timestamp(draft_id * 2),
+    }
+
+
+def draft_services(count):
+    return [draft_service(draft_id) for draft_id in range(1, count + 1)]
+
+
+def service(service_id):
+    return dict(
+        draft_service(service_id, status='published'),
+        id=str(2000000000000000 + service_id),
+        frameworkSlug='g-cloud-6' if service_id % 3 else 'g-cloud-7',
+        frameworkName='G-Cloud 6' if service_id % 3 else 'G-Cloud 7',
+        serviceName='Service {}'.format(service_id),
+    )
+
+
+def services(count):
+    return [service(service_id) for service_id in range(1, count + 1)]
+
+
+def declaration():
+    # Imported here so the fixtures module doesn't require the test suite
+    from tests.app.helpers import FULL_G7_SUBMISSION
+    return dict(FULL_G7_SUBMISSION)
+
+
+def communications_files(framework_slug, count):
+    files = [{
+        'path': '{}/communications/{}-supplier-pack.zip'.format(framework_slug, framework_slug),
+        'filename': '{}-supplier-pack'.format(framework_slug),
+        'ext': 'zip',
+        'last_modified': _timestamp(0),
+        'size': 1024 * 1024,
+    }]
+    for index in range(count):
+        kind = 'communications' if index % 2 else 'clarifications'
+        files.append({
+            'path': '{}/communications/updates/{}/update-{}-2016-03-{:02d}-0900.pdf'.format(
+                framework_slug, kind, index, index % 28 + 1),
+            'filename': 'update-{}'.format(index),
+            'ext': 'pdf',
+            'last_modified': _timestamp(index),
+            'size': 20 * 1024,
+        })
+    return files
+
+
+def brief(brief_id=BRIEF_ID):
+    return {
+        'id': brief_id,
+        'title': 'Brief {}'.format(brief_id),
+        'status': 'live',
+        'frameworkSlug': 'digital-outcomes-and-specialists',
+        'frameworkName': 'Digital Outcomes and Specialists',
+        'lotSlug': 'digital-specialists',
+        'lotName': 'Digital specialists',
+        'specialistRole': 'developer',
+        'location': 'London',
+        'essentialRequirements': ['Essential requirement {}'.format(index) for index in range(10)],
+        'niceToHaveRequirements': ['Nice to have requirement {}'.format(index) for index in range(10)],
+        'clarificationQuestionsAreClosed': False,
+        'clarificationQuestionsPublishedBy': _timestamp(60 * 24 * 7),
+        'clarificationQuestions': [],
+        'users': [{'id': 9, 'emailAddress': 'buyer@example.com', 'active': True}],
+        'createdAt': _timestamp(0),
+        'updatedAt': _timestamp(10),
+        'publishedAt': _timestamp(10),
+    }
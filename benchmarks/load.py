@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Throughput and latency of the main supplier journeys.
+
+Runs the real app in-process against the stub data API and S3 from
+`benchmarks.stubs`, with a fixed delay on every upstream call, and drives each
+journey from several threads at once.
+
+    python -m benchmarks.load --requests 200 --concurrency 4 --latency 0.02
+    python -m benchmarks.load --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load --compare benchmarks/baseline.json --tolerance 20
+"""
+from __future__ import print_function
+
+import argparse
+import itertools
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+
+from . import fixtures, stubs
+
+SUCCESS_STATUS_CODES = (200, 302)
+
+
+def dashboard(client, context):
+    return client.get('/suppliers')
+
+
+def lot_listing(client, context):
+    return client.get('/suppliers/frameworks/g-cloud-7/submissions/iaas')
+
+
+def declaration_save(client, context):
+    return client.post(
+        '/suppliers/frameworks/g-cloud-7/declaration/{}'.format(context['declaration_section'].id),
+        data=context['declaration_answers'],
+    )
+
+
+def draft_edit(client, context):
+    return client.post(
+        '/suppliers/frameworks/g-cloud-7/submissions/iaas/{}/edit/{}'.format(
+            context['draft_id'], context['draft_section'].id),
+        data={'serviceName': 'Benchmark service'},
+    )
+
+
+def bulk_complete(client, context):
+    return client.post(
+        '/suppliers/frameworks/g-cloud-7/submissions/iaas/bulk',
+        data={'action': 'complete', 'draft_id': context['bulk_draft_ids']},
+    )
+
+
+def brief_response(client, context):
+    return client.get('/suppliers/opportunities/{}/responses/create'.format(fixtures.BRIEF_ID))
+
+
+def brief_response_uncached(client, context):
+    # A brief that hasn't been seen before, so every API call is made
+    return client.get('/suppliers/opportunities/{}/responses/create'.format(next(context['new_brief_ids'])))
+
+
+JOURNEYS = OrderedDict([
+    ('dashboard', dashboard),
+    ('lot_listing', lot_listing),
+    ('declaration_save', declaration_save),
+    ('draft_edit', draft_edit),
+    ('bulk_complete', bulk_complete),
+    ('brief_response', brief_response),
+    ('brief_response_uncached', brief_response_uncached),
+])
+
+
+def journey_context(stub_api):
+    from app.main import content_loader
+
+    declaration = content_loader.get_manifest('g-cloud-7', 'declaration')
+    declaration_section = declaration.get_section(declaration.get_next_editable_section_id())
+    draft = next(draft for draft in stub_api.drafts if draft['lot'] == 'iaas')
+    submission = content_loader.get_manifest('g-cloud-7', 'edit_submission').filter(draft)
+
+    return {
+        'declaration_section': declaration_section,
+        'declaration_answers': {
+            question_id: stub_api.declaration[question_id]
+            for question_id in declaration_section.get_question_ids() if question_id in stub_api.declaration
+        },
+        'draft_id': draft['id'],
+        'draft_section': submission.get_section(submission.get_next_editable_section_id()),
+        'bulk_draft_ids': [str(draft['id']) for draft in stub_api.drafts if draft['lot'] == 'iaas'][:20],
+        'new_brief_ids': itertools.count(fixtures.BRIEF_ID + 1),
+    }
+
+
+def create_benchmark_app(stub_api, communications_files):
+    import app
+    from tests import login_for_tests
+
+    uninstall = stubs.install(app.data_api_client, stub_api, communications_files=communications_files)
+    application = app.create_app('test')
+    application.register_blueprint(login_for_tests)
+
+    return application, uninstall
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    rank = int(math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def run_journey(application, journey, context, requests, concurrency, warmup):
+    lock = threading.Lock()
+    remaining = [requests]
+    durations = []
+    errors = []
+
+    def worker():
+        client = application.test_client()
+        client.get('/auto-login')
+        for _ in range(warmup):
+            journey(client, context)
+
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+
+            started = default_timer()
+            try:
+                status_code = journey(client, context).status_code
+            except Exception as e:
+                status_code = repr(e)
+            duration = default_timer() - started
+
+            with lock:
+                durations.append(duration)
+                if status_code not in SUCCESS_STATUS_CODES:
+                    errors.append(status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = default_timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = default_timer() - started
+
+    durations.sort()
+    return {
+        'requests': len(durations),
+        'errors': len(errors),
+        'throughput': len(durations) / elapsed,
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+        'p99': percentile(durations, 99),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against a baseline and return the regressed journeys."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        p95_change = (result['p95'] - previous['p95']) / previous['p95'] * 100
+        throughput_change = (result['throughput'] - previous['throughput']) / previous['throughput'] * 100
+        print('{:<24} p95 {:+7.1f}%   throughput {:+7.1f}%'.format(name, p95_change, throughput_change))
+        if p95_change > tolerance or throughput_change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results):
+    print('{:<24} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9}'.format(
+        'journey', 'reqs', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for name, result in results.items():
+        print('{:<24} {:>6} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}'.format(
+            name, result['requests'], result['errors'], result['throughput'],
+            result['p50'] * 1000, result['p95'] * 1000, result['p99'] * 1000))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--journeys', nargs='+', choices=list(JOURNEYS), default=list(JOURNEYS))
+    parser.add_argument('--requests', type=int, default=100, help='requests per journey')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=2, help='unmeasured requests per thread')
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds added to every upstream call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds per call')
+    parser.add_argument('--drafts', type=int, default=200)
+    parser.add_argument('--services', type=int, default=100)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--files', type=int, default=50, help='communications files per framework')
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--compare', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=20.0,
+                        help='percentage change in p95 or throughput that counts as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    settings = {
+        key: getattr(args, key)
+        for key in ('requests', 'concurrency', 'latency', 'jitter', 'drafts', 'services', 'users', 'files')
+    }
+
+    stub_api = stubs.StubDataAPIClient(
+        stubs.Latency(args.latency, args.jitter, seed=1),
+        drafts=args.drafts, services=args.services, users=args.users,
+    )
+    application, uninstall = create_benchmark_app(stub_api, args.files)
+    try:
+        with application.app_context():
+            context = journey_context(stub_api)
+        results = OrderedDict(
+            (name, run_journey(application, JOURNEYS[name], context, args.requests, args.concurrency, args.warmup))
+            for name in args.journeys
+        )
+    finally:
+        uninstall()
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'settings': settings, 'results': results}, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['settings'] != settings:
+            print('Warning: baseline was recorded with different settings: {}'.format(baseline['settings']))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('Regressed: {}'.format(', '.join(regressions)))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Stand-ins for the data API and S3 that respond after a configurable delay.
+
+`install` swaps the stub methods onto the app's real `data_api_client` and
+replaces `dmutils.s3.S3`, so the whole of the app (views, helpers,
+instrumentation) runs unchanged on top of them.
+"""
+import random
+import time
+from copy import deepcopy
+
+from dmutils import s3
+
+from . import fixtures
+
+
+class Latency(object):
+    """A fixed delay, in seconds, plus up to `jitter` seconds of random delay."""
+
+    def __init__(self, delay=0.0, jitter=0.0, seed=None):
+        self.delay = delay
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def wait(self):
+        delay = self.delay + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+
+class StubDataAPIClient(object):
+
+    def __init__(self, latency=None, drafts=100, services=50, users=10):
+        self.latency = latency or Latency()
+        self.drafts = fixtures.draft_services(drafts)
+        self.services = fixtures.services(services)
+        self.users = fixtures.users(users)
+        self.declaration = fixtures.declaration()
+
+    def _respond(self, payload):
+        self.latency.wait()
+        # The app sometimes mutates responses, so never hand out shared data
+        return deepcopy(payload)
+
+    def get_status(self):
+        return self._respond({'status': 'ok'})
+
+    def get_user(self, user_id=None, email_address=None):
+        if email_address is not None:
+            matching = [user for user in self.users if user['emailAddress'] == email_address]
+            return self._respond({'users': matching[0]}) if matching else self._respond(None)
+        return self._respond({'users': fixtures.user(user_id or fixtures.USER_ID)})
+
+    def find_users(self, supplier_id=None):
+        return self._respond({'users': self.users})
+
+    def update_user(self, user_id, **kwargs):
+        return self._respond({'users': fixtures.user(user_id)})
+
+    def get_supplier(self, supplier_id):
+        return self._respond({'suppliers': fixtures.supplier(supplier_id)})
+
+    def find_suppliers(self, duns_number=None, **kwargs):
+        return self._respond({'suppliers': []})
+
+    def find_frameworks(self):
+        return self._respond({'frameworks': fixtures.frameworks()})
+
+    def get_framework(self, framework_slug):
+        return self._respond({'frameworks': fixtures.framework(framework_slug)})
+
+    def get_supplier_frameworks(self, supplier_id):
+        return self._respond({'frameworkInterest': fixtures.supplier_frameworks(len(self.drafts))})
+
+    def get_supplier_framework_info(self, supplier_id, framework_slug):
+        return self._respond({'frameworkInterest': {
+            'frameworkSlug': framework_slug,
+            'supplierId': supplier_id,
+            'declaration': self.declaration,
+            'onFramework': False,
+            'agreementReturned': False,
+        }})
+
+    def register_framework_interest(self, supplier_id, framework_slug, user):
+        return self._respond({})
+
+    def get_supplier_declaration(self, supplier_id, framework_slug):
+        return self._respond({'declaration': self.declaration})
+
+    def set_supplier_declaration(self, supplier_id, framework_slug, declaration, user):
+        return self._respond({'declaration': declaration})
+
+    def find_draft_services(self, supplier_id, service_id=None, framework=None):
+        return self._respond({'services': self.drafts})
+
+    def get_draft_service(self, draft_id):
+        draft = self.drafts[(int(draft_id) - 1) % len(self.drafts)]
+        return self._respond({
+            'services': draft,
+            'auditEvents': {'createdAt': draft['updatedAt'], 'userName': 'User'},
+            'validationErrors': {},
+        })
+
+    def update_draft_service(self, draft_id, service, user, page_questions=None):
+        draft = self.drafts[(int(draft_id) - 1) % len(self.drafts)]
+        return self._respond({'services': dict(draft, **service)})
+
+    def create_new_draft_service(self, framework_slug, lot, supplier_id, data, user, page_questions=None):
+        return self._respond({'services': dict(fixtures.draft_service(len(self.drafts) + 1), **data)})
+
+    def copy_draft_service(self, draft_id, user):
+        return self._respond({'services': fixtures.draft_service(len(self.drafts) + 1)})
+
+    def complete_draft_service(self, draft_id, user):
+        return self._respond({'services': self.drafts[(int(draft_id) - 1) % len(self.drafts)]})
+
+    def delete_draft_service(self, draft_id, user):
+        return self._respond({})
+
+    def find_services(self, supplier_id=None, page=None, **kwargs):
+        return self._respond({'services': self.services, 'links': {}})
+
+    def get_service(self, service_id):
+        return self._respond({'services': self.services[0]})
+
+    def get_brief(self, brief_id):
+        return self._respond({'briefs': fixtures.brief(brief_id)})
+
+    def is_supplier_eligible_for_brief(self, supplier_id, brief_id):
+        return self._respond(True)
+
+    def find_brief_responses(self, brief_id=None, supplier_id=None):
+        return self._respond({'briefResponses': []})
+
+    def create_brief_response(self, brief_id, supplier_id, data, user):
+        return self._respond({'briefResponses': dict(
+            data, id=1, briefId=brief_id, supplierId=supplier_id, essentialRequirements=[True] * 10
+        )})
+
+    def create_audit_event(self, **kwargs):
+        return self._respond({'auditEvents': kwargs})
+
+
+class StubS3(object):
+    """Replacement for `dmutils.s3.S3` backed by fixture data."""
+
+    latency = Latency()
+    communications_files = 20
+
+    def __init__(self, bucket_name, **kwargs):
+        self.bucket_name = bucket_name
+
+    def list(self, prefix='', delimiter='', load_timestamps=False):
+        self.latency.wait()
+        framework_slug = prefix.split('/')[0]
+        return [
+            dict(item) for item in fixtures.communications_files(framework_slug, self.communications_files)
+            if item['path'].startswith(prefix)
+        ]
+
+    def path_exists(self, path):
+        self.latency.wait()
+        return False
+
+    def get_signed_url(self, path):
+        self.latency.wait()
+        return 'https://{}.s3.amazonaws.com/{}?Signature=stub'.format(self.bucket_name, path)
+
+    def get_key(self, path):
+        self.latency.wait()
+        return None
+
+    def save(self, path, file, acl='public-read', **kwargs):
+        self.latency.wait()
+        return {'path': path}
+
+
+def install(data_api_client, stub_api, s3_latency=None, communications_files=20):
+    """Point `data_api_client` and `dmutils.s3.S3` at the stubs.
+
+    Needs to happen before `create_app` so the instrumentation wraps the
+    stubs rather than the real client. Returns a function that undoes it.
+    """
+    originals = {}
+    for name in dir(stub_api):
+        if not name.startswith('_') and callable(getattr(stub_api, name)):
+            originals[name] = vars(data_api_client).get(name)
+            setattr(data_api_client, name, getattr(stub_api, name))
+
+    original_s3 = s3.S3
+    s3.S3 = type('StubS3', (StubS3,), {
+        'latency': s3_latency or stub_api.latency,
+        'communications_files': communications_files,
+    })
+
+    def uninstall():
+        for name, original in originals.items():
+            if original is None:
+                delattr(data_api_client, name)
+            else:
+                setattr(data_api_client, name, original)
+        s3.S3 = original_s3
+
+    return uninstall
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmarks for the helpers that run many times per page.
+
+Not part of the normal test run; use `make benchmark_helpers`, which fails if
+any benchmark's mean is more than BENCHMARK_THRESHOLD percent slower than the
+baseline saved with `make benchmark_helpers_baseline`.
+"""
+import itertools
+
+import mock
+import pytest
+
+from app.main import content_loader
+from app.main.helpers.briefs import brief_response_section
+from app.main.helpers.content import QuestionReferences, get_brief_response_section, manifest_text
+from app.main.helpers.frameworks import get_first_question_index, get_statuses_for_lot, question_references
+from app.main.helpers.search import SearchIndex
+from app.main.helpers.services import DraftIndex, get_draft_index, parse_document_upload_time
+from app.main.helpers.text import is_email_address, over_word_limit
+from app.main.helpers.validation import get_validator
+from tests.app.helpers import FULL_G7_SUBMISSION
+
+from . import fixtures
+
+DRAFTS_COUNT = 10000
+
+
+@pytest.fixture(scope='module')
+def drafts():
+    return fixtures.draft_services(DRAFTS_COUNT)
+
+
+@pytest.yield_fixture
+def logged_in_supplier():
+    with mock.patch('app.main.helpers.services.current_user') as current_user:
+        current_user.supplier_id = fixtures.SUPPLIER_ID
+        yield current_user
+
+
+@pytest.fixture(scope='module')
+def search_index(drafts):
+    return SearchIndex(fixtures.services(2000), drafts)
+
+
+@pytest.fixture(scope='module')
+def g7_declaration():
+    return content_loader.get_manifest('g-cloud-7', 'declaration')
+
+
+@pytest.fixture(scope='module')
+def g8_declaration():
+    return content_loader.get_manifest('g-cloud-8', 'declaration')
+
+
+@pytest.fixture(scope='module')
+def g8_declaration_text(g8_declaration):
+    """Every piece of text the declaration pages pass through `question_references`."""
+    return [text for text in manifest_text(g8_declaration) if text]
+
+
+def test_get_statuses_for_lot(benchmark):
+    cases = list(itertools.product(
+        [True, False], [0, 1, 200], [0, 1, 200], [None, 'started', 'complete'],
+        ['open', 'pending', 'standstill'],
+    ))
+
+    def all_statuses():
+        return [
+            get_statuses_for_lot(limit, drafts, complete, declaration, framework, 'Lot', 'service', 'services')
+            for limit, drafts, complete, declaration, framework in cases
+        ]
+
+    benchmark(all_statuses)
+
+
+def test_draft_index_counts(benchmark, drafts):
+    lots = [lot['slug'] for lot in fixtures.G7_LOTS]
+
+    def count_all():
+        index = DraftIndex(drafts)
+        return [(index.count(index.DRAFT, lot), index.count(index.COMPLETE, lot)) for lot in lots]
+
+    benchmark(count_all)
+
+
+def test_get_draft_index(benchmark, drafts, logged_in_supplier):
+    apiclient = mock.Mock()
+    apiclient.find_draft_services.return_value = {'services': drafts}
+
+    benchmark(get_draft_index, apiclient, 'g-cloud-7')
+
+
+@pytest.mark.parametrize('query', ['service 1234', 'infra', 'specialist cloud draft 99'])
+def test_search_index_query(benchmark, search_index, query):
+    benchmark(search_index.search, query)
+
+
+def test_search_index_update(benchmark, search_index):
+    benchmark(search_index.update, 'draft', 1, {'serviceName': 'Renamed draft service'})
+
+
+def test_question_references(benchmark):
+    text = u' '.join(u'See question [[question{}]] for details.'.format(index) for index in range(200))
+    questions = {'question{}'.format(index): {'number': index + 1} for index in range(200)}
+
+    benchmark(question_references, text, questions.__getitem__)
+
+
+def test_question_references_for_g8_declaration(benchmark, g8_declaration, g8_declaration_text):
+    benchmark(lambda: [question_references(text, g8_declaration.get_question) for text in g8_declaration_text])
+
+
+def test_precomputed_question_references_for_g8_declaration(benchmark, g8_declaration, g8_declaration_text):
+    references = QuestionReferences(g8_declaration)
+
+    benchmark(lambda: [question_references(text, references) for text in g8_declaration_text])
+
+
+def test_build_question_references_for_g8_declaration(benchmark, g8_declaration):
+    benchmark(QuestionReferences, g8_declaration)
+
+
+def test_filter_brief_response_section(benchmark):
+    brief = fixtures.brief()
+
+    def section_for_brief():
+        content = content_loader.get_manifest(brief['frameworkSlug'], 'edit_brief_response').filter(
+            {'lot': brief['lotSlug']})
+        section = content.get_section(content.get_next_editable_section_id())
+        section.inject_brief_questions_into_boolean_list_question(brief)
+        return section
+
+    benchmark(section_for_brief)
+
+
+def test_precomputed_brief_response_section(benchmark):
+    brief = fixtures.brief()
+    section = get_brief_response_section(content_loader, brief['frameworkSlug'], brief['lotSlug'])
+
+    benchmark(brief_response_section, section, brief)
+
+
+# Inputs near the 5000 character limit that are slow for backtracking regular expressions
+ADVERSARIAL_TEXT = [
+    u'a ' * 2500,
+    u'a' * 5000,
+    u' ' * 5000,
+    u'a\t' * 2499 + u'!',
+    (u'a' * 49 + u' ') * 100,
+]
+
+ADVERSARIAL_EMAIL_ADDRESSES = [
+    u'a' * 5000,
+    u'a' * 4990 + u'@example',
+    u'a@' + u'b.' * 2500,
+    u'a@' + u'.b' * 2500,
+    u'@' * 5000,
+]
+
+
+@pytest.mark.parametrize('text', ADVERSARIAL_TEXT, ids=['spaced', 'one-word', 'blank', 'tabbed', 'long-words'])
+def test_word_limit(benchmark, text):
+    benchmark(over_word_limit, text, 100)
+
+
+@pytest.mark.parametrize('value', ADVERSARIAL_EMAIL_ADDRESSES,
+                         ids=['no-at', 'no-dot', 'trailing-dot', 'empty-labels', 'all-at'])
+def test_is_email_address(benchmark, value):
+    benchmark(is_email_address, value)
+
+
+def test_parse_document_upload_time(benchmark):
+    filenames = [
+        update['path'] for update in fixtures.communications_files('g-cloud-7', 1000)
+    ]
+
+    benchmark(lambda: [parse_document_upload_time(filename) for filename in filenames])
+
+
+def test_get_first_question_index(benchmark, g7_declaration):
+    benchmark(lambda: [get_first_question_index(g7_declaration, section) for section in g7_declaration.sections])
+
+
+def test_declaration_validator(benchmark, g7_declaration):
+    framework = {'slug': 'g-cloud-7'}
+
+    def validate():
+        return get_validator(framework, g7_declaration, FULL_G7_SUBMISSION).get_error_messages()
+
+    benchmark(validate)
+
+
+def test_declaration_validator_for_page(benchmark, g7_declaration):
+    framework = {'slug': 'g-cloud-7'}
+    answers = {key: value for key, value in FULL_G7_SUBMISSION.items() if key.startswith('SQ1')}
+
+    def validate_all_pages():
+        validator = get_validator(framework, g7_declaration, answers)
+        return [validator.get_error_messages_for_page(section) for section in g7_declaration.sections]
+
+    benchmark(validate_all_pages)
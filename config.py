@@ -74,6 +74,67 @@ class Config(object):
     DM_LOG_PATH = '/var/log/digitalmarketplace/application.log'
     DM_DOWNSTREAM_REQUEST_ID_HEADER = 'X-Amz-Cf-Id'
 
+    # Instrumentation
+    DM_REQUEST_METRICS_ENABLED = True
+    DM_SERVER_TIMING_ENABLED = False
+    DM_METRICS_ENDPOINT_ENABLED = False
+    DM_METRICS_AUTH_TOKEN = None
+
+    DM_PROFILER_ENABLED = False
+    DM_PROFILER_SAMPLE_RATE = 0
+    DM_PROFILER_SECRET = None
+    DM_PROFILER_SIGNATURE_MAX_AGE = 3600
+    DM_PROFILER_INTERVAL = 0.005
+    DM_PROFILER_MAX_OVERHEAD = 0.05
+    DM_PROFILER_MAX_CONCURRENT = 2
+    DM_PROFILER_OUTPUT_DIR = '/var/log/digitalmarketplace/profiles'
+
+    # Listings
+    DM_DRAFTS_PER_PAGE = 50
+    DM_TEMPLATE_STREAM_BUFFER = 5
+    DM_BULK_DRAFT_ACTION_LIMIT = 500
+    DM_BULK_DRAFT_ACTION_MAX_WORKERS = 8
+    DM_IMPORT_MAX_ROWS = 1000
+    DM_IMPORT_MAX_WORKERS = 4
+    DM_BULK_INVITE_LIMIT = 100
+    DM_BULK_INVITE_MAX_WORKERS = 8
+    DM_DUNS_CHECK_LIMIT = 500
+    DM_DUNS_CHECK_MAX_WORKERS = 8
+
+    # Throttling
+    DM_CLARIFICATION_QUESTIONS_RATE_LIMIT = 20
+    DM_CLARIFICATION_QUESTIONS_RATE_BURST = 5
+    DM_THROTTLING_STORE = 'cache'
+    DM_THROTTLING_STORE_PATH = None
+
+    # Caches
+    DM_SEARCH_INDEX_CACHE_SIZE = 500
+    DM_SEARCH_INDEX_CACHE_TTL = 600
+    DM_IMPORT_JOBS_CACHE_SIZE = 1000
+    DM_IMPORT_JOBS_CACHE_TTL = 24 * 3600
+    DM_TEMPLATE_FRAGMENTS_CACHE_SIZE = 2000
+    DM_TEMPLATE_FRAGMENTS_CACHE_TTL = 3600
+    DM_BRIEF_CONTEXT_CACHE_SIZE = 1000
+    DM_BRIEF_CONTEXT_CACHE_TTL = 60
+    DM_SUBMISSIONS_CACHE_SIZE = 10000
+    DM_SUBMISSIONS_CACHE_TTL = 10 * 60
+    DM_RATE_LIMITS_CACHE_SIZE = 10000
+    DM_RATE_LIMITS_CACHE_TTL = 3600
+    DM_SUPPLIER_USERS_CACHE_SIZE = 1000
+    DM_SUPPLIER_USERS_CACHE_TTL = 300
+    DM_INVITATION_TOKENS_CACHE_SIZE = 1000
+    DM_INVITATION_TOKENS_CACHE_TTL = 300
+    DM_INVALID_TOKENS_CACHE_SIZE = 10000
+    DM_INVALID_TOKENS_CACHE_TTL = 3600
+    DM_DUNS_NUMBERS_CACHE_SIZE = 10000
+    DM_DUNS_NUMBERS_CACHE_TTL = 60
+
+    # Supplier creation
+    DM_WIZARD_STORE = 'session'
+    DM_WIZARD_STORE_PATH = None
+    DM_WIZARD_TTL = PERMANENT_SESSION_LIFETIME
+    DM_SUPPORT_ROLES = ['admin']
+
     @staticmethod
     def init_app(app):
         repo_root = os.path.abspath(os.path.dirname(__file__))
@@ -102,6 +163,15 @@ class Test(Config):
     DM_COMMUNICATIONS_BUCKET = 'inoket-communications-preview-preview'
     DM_ASSETS_URL = 'http://asset-host'
 
+    DM_SERVER_TIMING_ENABLED = True
+    DM_METRICS_ENDPOINT_ENABLED = True
+
+    DM_WIZARD_STORE = 'sqlite'
+    DM_WIZARD_STORE_PATH = ':memory:'
+
+    DM_THROTTLING_STORE = 'sqlite'
+    DM_THROTTLING_STORE_PATH = ':memory:'
+
 
 class Development(Config):
     DEBUG = False
@@ -123,6 +193,16 @@ class Development(Config):
     SHARED_EMAIL_KEY = "very_secret"
     SECRET_KEY = 'verySecretKey'
 
+    DM_SERVER_TIMING_ENABLED = True
+
+    DM_WIZARD_STORE = 'sqlite'
+    DM_WIZARD_STORE_PATH = os.getenv('DM_WIZARD_STORE_PATH', 'wizard.sqlite3')
+
+    DM_THROTTLING_STORE = 'sqlite'
+    DM_THROTTLING_STORE_PATH = os.getenv(
+        'DM_THROTTLING_STORE_PATH', os.path.join(os.path.abspath(os.path.dirname(__file__)), 'throttling.sqlite3')
+    )
+
 
 class Live(Config):
     """Base config for deployed environments"""
@@ -131,6 +211,11 @@ class Live(Config):
 
     DM_FRAMEWORK_AGREEMENTS_EMAIL = 'enquiries@inoket.com'
 
+    # Must be set to an absolute path, so every worker on a host uses the
+    # same file whatever directory it was started from
+    DM_THROTTLING_STORE = 'sqlite'
+    DM_THROTTLING_STORE_PATH = os.getenv('DM_THROTTLING_STORE_PATH')
+
 
 class Preview(Live):
     pass
@@ -33,3 +33,17 @@ def auto_buyer_login():
     user = User.from_json(user_json)
     login_user(user)
     return "OK"
+
+
+@login_for_tests.route('/auto-admin-login')
+def auto_admin_login():
+    user_json = {"users": {
+        'id': 345,
+        'name': 'Admin',
+        'emailAddress': 'admin@email.com',
+        'role': 'admin'
+    }
+    }
+    user = User.from_json(user_json)
+    login_user(user)
+    return "OK"
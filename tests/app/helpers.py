@@ -5,6 +5,7 @@ from app import create_app
 from tests import login_for_tests
 from werkzeug.http import parse_cookie
 from app import data_api_client
+from app.main.helpers.wizard import get_wizard_store
 from datetime import datetime, timedelta
 from dmutils.formats import DATETIME_FORMAT
 from nose.tools import assert_in, assert_not_in
@@ -105,6 +106,14 @@ class BaseApplicationTest(object):
                 return parse_cookie(cookie)
         return None
 
+    def set_wizard_answers(self, **answers):
+        with self.client.session_transaction() as session:
+            get_wizard_store(self.app).save(session, answers)
+
+    def get_wizard_answers(self):
+        with self.client.session_transaction() as session:
+            return get_wizard_store(self.app).load(session)
+
     @staticmethod
     def supplier():
         return {
@@ -246,6 +255,17 @@ class BaseApplicationTest(object):
             response = self.client.get("/auto-buyer-login")
             assert response.status_code == 200
 
+    def login_as_admin(self):
+        self.get_user_patch = patch.object(
+            data_api_client,
+            'get_user',
+            return_value=self.user(345, "admin@email.com", None, None, 'Admin', role='admin')
+        )
+        self.get_user_patch.start()
+
+        response = self.client.get("/auto-admin-login")
+        assert response.status_code == 200
+
     def assert_in_strip_whitespace(self, needle, haystack):
         return assert_in(self.strip_all_whitespace(needle), self.strip_all_whitespace(haystack))
 
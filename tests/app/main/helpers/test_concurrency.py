@@ -0,0 +1,66 @@
+import threading
+
+from nose.tools import assert_equal, assert_is, assert_is_none, assert_true
+
+from app.main.helpers.concurrency import run_concurrently
+from app.metrics import RequestTimings, bind_timings, timer
+from ...helpers import BaseApplicationTest
+
+
+class TestRunConcurrently(BaseApplicationTest):
+
+    def test_results_are_in_input_order(self):
+        with self.app.app_context():
+            outcomes = run_concurrently(lambda item: item * 2, range(20), 4)
+
+        assert_equal(outcomes, [(item * 2, None) for item in range(20)])
+
+    def test_exceptions_are_returned_not_raised(self):
+        error = ValueError('bad item')
+
+        def func(item):
+            if item == 1:
+                raise error
+            return item
+
+        with self.app.app_context():
+            outcomes = run_concurrently(func, [0, 1, 2], 2)
+
+        assert_equal(outcomes[0], (0, None))
+        assert_is(outcomes[1][1], error)
+        assert_is_none(outcomes[1][0])
+        assert_equal(outcomes[2], (2, None))
+
+    def test_no_more_than_max_workers_at_once(self):
+        lock = threading.Lock()
+        running = [0]
+        most_running = [0]
+
+        def func(item):
+            with lock:
+                running[0] += 1
+                most_running[0] = max(most_running[0], running[0])
+            threading.Event().wait(0.01)
+            with lock:
+                running[0] -= 1
+
+        with self.app.app_context():
+            run_concurrently(func, range(12), 3)
+
+        assert_true(1 <= most_running[0] <= 3)
+
+    def test_no_items(self):
+        with self.app.app_context():
+            assert_equal(run_concurrently(lambda item: item, [], 4), [])
+
+    def test_worker_time_is_added_to_request_timings(self):
+        timings = RequestTimings()
+
+        def func(item):
+            with timer('api'):
+                return item
+
+        with self.app.app_context(), bind_timings(timings):
+            run_concurrently(func, range(5), 2)
+
+        assert_equal(timings.calls['api'], 5)
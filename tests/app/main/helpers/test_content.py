@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import mock
+from nose.tools import assert_equal
+
+from app.main.helpers.content import QuestionReferences, get_question_table
+from app.main.helpers.frameworks import get_first_question_index, question_references
+
+
+class FakeQuestion(dict):
+    pass
+
+
+def fake_manifest():
+    numbers = {'PR1': 1, 'PR2': 2, 'SQ1-1a': 3}
+    manifest = mock.Mock(sections=[
+        mock.Mock(description=u'Answer [[PR1]] first', questions=[
+            FakeQuestion(id='PR1', question=u'Do you agree?', hint=u'See [[PR2]]'),
+            FakeQuestion(id='PR2', question=u'As in [[PR1]], do you agree?', validations=[
+                {'name': 'answer_required', 'message': u'You need to answer [[PR2]]'},
+            ]),
+        ]),
+        mock.Mock(description=None, questions=[
+            FakeQuestion(id='SQ1', question=u'About you', questions=[
+                FakeQuestion(id='SQ1-1a', question=u'Your name (see [[PR1]] and [[PR2]])'),
+            ]),
+        ]),
+    ])
+    manifest.get_question.side_effect = lambda question_id: {'number': numbers[question_id]}
+    return manifest
+
+
+class TestQuestionReferences(object):
+
+    def setup(self):
+        self.manifest = fake_manifest()
+        self.references = QuestionReferences(self.manifest)
+
+    def test_every_placeholder_is_resolved_when_built(self):
+        assert_equal(len(self.references), 7)
+        self.manifest.get_question.reset_mock()
+
+        assert_equal(self.references.resolve(u'Answer [[PR1]] first'), u'Answer 1 first')
+        assert_equal(self.references.resolve(u'See [[PR2]]'), u'See 2')
+        assert_equal(self.references.resolve(u'You need to answer [[PR2]]'), u'You need to answer 2')
+        assert_equal(self.references.resolve(u'Your name (see [[PR1]] and [[PR2]])'), u'Your name (see 1 and 2)')
+        assert_equal(self.manifest.get_question.call_count, 0)
+
+    def test_other_text_is_resolved_once(self):
+        self.manifest.get_question.reset_mock()
+
+        assert_equal(self.references.resolve(u'Question [[SQ1-1a]]'), u'Question 3')
+        assert_equal(self.references.resolve(u'Question [[SQ1-1a]]'), u'Question 3')
+        assert_equal(self.manifest.get_question.call_count, 1)
+
+    def test_can_be_used_as_get_question(self):
+        assert_equal(self.references('PR2'), {'number': 2})
+
+    def test_question_references_filter_uses_resolved_text(self):
+        assert_equal(question_references(u'Answer [[PR1]] first', self.references), u'Answer 1 first')
+        assert_equal(question_references(u'', self.references), u'')
+        assert_equal(question_references(None, self.references), None)
+
+
+def numbered_manifest():
+    sections = []
+    number = 0
+    for section_id, question_ids in [('first', ['q1', 'q2']), ('second', []), ('third', ['q3', 'q4', 'q5'])]:
+        questions = []
+        for question_id in question_ids:
+            number += 1
+            questions.append(FakeQuestion(id=question_id, number=number, question=question_id.upper()))
+        sections.append(mock.Mock(id=section_id, questions=questions, **{
+            'get_question_ids.return_value': question_ids,
+        }))
+    manifest = mock.Mock(sections=sections)
+    manifest.get_question.return_value = None
+    return manifest
+
+
+class TestQuestionTable(object):
+
+    def setup(self):
+        self.manifest = numbered_manifest()
+        self.table = get_question_table(self.manifest)
+
+    def test_questions_and_numbers(self):
+        assert_equal(self.table.question_ids, ['q1', 'q2', 'q3', 'q4', 'q5'])
+        assert_equal(self.table.get_question('q4')['question'], 'Q4')
+        assert_equal(self.table.number('q3'), 3)
+        assert_equal(self.table.section_indexes['q3'], 2)
+        assert_equal(self.manifest.get_question.call_count, 0)
+
+    def test_unknown_questions_are_looked_up_in_the_manifest(self):
+        assert_equal(self.table.get_question('q9'), None)
+        self.manifest.get_question.assert_called_once_with('q9')
+
+    def test_first_question_index(self):
+        assert_equal(
+            [get_first_question_index(self.manifest, section) for section in self.manifest.sections],
+            [0, 2, 2]
+        )
+
+    def test_table_is_built_once_per_manifest(self):
+        assert get_question_table(self.manifest) is self.table
+        assert get_question_table(numbered_manifest()) is not self.table
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import zipfile
+
+import mock
+from nose.tools import assert_equal
+
+from app.main.helpers.exports import SubmissionExport, byte_range, content_length
+
+
+def summary_section(name, questions):
+    section = mock.Mock(questions=[
+        mock.Mock(id=question_id, label=label, value=value) for question_id, label, value in questions
+    ])
+    section.name = name
+    return section
+
+
+class TestSubmissionExport(object):
+
+    def setup(self):
+        self.content_loader = mock.Mock()
+        self.manifests = manifests = {
+            'edit_submission': mock.Mock(**{
+                'filter.return_value.summary.side_effect': lambda draft: [
+                    summary_section('Description', [
+                        ('serviceName', 'Service name', draft['serviceName']),
+                        ('serviceFeatures', 'Features', draft.get('serviceFeatures', [])),
+                    ]),
+                ],
+            }),
+            'declaration': mock.Mock(**{
+                'summary.return_value': [summary_section('About you', [('SQ1-1a', 'Trading name', u'Café Ltd')])],
+            }),
+        }
+        self.content_loader.get_manifest.side_effect = lambda framework, name: manifests[name]
+        self.export = SubmissionExport(self.content_loader, 'g-cloud-7', [
+            {'id': 2, 'lot': 'scs', 'status': 'submitted', 'serviceName': 'Backup',
+             'serviceFeatures': ['Fast', 'Cheap']},
+            {'id': 1, 'lot': 'iaas', 'status': 'not-submitted', 'serviceName': 'Hosting'},
+        ], {'SQ1-1a': u'Café Ltd', 'status': 'complete'})
+
+    def test_csv_has_a_row_per_answer(self):
+        rows = b''.join(self.export.chunks('csv')).decode('utf-8').splitlines()
+
+        assert_equal(rows, [
+            u'service_id,lot,status,section,question,answer',
+            u',,,About you,Trading name,Café Ltd',
+            u'1,iaas,not-submitted,Description,Service name,Hosting',
+            u'1,iaas,not-submitted,Description,Features,',
+            u'2,scs,submitted,Description,Service name,Backup',
+            u'2,scs,submitted,Description,Features,"Fast',
+            u'Cheap"',
+        ])
+
+    def test_json_is_one_document(self):
+        data = json.loads(b''.join(self.export.chunks('json')).decode('utf-8'))
+
+        assert_equal(data['framework'], 'g-cloud-7')
+        assert_equal(data['declaration']['answers']['SQ1-1a'], u'Café Ltd')
+        assert_equal([service['service']['id'] for service in data['services']], [1, 2])
+        assert_equal(data['services'][1]['summary'], [{'section': 'Description', 'questions': [
+            {'id': 'serviceName', 'question': 'Service name', 'answer': 'Backup'},
+            {'id': 'serviceFeatures', 'question': 'Features', 'answer': ['Fast', 'Cheap']},
+        ]}])
+
+    def test_zip_has_a_file_per_service(self):
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(self.export.chunks('zip'))))
+
+        assert_equal(archive.namelist(), ['declaration.json', 'services/iaas/1.json', 'services/scs/2.json'])
+        assert_equal(json.loads(archive.read('services/scs/2.json').decode('utf-8'))['service']['serviceName'],
+                     'Backup')
+
+    def test_exports_are_the_same_every_time(self):
+        for export_format in ['csv', 'json', 'zip']:
+            assert_equal(b''.join(self.export.chunks(export_format)), b''.join(self.export.chunks(export_format)))
+
+    def test_etag_changes_with_the_data_and_format(self):
+        etag = self.export.etag('csv')
+        assert_equal(self.export.etag('csv'), etag)
+        assert etag != self.export.etag('json')
+        self.export.drafts[0]['serviceName'] = 'Renamed'
+        assert etag != self.export.etag('csv')
+
+    def test_etag_changes_with_the_app_version(self):
+        etag = self.export.etag('csv')
+        self.export.version = 'a-new-release'
+        assert etag != self.export.etag('csv')
+
+    def test_drafts_are_summarised_as_they_are_sent(self):
+        chunks = self.export.chunks('json')
+        next(chunks)
+        assert_equal(self.manifests['edit_submission'].filter.call_count, 0)
+
+        next(chunks)
+        assert_equal(self.manifests['edit_submission'].filter.call_count, 1)
+
+
+class TestByteRange(object):
+
+    def test_byte_range_across_chunks(self):
+        chunks = [b'abc', b'defg', b'', b'hij']
+
+        assert_equal(b''.join(byte_range(iter(chunks), 2, 8)), b'cdefgh')
+        assert_equal(b''.join(byte_range(iter(chunks), 0, 10)), b'abcdefghij')
+        assert_equal(b''.join(byte_range(iter(chunks), 9, 10)), b'j')
+        assert_equal(content_length(iter(chunks)), 10)
+
+    def test_byte_range_stops_reading_after_the_end(self):
+        chunks = iter([b'abc', b'def', b'ghi'])
+
+        assert_equal(b''.join(byte_range(chunks, 1, 4)), b'bcd')
+        assert_equal(list(chunks), [b'ghi'])
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+from io import BytesIO
+
+import mock
+from nose.tools import assert_equal, assert_raises
+
+from app.main.helpers.imports import ImportFileError, ImportJob, RowValidator, read_csv, read_json, validate_rows
+
+
+class FakeQuestion(dict):
+
+    @property
+    def form_fields(self):
+        return [question['id'] for question in self.get('questions', [])] or [self['id']]
+
+
+class FakeSection(object):
+
+    def __init__(self, questions):
+        self.questions = [FakeQuestion(question) for question in questions]
+
+    def get_field_names(self):
+        return [question['id'] for question in self.questions]
+
+    def get_data(self, form):
+        data = {}
+        for question in self.questions:
+            if question['type'] in ('list', 'checkboxes'):
+                data[question['id']] = form.getlist(question['id'])
+            elif question['type'] == 'boolean':
+                data[question['id']] = {'true': True, 'false': False}.get(form.get(question['id']))
+            else:
+                data[question['id']] = form.get(question['id'])
+        return data
+
+
+class TestReadRows(object):
+
+    def test_read_csv(self):
+        stream = BytesIO(
+            u'﻿serviceName,serviceFeatures,freeOption\n'
+            u'Café hosting,"Fast\nCheap",yes\n'
+            u'Backup,,\n'.encode('utf-8')
+        )
+
+        assert_equal(list(read_csv(stream)), [
+            {'serviceName': u'Café hosting', 'serviceFeatures': u'Fast\nCheap', 'freeOption': u'yes'},
+            {'serviceName': u'Backup'},
+        ])
+
+    def test_read_json(self):
+        stream = BytesIO(b'[{"serviceName": "Backup", "serviceFeatures": ["Fast"], "priceMin": null}]')
+
+        assert_equal(list(read_json(stream)), [{'serviceName': 'Backup', 'serviceFeatures': ['Fast']}])
+
+    def test_read_json_must_be_a_list_of_objects(self):
+        for content in [b'{"serviceName": "Backup"}', b'[1, 2]', b'not json', b'[{"serviceName": "Backup"}', b'']:
+            with assert_raises(ImportFileError):
+                list(read_json(BytesIO(content)))
+
+    @mock.patch('app.main.helpers.imports.JSON_CHUNK_SIZE', 5)
+    def test_read_json_rows_split_across_chunks(self):
+        stream = BytesIO(
+            u'\ufeff [{"serviceName": "Café ]"}, {"serviceFeatures": ["Fast", "Cheap"]}]\n'.encode('utf-8')
+        )
+
+        assert_equal(list(read_json(stream)), [
+            {'serviceName': u'Café ]'},
+            {'serviceFeatures': ['Fast', 'Cheap']},
+        ])
+
+    @mock.patch('app.main.helpers.imports.JSON_CHUNK_SIZE', 100)
+    def test_read_json_only_reads_as_far_as_the_rows_used(self):
+        stream = BytesIO(b'[' + b', '.join([b'{"serviceName": "Backup"}'] * 1000) + b']')
+        rows = read_json(stream)
+
+        assert_equal([next(rows) for _ in range(3)], [{'serviceName': 'Backup'}] * 3)
+        assert_equal(stream.tell(), 100)
+
+
+class TestRowValidator(object):
+
+    def setup(self):
+        content = mock.Mock(sections=[
+            FakeSection([
+                {'id': 'serviceName', 'type': 'text', 'question': 'Service name',
+                 'validations': [{'name': 'answer_required', 'message': 'You need to give a name'}]},
+                {'id': 'serviceFeatures', 'type': 'list', 'question': 'Features'},
+            ]),
+            FakeSection([
+                {'id': 'freeOption', 'type': 'boolean', 'question': 'Free option'},
+                {'id': 'supportTypes', 'type': 'checkboxes', 'question': 'Support',
+                 'options': [{'label': 'Email'}, {'label': 'Phone', 'value': 'phone'}]},
+                {'id': 'serviceDefinitionDocumentURL', 'type': 'upload', 'question': 'Service definition'},
+            ]),
+        ])
+        self.validator = RowValidator(content, [1, 2])
+
+    def test_valid_row_is_converted_to_form_data(self):
+        draft_id, data, errors = self.validator.validate({
+            'serviceName': u'Backup', 'serviceFeatures': u'Fast\nCheap\n', 'freeOption': u'Yes',
+            'supportTypes': [u'Email', u'phone'],
+        })
+
+        assert_equal(draft_id, None)
+        assert_equal(errors, [])
+        assert_equal(data, {
+            'serviceName': u'Backup', 'serviceFeatures': [u'Fast', u'Cheap'], 'freeOption': True,
+            'supportTypes': [u'Email', u'phone'],
+        })
+
+    def test_row_with_id_updates_only_given_answers(self):
+        draft_id, data, errors = self.validator.validate({'id': 2, 'freeOption': False})
+
+        assert_equal((draft_id, data, errors), ('2', {'freeOption': False}, []))
+
+    def test_errors_for_each_bad_answer(self):
+        draft_id, data, errors = self.validator.validate({
+            'id': '3', 'freeOption': 'maybe', 'supportTypes': 'Email\nCarrier pigeon', 'colour': 'blue',
+            'serviceDefinitionDocumentURL': 'http://example.com/doc.pdf',
+        })
+
+        assert_equal(
+            [(error['input_name'], error['message']) for error in errors],
+            [
+                ('id', "You don't have a draft service with this ID in this lot."),
+                ('colour', "This isn't a question for this lot."),
+                ('freeOption', 'This answer must be yes or no.'),
+                ('serviceDefinitionDocumentURL',
+                 "Documents can't be imported. Upload them after the import has finished."),
+                ('supportTypes', "This answer isn't one of the options for this question."),
+            ]
+        )
+
+    def test_nested_questions_are_checked_with_their_own_type(self):
+        content = mock.Mock(sections=[FakeSection([
+            {'id': 'pricing', 'type': 'multiquestion', 'question': 'Pricing', 'questions': [
+                {'id': 'freeTrial', 'type': 'boolean', 'question': 'Free trial'},
+                {'id': 'priceUnit', 'type': 'radios', 'question': 'Price unit', 'options': [{'label': 'Unit'}]},
+            ]},
+        ])])
+
+        draft_id, data, errors = RowValidator(content, []).validate({'freeTrial': 'maybe', 'priceUnit': 'Hour'})
+
+        assert_equal(
+            [(error['input_name'], error['question'], error['message']) for error in errors],
+            [
+                ('freeTrial', 'Free trial', 'This answer must be yes or no.'),
+                ('priceUnit', 'Price unit', "This answer isn't one of the options for this question."),
+            ]
+        )
+
+    def test_new_services_need_a_name(self):
+        draft_id, data, errors = self.validator.validate({'freeOption': 'true'})
+
+        assert_equal(errors, [{
+            'input_name': 'serviceName', 'question': 'Service name', 'message': 'You need to give a name',
+        }])
+
+    def test_validate_rows_numbers_rows_from_one(self):
+        valid_rows, row_errors = validate_rows(
+            self.validator, [{'serviceName': 'One'}, {'colour': 'blue'}, {'serviceName': 'Three'}], 10
+        )
+
+        assert_equal(valid_rows, [(1, None, {'serviceName': 'One'}), (3, None, {'serviceName': 'Three'})])
+        assert_equal([row['row'] for row in row_errors], [2])
+
+    def test_validate_rows_stops_after_max_rows(self):
+        valid_rows, row_errors = validate_rows(self.validator, ({'serviceName': 'One'} for _ in range(100)), 3)
+
+        assert_equal(len(valid_rows), 3)
+        assert_equal(row_errors[0]['row'], 4)
+        assert_equal(row_errors[0]['errors'][0]['message'], "Files can't have more than 3 services.")
+
+    def test_validate_rows_keeps_row_errors_when_there_are_too_many_rows(self):
+        valid_rows, row_errors = validate_rows(
+            self.validator, [{'serviceName': 'One'}, {'colour': 'blue'}, {'serviceName': 'Three'}], 2
+        )
+
+        assert_equal(valid_rows, [(1, None, {'serviceName': 'One'})])
+        assert_equal([row['row'] for row in row_errors], [2, 3])
+        assert_equal(row_errors[1]['errors'][0]['message'], "Files can't have more than 2 services.")
+
+
+class TestImportJob(object):
+
+    def test_serialize_counts_progress(self):
+        job = ImportJob(1234, 'g-cloud-7', 'scs', [(1, None, {}), (2, None, {}), (3, '5', {})])
+        job.record(3, '5')
+        job.record(1, None, [{'message': 'bad'}])
+
+        serialized = job.serialize()
+
+        assert_equal(serialized['total'], 3)
+        assert_equal(serialized['processed'], 2)
+        assert_equal(serialized['succeeded'], 1)
+        assert_equal([result['row'] for result in serialized['results']], [1, 3])
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal
+
+from app.main.helpers.search import SearchIndex, SERVICE, DRAFT, tokenize
+
+
+def _ids(results):
+    return [(kind, document['id']) for kind, document in results]
+
+
+class TestSearchIndex(object):
+
+    def setup(self):
+        self.index = SearchIndex(
+            services=[
+                {'id': '101', 'serviceName': 'Cloud hosting', 'lot': 'iaas', 'frameworkSlug': 'g-cloud-6',
+                 'frameworkName': 'G-Cloud 6', 'status': 'published'},
+                {'id': '102', 'serviceName': 'Email archiving', 'lot': 'saas', 'frameworkSlug': 'g-cloud-6',
+                 'frameworkName': 'G-Cloud 6', 'serviceTypes': ['Archiving', 'Storage'], 'status': 'published'},
+            ],
+            drafts=[
+                {'id': 1, 'serviceName': 'Hosted email', 'lot': 'saas', 'frameworkSlug': 'g-cloud-7',
+                 'frameworkName': 'G-Cloud 7', 'status': 'not-submitted'},
+                {'id': 2, 'lot': 'digital-specialists', 'lotName': 'Digital specialists',
+                 'frameworkSlug': 'digital-outcomes-and-specialists', 'status': 'submitted'},
+            ],
+        )
+
+    def test_tokenize(self):
+        assert_equal(tokenize(u'Cloud-hosting (Tier 2) Café'), [u'cloud', u'hosting', u'tier', u'2', u'café'])
+
+    def test_every_term_must_match_a_word_prefix(self):
+        assert_equal(_ids(self.index.search('host')), [(SERVICE, '101'), (DRAFT, 1)])
+        assert_equal(_ids(self.index.search('ARCH em')), [(SERVICE, '102')])
+        assert_equal(_ids(self.index.search('hosting email')), [])
+
+    def test_searches_lists_lot_and_framework_names(self):
+        assert_equal(_ids(self.index.search('storage')), [(SERVICE, '102')])
+        assert_equal(_ids(self.index.search('g cloud 7')), [(DRAFT, 1)])
+        assert_equal(_ids(self.index.search('specialists')), [(DRAFT, 2)])
+
+    def test_empty_query_filters_everything(self):
+        assert_equal(_ids(self.index.search('', kind=DRAFT)), [(DRAFT, 2), (DRAFT, 1)])
+        assert_equal(_ids(self.index.search('', framework='g-cloud-6', lot='saas')), [(SERVICE, '102')])
+
+    def test_update_reindexes_document(self):
+        self.index.update(DRAFT, '1', {'serviceName': 'Managed backup'})
+
+        assert_equal(_ids(self.index.search('hosted')), [])
+        assert_equal(_ids(self.index.search('backup')), [(DRAFT, 1)])
+        assert_equal(self.index.search('backup')[0][1]['lot'], 'saas')
+
+    def test_update_ignores_documents_that_are_not_indexed(self):
+        self.index.update(DRAFT, 99, {'serviceName': 'Managed backup'})
+
+        assert_equal(_ids(self.index.search('backup')), [])
+
+    def test_add_and_remove(self):
+        self.index.add(DRAFT, {'id': 3, 'serviceName': 'Cloud hosting', 'lot': 'iaas'})
+        assert_equal(_ids(self.index.search('hosting')), [(DRAFT, 3), (SERVICE, '101')])
+
+        self.index.remove(DRAFT, 3)
+        self.index.remove(SERVICE, '101')
+        assert_equal(_ids(self.index.search('hosting')), [])
+        assert_equal(len(self.index), 3)
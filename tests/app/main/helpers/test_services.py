@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal
+
+from app.main.helpers.services import DraftIndex
+
+
+def _draft(draft_id, lot, status):
+    return {'id': draft_id, 'lot': lot, 'status': status}
+
+
+class TestDraftIndex(object):
+
+    def setup(self):
+        self.drafts = [
+            _draft(1, 'iaas', 'not-submitted'),
+            _draft(2, 'scs', 'submitted'),
+            _draft(3, 'iaas', 'submitted'),
+            _draft(4, 'iaas', 'not-submitted'),
+            _draft(5, 'saas', 'not-submitted'),
+        ]
+        self.index = DraftIndex(self.drafts)
+
+    def test_drafts_by_status(self):
+        assert_equal([draft['id'] for draft in self.index.drafts()], [1, 4, 5])
+        assert_equal([draft['id'] for draft in self.index.complete_drafts()], [2, 3])
+
+    def test_drafts_by_status_and_lot(self):
+        assert_equal([draft['id'] for draft in self.index.drafts('iaas')], [1, 4])
+        assert_equal([draft['id'] for draft in self.index.complete_drafts('iaas')], [3])
+        assert_equal(self.index.complete_drafts('saas'), [])
+
+    def test_counts(self):
+        assert_equal(self.index.count(DraftIndex.DRAFT), 3)
+        assert_equal(self.index.count(DraftIndex.COMPLETE, 'scs'), 1)
+        assert_equal(self.index.count(DraftIndex.COMPLETE, 'paas'), 0)
+
+    def test_no_drafts(self):
+        index = DraftIndex([])
+
+        assert_equal(index.drafts(), [])
+        assert_equal(index.complete_drafts('iaas'), [])
+        assert_equal(index.count(DraftIndex.DRAFT), 0)
@@ -0,0 +1,50 @@
+from flask import render_template_string
+from nose.tools import assert_equal, assert_in, assert_not_in, assert_true
+
+from app.cache import get_cache
+from app.main.helpers.templates import stream_template
+from app.metrics import current_timings
+from ...helpers import BaseApplicationTest
+
+
+class TestFragmentCacheExtension(BaseApplicationTest):
+
+    template = u"{% cache ['greeting', user_id], 60 %}Hello {{ name }}{% endcache %}"
+
+    def test_fragment_is_rendered_once_per_key(self):
+        with self.app.app_context():
+            assert_equal(render_template_string(self.template, user_id=1, name='Ann'), u'Hello Ann')
+            assert_equal(render_template_string(self.template, user_id=1, name='Bob'), u'Hello Ann')
+            assert_equal(render_template_string(self.template, user_id=2, name='Bob'), u'Hello Bob')
+
+    def test_fragment_is_rendered_again_after_deploy(self):
+        with self.app.app_context():
+            render_template_string(self.template, user_id=1, name='Ann')
+            self.app.config['VERSION'] = 'a-new-release'
+
+            assert_equal(render_template_string(self.template, user_id=1, name='Bob'), u'Hello Bob')
+
+    def test_ttl_is_optional(self):
+        with self.app.app_context():
+            render_template_string(u"{% cache 'key' %}{{ x }}{% endcache %}", x=1)
+
+            assert_equal(render_template_string(u"{% cache 'key' %}{{ x }}{% endcache %}", x=2), u'1')
+
+    def test_no_key_means_no_caching(self):
+        with self.app.app_context():
+            for template in [u"{% cache none %}{{ x }}{% endcache %}", u"{% cache missing %}{{ x }}{% endcache %}"]:
+                render_template_string(template, x=1)
+                assert_equal(render_template_string(template, x=2), u'2')
+            assert_equal(len(get_cache('template_fragments')), 0)
+
+
+class TestStreamTemplate(BaseApplicationTest):
+
+    def test_rendering_is_timed_as_the_stream_is_read(self):
+        with self.app.test_request_context('/'):
+            self.app.preprocess_request()
+            response = stream_template('errors/404.html')
+
+            assert_not_in('render', current_timings().calls)
+            assert_true(response.get_data(as_text=True))
+            assert_in('render', current_timings().calls)
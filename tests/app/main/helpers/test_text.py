@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from app.main.helpers.text import count_words, is_email_address, over_character_limit, over_word_limit
+
+
+@pytest.mark.parametrize('text, words', [
+    ('', 0),
+    ('   ', 0),
+    ('one', 1),
+    ('one two  three', 3),
+    ('  one\ttwo\nthree  ', 3),
+    ('one two', 2),
+])
+def test_count_words(text, words):
+    assert count_words(text) == words
+
+
+def test_count_words_stops_after_limit():
+    assert count_words('a ' * 1000, stop_after=100) == 101
+
+
+def test_over_word_limit():
+    assert not over_word_limit('a ' * 100, 100)
+    assert over_word_limit('a ' * 101, 100)
+    assert not over_word_limit(None, 100)
+    assert not over_word_limit('a ' * 101, None)
+
+
+def test_over_character_limit():
+    assert not over_character_limit('a' * 5000, 5000)
+    assert over_character_limit('a' * 5001, 5000)
+    assert not over_character_limit(None, 5000)
+    assert not over_character_limit('a' * 5001, None)
+
+
+@pytest.mark.parametrize('value', [
+    'name@example.com',
+    'first.last+tag@sub.example.co.uk',
+    'name@example.c',
+])
+def test_valid_email_addresses(value):
+    assert is_email_address(value)
+
+
+@pytest.mark.parametrize('value', [
+    None,
+    '',
+    '@invalid.com',
+    'some.user.missed.their.at.com',
+    'name@localhost',
+    'name@example..com',
+    'name@.example.com',
+    'name@example.com.',
+    'name@@example.com',
+    'na me@example.com',
+    'name@exa^mple.com',
+    'name@example.com\n',
+    123,
+])
+def test_invalid_email_addresses(value):
+    assert not is_email_address(value)
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+
+import mock
+from nose.tools import assert_equal, assert_false, assert_true, assert_raises
+from werkzeug.exceptions import TooManyRequests
+
+from app.main.helpers.throttling import (
+    SQLiteThrottlingStore, TokenBucket, check_rate_limit, init_app, single_submission, submission_key
+)
+from ...helpers import BaseApplicationTest
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(object):
+
+    def test_allows_a_burst_up_to_capacity(self):
+        bucket = TokenBucket(3, 1, clock=FakeClock())
+
+        assert_equal([bucket.take() for _ in range(4)], [True, True, True, False])
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1, 0.5, clock=clock)
+        bucket.take()
+
+        clock.now = 1
+        assert_false(bucket.take())
+        clock.now = 3
+        assert_true(bucket.take())
+
+    def test_never_holds_more_than_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, 1, clock=clock)
+
+        clock.now = 100
+        assert_equal([bucket.take() for _ in range(3)], [True, True, False])
+
+
+def sqlite_store(clock, path=':memory:'):
+    return SQLiteThrottlingStore(mock.Mock(config={
+        'DM_THROTTLING_STORE_PATH': path,
+        'DM_SUBMISSIONS_CACHE_TTL': 60,
+        'DM_RATE_LIMITS_CACHE_TTL': 3600,
+    }), clock=clock)
+
+
+class TestSQLiteThrottlingStore(object):
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_claims_are_shared_by_stores_using_the_same_file(self):
+        path = os.path.join(self.directory, 'throttling.sqlite3')
+        clock = FakeClock()
+        first, second = sqlite_store(clock, path), sqlite_store(clock, path)
+
+        assert_true(first.claim('key'))
+        assert_false(second.claim('key'))
+        assert_true(second.claim('another key'))
+
+    def test_claims_expire(self):
+        clock = FakeClock()
+        store = sqlite_store(clock)
+        store.claim('key')
+
+        clock.now = 59
+        assert_false(store.claim('key'))
+        clock.now = 60
+        assert_true(store.claim('key'))
+
+    def test_released_claims_can_be_claimed_again(self):
+        store = sqlite_store(FakeClock())
+        store.claim('key')
+        store.release('key')
+
+        assert_true(store.claim('key'))
+
+    def test_tokens_are_shared_by_stores_using_the_same_file(self):
+        path = os.path.join(self.directory, 'throttling.sqlite3')
+        clock = FakeClock()
+        first, second = sqlite_store(clock, path), sqlite_store(clock, path)
+
+        assert_equal(
+            [first.take('key', 3, 1), second.take('key', 3, 1), first.take('key', 3, 1), second.take('key', 3, 1)],
+            [True, True, True, False]
+        )
+
+    def test_tokens_refill_over_time(self):
+        clock = FakeClock()
+        store = sqlite_store(clock)
+        store.take('key', 1, 0.5)
+
+        clock.now = 1
+        assert_false(store.take('key', 1, 0.5))
+        clock.now = 3
+        assert_true(store.take('key', 1, 0.5))
+
+
+def test_init_app_needs_an_absolute_sqlite_path():
+    for path in [None, 'throttling.sqlite3']:
+        with assert_raises(ValueError):
+            init_app(mock.Mock(config={'DM_THROTTLING_STORE': 'sqlite', 'DM_THROTTLING_STORE_PATH': path}))
+    for store, path in [('sqlite', '/var/run/throttling.sqlite3'), ('sqlite', ':memory:'), ('cache', None)]:
+        init_app(mock.Mock(config={'DM_THROTTLING_STORE': store, 'DM_THROTTLING_STORE_PATH': path}))
+
+
+def test_submission_key_depends_on_every_part():
+    assert_equal(submission_key(1, 'question'), submission_key(1, 'question'))
+    assert_true(submission_key(1, 'question') != submission_key(2, 'question'))
+    assert_true(submission_key(1, 'question') != submission_key(1, 'question?'))
+
+
+class TestSingleSubmission(BaseApplicationTest):
+
+    def test_repeats_are_not_first(self):
+        with self.app.app_context():
+            with single_submission(1, 'question') as first:
+                assert_true(first)
+            with single_submission(1, 'question') as first:
+                assert_false(first)
+            with single_submission(1, 'another question') as first:
+                assert_true(first)
+
+    def test_failed_submissions_can_be_retried(self):
+        with self.app.app_context():
+            with assert_raises(ValueError):
+                with single_submission(1, 'question'):
+                    raise ValueError()
+            with single_submission(1, 'question') as first:
+                assert_true(first)
+
+
+class TestCheckRateLimit(BaseApplicationTest):
+
+    def test_limits_each_supplier_separately(self):
+        self.app.config['DM_CLARIFICATION_QUESTIONS_RATE_BURST'] = 1
+        with self.app.app_context():
+            check_rate_limit('clarification_questions', 1)
+            check_rate_limit('clarification_questions', 2)
+            with assert_raises(TooManyRequests):
+                check_rate_limit('clarification_questions', 1)
+
+    def test_limits_can_be_kept_in_the_process(self):
+        self.app.config['DM_THROTTLING_STORE'] = 'cache'
+        self.app.config['DM_CLARIFICATION_QUESTIONS_RATE_BURST'] = 1
+        with self.app.app_context():
+            check_rate_limit('clarification_questions', 1)
+            with assert_raises(TooManyRequests):
+                check_rate_limit('clarification_questions', 1)
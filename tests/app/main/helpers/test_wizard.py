@@ -0,0 +1,81 @@
+import mock
+from nose.tools import assert_equal, assert_not_equal, assert_not_in, assert_true
+
+from app.main.helpers.wizard import SessionWizardStore, SQLiteWizardStore
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+
+def sqlite_store(clock):
+    return SQLiteWizardStore(
+        mock.Mock(config={'DM_WIZARD_STORE_PATH': ':memory:', 'DM_WIZARD_TTL': 60}), clock=clock
+    )
+
+
+class TestSQLiteWizardStore(object):
+
+    def test_keeps_only_an_id_in_the_session(self):
+        store = sqlite_store(FakeClock())
+        session = {}
+        store.save(session, {'company_name': 'My Company', 'duns_number': '012345678'})
+
+        assert_equal(list(session), ['wizard_id'])
+        assert_equal(store.load(session), {'company_name': 'My Company', 'duns_number': '012345678'})
+
+    def test_sessions_get_their_own_answers(self):
+        store = sqlite_store(FakeClock())
+        first, second = {}, {}
+        store.save(first, {'company_name': 'First'})
+        store.save(second, {'company_name': 'Second'})
+
+        assert_not_equal(first['wizard_id'], second['wizard_id'])
+        assert_equal(store.load(first), {'company_name': 'First'})
+        assert_equal(store.load(second), {'company_name': 'Second'})
+
+    def test_answers_expire_when_not_touched(self):
+        clock = FakeClock()
+        store = sqlite_store(clock)
+        session = {}
+        store.save(session, {'company_name': 'My Company'})
+
+        clock.now += 59
+        store.save(session, store.load(session))
+        clock.now += 59
+        assert_equal(store.load(session), {'company_name': 'My Company'})
+
+        clock.now += 1
+        assert_equal(store.load(session), {})
+
+    def test_clear_forgets_the_answers(self):
+        store = sqlite_store(FakeClock())
+        session = {}
+        store.save(session, {'company_name': 'My Company'})
+        wizard_id = session['wizard_id']
+
+        store.clear(session)
+
+        assert_not_in('wizard_id', session)
+        assert_equal(store.load({'wizard_id': wizard_id}), {})
+
+    def test_an_unknown_id_has_no_answers(self):
+        assert_equal(sqlite_store(FakeClock()).load({'wizard_id': 'not-a-real-id'}), {})
+
+
+class TestSessionWizardStore(object):
+
+    def test_keeps_the_answers_in_the_session(self):
+        store = SessionWizardStore(mock.Mock(config={}))
+        session = {}
+        store.save(session, {'company_name': 'My Company'})
+
+        assert_equal(session, {'wizard': {'company_name': 'My Company'}})
+        assert_equal(store.load(session), {'company_name': 'My Company'})
+
+        store.clear(session)
+        assert_true(not session)
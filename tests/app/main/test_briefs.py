@@ -1,10 +1,14 @@
 # coding: utf-8
 from __future__ import unicode_literals
 
+import threading
+
 import mock
 from cirrus.email import send_email
 from dmapiclient import api_stubs, HTTPError
 from dmapiclient.audit import AuditTypes
+from app.main import content_loader
+from app.main.helpers.content import get_brief_response_section
 from ..helpers import BaseApplicationTest, FakeMail
 from lxml import html
 
@@ -202,6 +206,42 @@ class TestSubmitClarificationQuestions(BaseApplicationTest):
         })
         assert res.status_code == 503
 
+    @mock.patch('app.main.helpers.briefs.send_email')
+    def test_submit_same_clarification_question_twice_only_sends_it_once(self, send_email, data_api_client):
+        self.login()
+        brief = api_stubs.brief(status="live")
+        brief['briefs']['frameworkName'] = 'Brief Framework Name'
+        brief['briefs']['clarificationQuestionsPublishedBy'] = '2016-03-29T10:11:13.000000Z'
+        data_api_client.get_brief.return_value = brief
+
+        for _ in range(2):
+            res = self.client.post('/suppliers/opportunities/1234/ask-a-question', data={
+                'clarification-question': "important question",
+            })
+            assert res.status_code == 200
+
+        assert send_email.call_count == 2
+        assert data_api_client.create_audit_event.call_count == 1
+
+    @mock.patch('app.main.helpers.briefs.send_email')
+    def test_submit_too_many_clarification_questions_is_a_429(self, send_email, data_api_client):
+        self.app.config['DM_CLARIFICATION_QUESTIONS_RATE_BURST'] = 1
+        self.login()
+        brief = api_stubs.brief(status="live")
+        brief['briefs']['frameworkName'] = 'Brief Framework Name'
+        brief['briefs']['clarificationQuestionsPublishedBy'] = '2016-03-29T10:11:13.000000Z'
+        data_api_client.get_brief.return_value = brief
+
+        statuses = [
+            self.client.post('/suppliers/opportunities/1234/ask-a-question', data={
+                'clarification-question': question,
+            }).status_code
+            for question in ["first question", "second question"]
+        ]
+
+        assert statuses == [200, 429]
+        assert data_api_client.create_audit_event.call_count == 1
+
     def test_submit_clarification_question_requires_existing_brief_id(self, data_api_client):
         self.login()
         data_api_client.get_brief.side_effect = HTTPError(mock.Mock(status_code=404))
@@ -412,6 +452,30 @@ class TestRespondToBrief(BaseApplicationTest):
         assert len(doc.xpath('//p[contains(text(), "Nice one")]')) == 1
         assert len(doc.xpath('//p[contains(text(), "Get sorted")]')) == 1
 
+    def test_get_brief_response_page_for_another_brief_shows_its_own_requirements(self, data_api_client):
+        other_brief = api_stubs.brief(status='live')
+        other_brief['briefs'].update({
+            'id': 5678,
+            'title': 'Another brief',
+            'essentialRequirements': ['Other essential'],
+            'niceToHaveRequirements': ['Other nice'],
+        })
+        data_api_client.get_brief.side_effect = lambda brief_id: self.brief if brief_id == 1234 else other_brief
+        data_api_client.get_framework.return_value = self.framework
+
+        self.client.get('/suppliers/opportunities/1234/responses/create')
+        res = self.client.get('/suppliers/opportunities/5678/responses/create')
+        doc = html.fromstring(res.get_data(as_text=True))
+
+        assert res.status_code == 200
+        assert len(doc.xpath('//h1[contains(text(), "Apply for ‘Another brief’")]')) == 1
+        assert len(doc.xpath('//p[contains(text(), "Other essential")]')) == 1
+        assert len(doc.xpath('//p[contains(text(), "Essential one")]')) == 0
+
+        shared_section = get_brief_response_section(
+            content_loader, 'digital-outcomes-and-specialists', 'digital-specialists')
+        assert not shared_section.name.startswith('Apply for ‘')
+
     def test_get_brief_response_page_redirects_to_login_for_buyer(self, data_api_client):
         data_api_client.get_brief.return_value = self.brief
         data_api_client.get_framework.return_value = self.framework
@@ -671,3 +735,165 @@ class TestResponseResultPage(BaseApplicationTest):
 
         assert res.status_code == 302
         assert res.location == 'http://localhost/suppliers/opportunities/1234/responses/create'
+
+
+@mock.patch("app.main.views.briefs.data_api_client")
+class TestBriefContextCache(BaseApplicationTest):
+
+    def setup(self):
+        super(TestBriefContextCache, self).setup()
+
+        self.brief = api_stubs.brief(status='live')
+        lots = [api_stubs.lot(slug="digital-specialists", allows_brief=True)]
+        self.framework = api_stubs.framework(status="live", slug="digital-outcomes-and-specialists",
+                                             clarification_questions_open=False, lots=lots)
+        with self.app.test_client():
+            self.login()
+
+    def test_brief_and_eligibility_are_fetched_once_across_pages(self, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+
+        for url in ['question-and-answer-session', 'ask-a-question', 'question-and-answer-session']:
+            res = self.client.get('/suppliers/opportunities/1234/{}'.format(url))
+            assert res.status_code == 200
+
+        data_api_client.get_brief.assert_called_once_with(1234)
+        data_api_client.is_supplier_eligible_for_brief.assert_called_once_with(1234, 1234)
+
+    def test_brief_status_is_checked_for_a_cached_brief(self, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        res = self.client.get('/suppliers/opportunities/1234/question-and-answer-session')
+        assert res.status_code == 200
+
+        self.brief['briefs']['status'] = 'closed'
+        res = self.client.get('/suppliers/opportunities/1234/question-and-answer-session')
+        assert res.status_code == 404
+        data_api_client.get_brief.assert_called_once_with(1234)
+
+    @mock.patch('app.main.helpers.briefs.send_email')
+    def test_asking_a_question_uses_the_current_brief(self, send_email, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        res = self.client.get('/suppliers/opportunities/1234/ask-a-question')
+        assert res.status_code == 200
+
+        closed_brief = api_stubs.brief(status='live')
+        closed_brief['briefs']['clarificationQuestionsAreClosed'] = True
+        data_api_client.get_brief.return_value = closed_brief
+        res = self.client.post('/suppliers/opportunities/1234/ask-a-question', data={
+            'clarification-question': "important question",
+        })
+
+        assert res.status_code == 404
+        assert data_api_client.get_brief.call_count == 2
+        assert send_email.called is False
+
+    def test_responding_uses_the_current_brief(self, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.get_framework.return_value = self.framework
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        data_api_client.find_brief_responses.return_value = {"briefResponses": []}
+        res = self.client.get('/suppliers/opportunities/1234/responses/create')
+        assert res.status_code == 200
+
+        data_api_client.get_brief.return_value = api_stubs.brief(status='closed')
+        res = self.client.post('/suppliers/opportunities/1234/responses/create', data=brief_form_submission)
+
+        assert res.status_code == 404
+        assert data_api_client.get_brief.call_count == 2
+        assert data_api_client.create_brief_response.called is False
+
+    def test_brief_responses_are_fetched_once(self, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        data_api_client.find_brief_responses.return_value = {
+            "briefResponses": [
+                {"essentialRequirements": [True, False, True]}
+            ]
+        }
+
+        res = self.client.get('/suppliers/opportunities/1234/responses/create')
+        assert res.status_code == 302
+        res = self.client.get('/suppliers/opportunities/1234/responses/result')
+        assert res.status_code == 200
+
+        data_api_client.find_brief_responses.assert_called_once_with(brief_id=1234, supplier_id=1234)
+
+    def test_creating_a_brief_response_forgets_the_cached_context(self, data_api_client):
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.get_framework.return_value = self.framework
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        data_api_client.find_brief_responses.return_value = {"briefResponses": []}
+        data_api_client.create_brief_response.return_value = {
+            'briefResponses': {"essentialRequirements": [True, False, True]}
+        }
+
+        res = self.client.post(
+            '/suppliers/opportunities/1234/responses/create',
+            data=brief_form_submission
+        )
+        assert res.status_code == 302
+
+        data_api_client.find_brief_responses.return_value = {
+            "briefResponses": [
+                {"essentialRequirements": [True, False, True]}
+            ]
+        }
+        res = self.client.get('/suppliers/opportunities/1234/responses/result')
+
+        assert res.status_code == 200
+        assert data_api_client.get_brief.call_count == 2
+        assert data_api_client.find_brief_responses.call_count == 2
+
+    def test_brief_response_page_fetches_eligibility_responses_and_framework_together(self, data_api_client):
+        started, all_started, overlapped = [], threading.Event(), []
+
+        def respond_with(value):
+            # Each call waits for the other two to start, which they only can if they run at the same time
+            def respond(*args, **kwargs):
+                started.append(threading.current_thread())
+                if len(started) == 3:
+                    all_started.set()
+                overlapped.append(all_started.wait(5))
+                return value
+            return respond
+
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.is_supplier_eligible_for_brief.side_effect = respond_with(True)
+        data_api_client.find_brief_responses.side_effect = respond_with({"briefResponses": []})
+        data_api_client.get_framework.side_effect = respond_with(self.framework)
+
+        res = self.client.get('/suppliers/opportunities/1234/responses/create')
+
+        assert res.status_code == 200
+        assert overlapped == [True, True, True]
+        assert threading.current_thread() not in started
+        data_api_client.get_framework.assert_called_once_with('digital-outcomes-and-specialists')
+
+    def test_ineligible_supplier_error_is_shown_before_framework_errors(self, data_api_client):
+        self.framework['frameworks']['status'] = 'expired'
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.get_brief.return_value['briefs']['frameworkName'] = 'Digital Outcomes and Specialists'
+        data_api_client.get_framework.return_value = self.framework
+        data_api_client.is_supplier_eligible_for_brief.return_value = False
+        data_api_client.get_supplier_framework_info.return_value = {
+            'frameworkInterest': {'onFramework': False}
+        }
+
+        res = self.client.get('/suppliers/opportunities/1234/responses/create')
+
+        assert res.status_code == 400
+        assert ERROR_MESSAGE_NOT_ON_FRAMEWORK_APPLICATION in res.get_data(as_text=True)
+
+    def test_framework_that_is_not_live_still_gives_a_404(self, data_api_client):
+        self.framework['frameworks']['status'] = 'expired'
+        data_api_client.get_brief.return_value = self.brief
+        data_api_client.get_framework.return_value = self.framework
+        data_api_client.is_supplier_eligible_for_brief.return_value = True
+        data_api_client.find_brief_responses.return_value = {"briefResponses": []}
+
+        res = self.client.get('/suppliers/opportunities/1234/responses/create')
+
+        assert res.status_code == 404
@@ -3,7 +3,8 @@ try:
     from StringIO import StringIO
 except ImportError:
     from io import BytesIO as StringIO
-from nose.tools import assert_equal, assert_true, assert_in, assert_not_in
+from nose.tools import assert_equal, assert_not_equal, assert_true, assert_false, assert_in, assert_not_in
+import json
 import mock
 from lxml import html
 from cirrus.email import send_email
@@ -1246,6 +1247,63 @@ class TestFrameworkUpdatesPage(BaseApplicationTest):
             assert response.status_code == 200
             assert_not_in(u'Ask a question about your G-Cloud 7 application', data)
 
+    def test_304_if_updates_have_not_changed(self, s3, data_api_client):
+        data_api_client.get_framework.return_value = self.framework('open')
+        s3.return_value.path_exists.return_value = False
+        s3.return_value.list.side_effect = lambda *args, **kwargs: [
+            _return_fake_s3_file_dict('g-cloud-7/communications/updates/communications/', 'file 1', 'odt'),
+        ]
+
+        with self.app.test_client():
+            self.login()
+
+            first = self.client.get('/suppliers/frameworks/g-cloud-7/updates')
+            with mock.patch('app.main.views.frameworks.render_template') as render_template:
+                second = self.client.get('/suppliers/frameworks/g-cloud-7/updates',
+                                         headers={'If-None-Match': first.headers['ETag']})
+
+            assert_equal(first.status_code, 200)
+            assert_equal(second.status_code, 304)
+            assert_equal(second.headers['ETag'], first.headers['ETag'])
+            assert_false(render_template.called)
+
+    def test_etag_changes_when_a_file_is_updated(self, s3, data_api_client):
+        data_api_client.get_framework.return_value = self.framework('open')
+        s3.return_value.path_exists.return_value = False
+        last_modified = ['2015-08-17T14:00:00.000Z']
+        s3.return_value.list.side_effect = lambda *args, **kwargs: [
+            _return_fake_s3_file_dict('g-cloud-7/communications/updates/communications/', 'file 1', 'odt',
+                                      last_modified=last_modified[0]),
+        ]
+
+        with self.app.test_client():
+            self.login()
+
+            first = self.client.get('/suppliers/frameworks/g-cloud-7/updates')
+            last_modified[0] = '2015-08-18T09:00:00.000Z'
+            second = self.client.get('/suppliers/frameworks/g-cloud-7/updates',
+                                     headers={'If-None-Match': first.headers['ETag']})
+
+            assert_equal(second.status_code, 200)
+            assert_not_equal(second.headers['ETag'], first.headers['ETag'])
+
+    def test_etag_changes_when_clarification_questions_close(self, s3, data_api_client):
+        data_api_client.get_framework.return_value = self.framework('open')
+        s3.return_value.path_exists.return_value = False
+        s3.return_value.list.return_value = []
+
+        with self.app.test_client():
+            self.login()
+
+            first = self.client.get('/suppliers/frameworks/g-cloud-7/updates')
+            data_api_client.get_framework.return_value = self.framework('open', clarification_questions_open=False)
+            second = self.client.get('/suppliers/frameworks/g-cloud-7/updates',
+                                     headers={'If-None-Match': first.headers['ETag']})
+
+            assert_equal(second.status_code, 200)
+            assert_not_equal(second.headers['ETag'], first.headers['ETag'])
+            assert_not_in(u'Ask a clarification question', second.get_data(as_text=True))
+
 
 class TestSendClarificationQuestionEmail(BaseApplicationTest):
 
@@ -1424,6 +1482,53 @@ class TestSendClarificationQuestionEmail(BaseApplicationTest):
 
         assert_equal(response.status_code, 503)
 
+    @mock.patch('dmutils.s3.S3')
+    @mock.patch('app.main.views.frameworks.data_api_client')
+    @mock.patch('app.main.views.frameworks.send_email')
+    def test_should_only_send_a_repeated_question_once(self, send_email, data_api_client, s3):
+        data_api_client.get_framework.return_value = self.framework('open', name='Test Framework')
+        clarification_question = 'This is a clarification question.'
+
+        first = self._send_email(clarification_question)
+        second = self._send_email(clarification_question)
+
+        self._assert_clarification_email(send_email)
+        assert_equal(data_api_client.create_audit_event.call_count, 1)
+        assert_equal(first.status_code, 200)
+        assert_equal(second.status_code, 200)
+        assert_in(
+            self.strip_all_whitespace('Your clarification question has been sent.'),
+            self.strip_all_whitespace(second.get_data(as_text=True))
+        )
+
+    @mock.patch('dmutils.s3.S3')
+    @mock.patch('app.main.views.frameworks.data_api_client')
+    @mock.patch('app.main.views.frameworks.send_email')
+    def test_should_send_a_question_again_if_it_failed(self, send_email, data_api_client, s3):
+        data_api_client.get_framework.return_value = self.framework('open', name='Test Framework')
+        clarification_question = 'This is a clarification question.'
+
+        send_email.side_effect = Exception("Arrrgh")
+        assert_equal(self._send_email(clarification_question).status_code, 503)
+
+        send_email.side_effect = None
+        send_email.reset_mock()
+        assert_equal(self._send_email(clarification_question).status_code, 200)
+        self._assert_clarification_email(send_email)
+
+    @mock.patch('dmutils.s3.S3')
+    @mock.patch('app.main.views.frameworks.data_api_client')
+    @mock.patch('app.main.views.frameworks.send_email')
+    def test_should_be_a_429_if_too_many_questions_are_sent(self, send_email, data_api_client, s3):
+        self.app.config['DM_CLARIFICATION_QUESTIONS_RATE_BURST'] = 2
+        data_api_client.get_framework.return_value = self.framework('open', name='Test Framework')
+
+        responses = [self._send_email('Question number {}'.format(number)) for number in range(3)]
+
+        assert_equal([response.status_code for response in responses], [200, 200, 429])
+        assert_equal(send_email.call_count, 4)
+        assert_equal(data_api_client.create_audit_event.call_count, 2)
+
 
 @mock.patch('app.main.views.frameworks.data_api_client', autospec=True)
 @mock.patch('app.main.views.frameworks.count_unanswered_questions')
@@ -1643,3 +1748,167 @@ class TestG7ServicesList(BaseApplicationTest):
 
         assert_in(u'Submitted', submissions.get_data(as_text=True))
         assert_not_in(u'Apply to provide', submissions.get_data(as_text=True))
+
+    def test_drafts_list_is_paginated(self, count_unanswered, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+        self.app.config['DM_DRAFTS_PER_PAGE'] = 2
+        count_unanswered.return_value = 0, 1
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'serviceName': 'draft {}'.format(index), 'lot': 'scs', 'status': 'not-submitted', 'id': index}
+                for index in range(5)
+            ]
+        }
+
+        first_page = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs')
+        last_page = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs?page=3')
+
+        assert_equal(first_page.status_code, 200)
+        assert_in(u'draft 4', first_page.get_data(as_text=True))
+        assert_in(u'draft 3', first_page.get_data(as_text=True))
+        assert_not_in(u'draft 2', first_page.get_data(as_text=True))
+        assert_in(u'/suppliers/frameworks/g-cloud-7/submissions/scs?page=2', first_page.get_data(as_text=True))
+
+        assert_equal(last_page.status_code, 200)
+        assert_in(u'draft 0', last_page.get_data(as_text=True))
+        assert_not_in(u'rel="next"', last_page.get_data(as_text=True))
+
+        # Only the drafts that were shown are summarised
+        assert_equal(count_unanswered.call_count, 3)
+
+    def test_empty_list_message_is_only_on_the_first_page(self, count_unanswered, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+        self.app.config['DM_DRAFTS_PER_PAGE'] = 2
+        count_unanswered.return_value = 0, 1
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'serviceName': 'draft {}'.format(index), 'lot': 'scs', 'status': 'not-submitted', 'id': index}
+                for index in range(3)
+            ]
+        }
+
+        first_page = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs').get_data(as_text=True)
+        second_page = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs?page=2').get_data(as_text=True)
+
+        assert_in(u'You haven’t marked any services as complete yet.', first_page)
+        assert_not_in(u'You haven’t marked any services as complete yet.', second_page)
+        assert_in(u'There are no more complete services.', second_page)
+
+    def test_404_for_drafts_page_past_the_end(self, count_unanswered, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'serviceName': 'draft', 'lot': 'scs', 'status': 'not-submitted'},
+            ]
+        }
+        count_unanswered.return_value = 0, 1
+
+        response = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs?page=2')
+        assert_equal(response.status_code, 404)
+
+
+@mock.patch('app.main.views.frameworks.data_api_client', autospec=True)
+class TestExportFrameworkSubmission(BaseApplicationTest):
+
+    def setup(self):
+        super(TestExportFrameworkSubmission, self).setup()
+        with self.app.test_client():
+            self.login()
+
+    def _set_up_api(self, data_api_client):
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'id': 1, 'serviceName': 'Cloud hosting', 'lot': 'scs', 'status': 'not-submitted'},
+                {'id': 2, 'serviceName': 'Backup', 'lot': 'scs', 'status': 'submitted'},
+            ]
+        }
+        data_api_client.get_supplier_declaration.return_value = {'declaration': FULL_G7_SUBMISSION}
+
+    def test_csv_export(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.csv')
+
+        assert_equal(res.status_code, 200)
+        assert_equal(res.headers['Content-Type'], 'text/csv; charset=utf-8')
+        assert_equal(res.headers['Content-Disposition'], 'attachment; filename="g-cloud-7-submission.csv"')
+        assert_equal(res.headers['Accept-Ranges'], 'bytes')
+        assert_in('ETag', res.headers)
+        assert_in(u'2,scs,submitted,', res.get_data(as_text=True))
+        data_api_client.find_draft_services.assert_called_once_with(1234, framework='g-cloud-7')
+
+    def test_json_export_without_a_declaration(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.get_supplier_declaration.side_effect = APIError(mock.Mock(status_code=404))
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.json')
+
+        assert_equal(res.status_code, 200)
+        data = json.loads(res.get_data(as_text=True))
+        assert_equal(data['declaration'], {'answers': {}, 'summary': []})
+        assert_equal([service['service']['id'] for service in data['services']], [1, 2])
+
+    def test_304_if_export_has_not_changed(self, data_api_client):
+        self._set_up_api(data_api_client)
+        etag = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip').headers['ETag']
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip', headers={'If-None-Match': etag})
+
+        assert_equal(res.status_code, 304)
+
+    def test_export_is_sent_again_after_a_deploy(self, data_api_client):
+        self._set_up_api(data_api_client)
+        etag = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip').headers['ETag']
+        self.app.config['VERSION'] = 'a-new-release'
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip', headers={'If-None-Match': etag})
+
+        assert_equal(res.status_code, 200)
+        assert_not_equal(res.headers['ETag'], etag)
+
+    def test_ranged_download_resumes_from_offset(self, data_api_client):
+        self._set_up_api(data_api_client)
+        full = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip')
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.zip', headers={
+            'Range': 'bytes=100-', 'If-Range': full.headers['ETag'],
+        })
+
+        assert_equal(res.status_code, 206)
+        assert_equal(res.get_data(), full.get_data()[100:])
+        assert_equal(res.headers['Content-Range'], 'bytes 100-{0}/{1}'.format(
+            len(full.get_data()) - 1, len(full.get_data())))
+
+    def test_whole_export_if_it_has_changed_since_the_range_was_asked_for(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.csv', headers={
+            'Range': 'bytes=100-', 'If-Range': '"an-old-etag"',
+        })
+
+        assert_equal(res.status_code, 200)
+        assert_true(res.get_data(as_text=True).startswith(u'service_id,lot,status'))
+
+    def test_416_for_a_range_past_the_end(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.csv', headers={'Range': 'bytes=1000000-'})
+
+        assert_equal(res.status_code, 416)
+
+    def test_404_for_unknown_format(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submission.xml')
+
+        assert_equal(res.status_code, 404)
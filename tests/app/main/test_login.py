@@ -4,7 +4,7 @@ from __future__ import unicode_literals
 from cirrus.email import send_email
 from dmapiclient import HTTPError
 from dmapiclient.audit import AuditTypes
-from dmutils.email import generate_token
+from dmutils.email import decode_invitation_token, generate_token
 from ..helpers import BaseApplicationTest
 import mock
 
@@ -190,6 +190,133 @@ class TestInviteUser(BaseApplicationTest):
                 data={'invitedEmail': 'email@example.com'})
 
 
+class TestBulkInviteUsers(BaseApplicationTest):
+
+    def _invite(self, email_addresses):
+        return self.client.post('/suppliers/invite-users', data={'email_addresses': email_addresses})
+
+    @mock.patch('app.main.views.login.data_api_client')
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_send_each_address_its_own_invitation(self, send_email, data_api_client):
+        with self.app.app_context():
+            self.login()
+
+            res = self._invite('one@example.com\ntwo@example.com, three@example.com')
+
+            assert res.status_code == 302
+            assert res.location == 'http://localhost/suppliers/users'
+            assert send_email.call_count == 3
+
+            tokens = {}
+            for call in send_email.call_args_list:
+                email_address, email_body = call[0][:2]
+                assert call[0][2:] == (
+                    self.app.config['INVITE_EMAIL_SUBJECT'],
+                    self.app.config['INVITE_EMAIL_FROM'],
+                    self.app.config['INVITE_EMAIL_NAME'],
+                    ["user-invite"],
+                )
+                assert 'INVITE-URL-PLACEHOLDER' not in email_body
+                tokens[email_address] = email_body.split('/suppliers/create-user/')[1].split()[0]
+
+            for email_address, token in tokens.items():
+                assert decode_invitation_token(token, role='supplier') == {
+                    "supplier_id": 1234,
+                    "supplier_name": "Supplier Name",
+                    "email_address": email_address,
+                }
+
+    @mock.patch('app.main.views.login.data_api_client')
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_create_an_audit_event_for_each_invitation(self, send_email, data_api_client):
+        with self.app.app_context():
+            self.login()
+
+            self._invite('one@example.com\ntwo@example.com\nONE@example.com')
+
+            assert data_api_client.create_audit_event.call_args_list == [
+                mock.call(
+                    audit_type=AuditTypes.invite_user,
+                    user='email@email.com',
+                    object_type='suppliers',
+                    object_id=1234,
+                    data={'invitedEmail': email_address},
+                )
+                for email_address in ['one@example.com', 'two@example.com']
+            ]
+
+    @mock.patch('app.main.views.login.data_api_client')
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_not_send_any_invitations_if_an_address_is_invalid(self, send_email, data_api_client):
+        with self.app.app_context():
+            self.login()
+
+            res = self._invite('one@example.com\ntotal rubbish')
+
+            assert res.status_code == 400
+            assert "These aren't valid email addresses: total, rubbish" in res.get_data(as_text=True)
+            assert not send_email.called
+            assert not data_api_client.create_audit_event.called
+
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_show_invalid_addresses_that_are_not_ascii(self, send_email):
+        with self.app.app_context():
+            self.login()
+
+            res = self._invite(u'one@example.com\nzo\u00eb')
+
+            assert res.status_code == 400
+            assert u"These aren't valid email addresses: zo\u00eb" in res.get_data(as_text=True)
+            assert not send_email.called
+
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_not_send_more_invitations_than_the_limit(self, send_email):
+        with self.app.app_context():
+            self.login()
+            self.app.config['DM_BULK_INVITE_LIMIT'] = 2
+
+            res = self._invite('one@example.com two@example.com three@example.com')
+
+            assert res.status_code == 400
+            assert "You can invite up to 2 contributors at a time" in res.get_data(as_text=True)
+            assert not send_email.called
+
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_be_an_error_for_no_addresses(self, send_email):
+        with self.app.app_context():
+            self.login()
+
+            res = self._invite('')
+
+            assert res.status_code == 400
+            assert "Email addresses must be provided" in res.get_data(as_text=True)
+
+    @mock.patch('app.main.views.login.data_api_client')
+    @mock.patch('app.main.helpers.invites.send_email')
+    def test_should_show_the_addresses_that_failed(self, send_email, data_api_client):
+        def send(email_address, *args):
+            if email_address == 'two@example.com':
+                raise Exception('API is down')
+        send_email.side_effect = send
+
+        with self.app.app_context():
+            self.login()
+
+            res = self._invite('one@example.com\ntwo@example.com')
+
+            assert res.status_code == 503
+            assert "These invitations couldn't be sent" in res.get_data(as_text=True)
+            assert "two@example.com" in res.get_data(as_text=True)
+            assert "one@example.com" not in res.get_data(as_text=True)
+            data_api_client.create_audit_event.assert_called_once_with(
+                audit_type=AuditTypes.invite_user,
+                user='email@email.com',
+                object_type='suppliers',
+                object_id=1234,
+                data={'invitedEmails': ['one@example.com']},
+            )
+
+
 class TestCreateUser(BaseApplicationTest):
     def _generate_token(self, supplier_id=1234, supplier_name='Supplier Name', email_address='test@email.com'):
         return generate_token(
@@ -578,3 +705,35 @@ class TestCreateUser(BaseApplicationTest):
                 }
             )
             assert res.status_code == 503
+
+    @mock.patch('app.main.helpers.tokens.decode_invitation_token', wraps=decode_invitation_token)
+    @mock.patch('app.main.views.login.data_api_client')
+    def test_should_only_check_an_invalid_token_once(self, data_api_client, decode_invitation_token):
+        for _ in range(3):
+            res = self.client.get('/suppliers/create-user/12345')
+            assert res.status_code == 400
+            assert USER_LINK_EXPIRED_ERROR in res.get_data(as_text=True)
+
+        res = self.client.post(
+            '/suppliers/create-user/12345',
+            data={'password': 'validpassword', 'name': 'valid name'}
+        )
+        assert res.status_code == 400
+
+        assert decode_invitation_token.call_count == 1
+        assert data_api_client.get_user.called is False
+        assert data_api_client.create_user.called is False
+
+    @mock.patch('app.main.helpers.tokens.decode_invitation_token', wraps=decode_invitation_token)
+    @mock.patch('app.main.views.login.data_api_client')
+    def test_should_only_check_a_valid_token_once(self, data_api_client, decode_invitation_token):
+        data_api_client.get_user.return_value = None
+
+        token = self._generate_token()
+        for _ in range(2):
+            res = self.client.get('/suppliers/create-user/{}'.format(token))
+            assert res.status_code == 200
+            assert "test@email.com" in res.get_data(as_text=True)
+
+        assert decode_invitation_token.call_count == 1
+        assert data_api_client.get_user.call_count == 2
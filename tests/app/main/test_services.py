@@ -6,12 +6,13 @@ except ImportError:
 
 from dmapiclient import HTTPError
 import copy
+import json
 import mock
 import pytest
 from lxml import html
 from freezegun import freeze_time
 
-from nose.tools import assert_equal, assert_true, assert_false, assert_in, assert_not_in
+from nose.tools import assert_equal, assert_not_equal, assert_true, assert_false, assert_in, assert_not_in
 from tests.app.helpers import BaseApplicationTest
 
 
@@ -38,12 +39,23 @@ class TestListServices(BaseApplicationTest):
             res = self.client.get('/suppliers/services')
             assert_equal(res.status_code, 200)
             data_api_client.find_services.assert_called_once_with(
-                supplier_id=1234)
+                supplier_id=1234, page=1)
             assert_in(
                 "You don&#39;t have any services on the Digital Marketplace",
                 res.get_data(as_text=True)
             )
 
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_streamed_page_has_no_server_timing_header(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {"services": []}
+
+            res = self.client.get('/suppliers/services')
+            assert_equal(res.status_code, 200)
+            assert_not_in('Server-Timing', res.headers)
+
     @mock.patch('app.main.views.services.data_api_client')
     def test_shows_services_list(self, data_api_client):
         with self.app.test_client():
@@ -64,11 +76,31 @@ class TestListServices(BaseApplicationTest):
             res = self.client.get('/suppliers/services')
             assert_equal(res.status_code, 200)
             data_api_client.find_services.assert_called_once_with(
-                supplier_id=1234)
+                supplier_id=1234, page=1)
             assert_true("Service name 123" in res.get_data(as_text=True))
             assert_true("Software as a Service" in res.get_data(as_text=True))
             assert_true("G-Cloud 1" in res.get_data(as_text=True))
 
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_shows_services_in_the_order_the_api_gives(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {
+                'services': [{
+                    'serviceName': "Service {}".format(framework_slug),
+                    'status': 'published',
+                    'id': framework_slug,
+                    'lot': 'saas',
+                    'lotName': 'Software as a Service',
+                    'frameworkName': framework_slug,
+                    'frameworkSlug': framework_slug
+                } for framework_slug in ('g-cloud-6', 'g-cloud-7')]
+            }
+
+            data = self.client.get('/suppliers/services').get_data(as_text=True)
+            assert_true(data.index("Service g-cloud-6") < data.index("Service g-cloud-7"))
+
     @mock.patch('app.data_api_client')
     def test_should_not_be_able_to_see_page_if_made_inactive(self, services_data_api_client):
         with self.app.test_client():
@@ -104,7 +136,7 @@ class TestListServices(BaseApplicationTest):
             res = self.client.get('/suppliers/services')
             assert_equal(res.status_code, 200)
             data_api_client.find_services.assert_called_once_with(
-                supplier_id=1234)
+                supplier_id=1234, page=1)
             assert_true(
                 "/suppliers/services/123" in res.get_data(as_text=True))
 
@@ -124,7 +156,7 @@ class TestListServices(BaseApplicationTest):
 
             res = self.client.get('/suppliers/services')
             assert_equal(res.status_code, 200)
-            data_api_client.find_services.assert_called_once_with(supplier_id=1234)
+            data_api_client.find_services.assert_called_once_with(supplier_id=1234, page=1)
 
             assert "Special Lot Name" in res.get_data(as_text=True)
 
@@ -145,11 +177,115 @@ class TestListServices(BaseApplicationTest):
 
             res = self.client.get('/suppliers/services')
             assert_equal(res.status_code, 200)
-            data_api_client.find_services.assert_called_once_with(supplier_id=1234)
+            data_api_client.find_services.assert_called_once_with(supplier_id=1234, page=1)
 
             assert "Service name 123" in res.get_data(as_text=True)
             assert "/suppliers/services/123" not in res.get_data(as_text=True)
 
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_shows_next_page_link_when_api_has_more_services(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {
+                'services': [{
+                    'serviceName': 'Service name 123',
+                    'status': 'published',
+                    'id': '123',
+                    'frameworkSlug': 'g-cloud-1'
+                }],
+                'links': {'next': 'http://localhost:5000/services?supplier_id=1234&page=3'}
+            }
+
+            res = self.client.get('/suppliers/services?page=2')
+            assert_equal(res.status_code, 200)
+            data_api_client.find_services.assert_called_once_with(supplier_id=1234, page=2)
+
+            document = html.fromstring(res.get_data(as_text=True))
+            assert_equal(document.xpath('//a[@rel="prev"]/@href'), ['/suppliers/services?page=1'])
+            assert_equal(document.xpath('//a[@rel="next"]/@href'), ['/suppliers/services?page=3'])
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_no_pagination_links_for_a_single_page(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {'services': [], 'links': {}}
+
+            res = self.client.get('/suppliers/services')
+            assert_equal(res.status_code, 200)
+            assert_not_in('rel="next"', res.get_data(as_text=True))
+            assert_not_in('rel="prev"', res.get_data(as_text=True))
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_404_for_page_past_the_end(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {'services': [], 'links': {}}
+
+            res = self.client.get('/suppliers/services?page=5')
+            assert_equal(res.status_code, 404)
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_404_for_invalid_page(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            for page in ['0', '-1', 'two']:
+                res = self.client.get('/suppliers/services?page={}'.format(page))
+                assert_equal(res.status_code, 404)
+            assert_false(data_api_client.find_services.called)
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_flash_message_is_only_shown_once(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {'services': []}
+            with self.client.session_transaction() as session:
+                session['_flashes'] = [('remove_service', {'updated_service_name': 'Service name 123'})]
+
+            res = self.client.get('/suppliers/services')
+            assert_in('Service name 123 has been removed.', res.get_data(as_text=True))
+
+            res = self.client.get('/suppliers/services')
+            assert_not_in('Service name 123 has been removed.', res.get_data(as_text=True))
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_304_if_services_have_not_changed(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {'services': [
+                {'serviceName': 'Service name 123', 'status': 'published', 'id': '123', 'lot': 'saas',
+                 'frameworkSlug': 'g-cloud-1', 'updatedAt': '2015-06-29T15:26:07.650368Z'},
+            ]}
+
+            first = self.client.get('/suppliers/services')
+            second = self.client.get('/suppliers/services', headers={'If-None-Match': first.headers['ETag']})
+            data_api_client.find_services.return_value['services'][0]['updatedAt'] = '2015-07-01T09:00:00.000000Z'
+            third = self.client.get('/suppliers/services', headers={'If-None-Match': first.headers['ETag']})
+
+            assert_equal(first.status_code, 200)
+            assert_equal(second.status_code, 304)
+            assert_equal(second.get_data(), b'')
+            assert_equal(third.status_code, 200)
+            assert_not_equal(third.headers['ETag'], first.headers['ETag'])
+
+    @mock.patch('app.main.views.services.data_api_client')
+    def test_pages_have_different_etags(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_services.return_value = {'services': [{'id': '123', 'frameworkSlug': 'g-cloud-1'}]}
+
+            first = self.client.get('/suppliers/services')
+            second = self.client.get('/suppliers/services?page=2', headers={'If-None-Match': first.headers['ETag']})
+
+            assert_equal(second.status_code, 200)
+            assert_not_equal(first.headers['ETag'], second.headers['ETag'])
+
 
 class TestListServicesLogin(BaseApplicationTest):
     @mock.patch('app.main.views.services.data_api_client')
@@ -179,6 +315,109 @@ class TestListServicesLogin(BaseApplicationTest):
                      'http://localhost/login?next=%2Fsuppliers%2Fservices')
 
 
+@mock.patch('app.main.views.services.data_api_client')
+class TestSearchServices(BaseApplicationTest):
+
+    def setup(self):
+        super(TestSearchServices, self).setup()
+
+        with self.app.test_client():
+            self.login()
+
+    def _set_up_api(self, data_api_client):
+        data_api_client.find_services.side_effect = [
+            {
+                'services': [{
+                    'serviceName': 'Cloud hosting', 'status': 'published', 'id': '123',
+                    'lot': 'iaas', 'frameworkSlug': 'g-cloud-6', 'frameworkName': 'G-Cloud 6',
+                }],
+                'links': {'next': 'http://localhost:5000/services?supplier_id=1234&page=2'},
+            },
+            {
+                'services': [{
+                    'serviceName': 'Email archiving', 'status': 'published', 'id': '456',
+                    'lot': 'saas', 'frameworkSlug': 'g-cloud-6', 'frameworkName': 'G-Cloud 6',
+                }],
+                'links': {},
+            },
+        ]
+        data_api_client.find_draft_services.return_value = {
+            'services': [{
+                'serviceName': 'Hosted email', 'status': 'not-submitted', 'id': 1,
+                'lot': 'scs', 'lotName': 'Specialist Cloud Services',
+                'frameworkSlug': 'g-cloud-7', 'frameworkName': 'G-Cloud 7', 'supplierId': 1234,
+            }]
+        }
+
+    def test_index_is_built_from_every_page_of_services_and_drafts(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.get('/suppliers/services/search?q=email')
+        assert_equal(res.status_code, 200)
+        assert_equal(
+            data_api_client.find_services.call_args_list,
+            [mock.call(supplier_id=1234, page=1), mock.call(supplier_id=1234, page=2)]
+        )
+        data_api_client.find_draft_services.assert_called_once_with(1234)
+
+        data = res.get_data(as_text=True)
+        assert_in('Email archiving', data)
+        assert_in('/suppliers/services/456', data)
+        assert_in('Hosted email', data)
+        assert_in('/suppliers/frameworks/g-cloud-7/submissions/scs/1', data)
+        assert_not_in('Cloud hosting', data)
+
+    def test_index_is_reused_between_requests(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        self.client.get('/suppliers/services/search?q=email')
+        res = self.client.get('/suppliers/services/search?q=hosting&type=service')
+
+        assert_equal(res.status_code, 200)
+        assert_equal(data_api_client.find_services.call_count, 2)
+        assert_equal(data_api_client.find_draft_services.call_count, 1)
+        assert_in('Cloud hosting', res.get_data(as_text=True))
+        assert_not_in('Hosted email', res.get_data(as_text=True))
+
+    def test_deleted_draft_is_removed_from_index(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.get_draft_service.return_value = {
+            'services': data_api_client.find_draft_services.return_value['services'][0]
+        }
+
+        self.client.get('/suppliers/services/search?q=email')
+        self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/1/delete',
+            data={'delete_confirmed': 'true'})
+        res = self.client.get('/suppliers/services/search?q=email')
+
+        assert_in('Email archiving', res.get_data(as_text=True))
+        assert_not_in('Hosted email', res.get_data(as_text=True))
+
+    @mock.patch('dmutils.s3.S3')
+    def test_updated_draft_is_reindexed(self, s3, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.get_draft_service.return_value = {
+            'services': data_api_client.find_draft_services.return_value['services'][0]
+        }
+
+        self.client.get('/suppliers/services/search?q=email')
+        self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/1/edit/service-description',
+            data={'serviceSummary': 'Managed backup'})
+        res = self.client.get('/suppliers/services/search?q=backup')
+
+        assert_equal(data_api_client.update_draft_service.call_count, 1)
+        assert_in('Hosted email', res.get_data(as_text=True))
+
+    def test_400_for_unknown_type(self, data_api_client):
+        res = self.client.get('/suppliers/services/search?type=everything')
+
+        assert_equal(res.status_code, 400)
+
+
 @mock.patch('app.main.views.services.data_api_client')
 class TestSupplierUpdateService(BaseApplicationTest):
     def _get_service(self,
@@ -369,6 +608,20 @@ class TestSupplierUpdateService(BaseApplicationTest):
         # Should all be 404 if service doesn't belong to supplier
         self._post_remove_service(service_should_be_modifiable=False, failing_status_code=404)
 
+    def test_304_if_service_has_not_changed(
+            self, data_api_client, fixture_framework_slug_and_name
+    ):
+        self.login()
+        self._get_service(data_api_client, fixture_framework_slug_and_name, service_status='published')
+
+        first = self.client.get('/suppliers/services/123')
+        second = self.client.get('/suppliers/services/123', headers={'If-None-Match': first.headers['ETag']})
+        data_api_client.get_service.return_value['services']['status'] = 'disabled'
+        third = self.client.get('/suppliers/services/123', headers={'If-None-Match': first.headers['ETag']})
+
+        assert_equal(second.status_code, 304)
+        assert_equal(third.status_code, 200)
+
     def test_should_redirect_to_login_if_not_logged_in(self, data_api_client):
         res = self.client.get("/suppliers/services/123")
         assert_equal(res.status_code, 302)
@@ -1326,6 +1579,33 @@ class TestShowDraftService(BaseApplicationTest):
         assert_in(u"If your application is successful, it will be available on the Digital Marketplace when G-Cloud 7 goes live.",  # noqa
                   message[0].xpath('p[@class="temporary-message-message"]/text()')[0])
 
+    @mock.patch('app.main.views.services.count_unanswered_questions')
+    def test_304_without_summarising_draft_if_it_has_not_changed(self, count_unanswered, data_api_client):
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.get_draft_service.return_value = self.draft_service
+        count_unanswered.return_value = 0, 1
+
+        first = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs/1')
+        second = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs/1',
+                                 headers={'If-None-Match': first.headers['ETag']})
+
+        assert_equal(second.status_code, 304)
+        assert_equal(count_unanswered.call_count, 1)
+
+    @mock.patch('app.main.views.services.count_unanswered_questions')
+    def test_etag_changes_when_draft_is_updated(self, count_unanswered, data_api_client):
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        draft_service = copy.deepcopy(self.draft_service)
+        data_api_client.get_draft_service.return_value = draft_service
+        count_unanswered.return_value = 0, 1
+
+        first = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs/1')
+        draft_service['services']['updatedAt'] = "2015-07-01T09:00:00.000000Z"
+        second = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs/1',
+                                 headers={'If-None-Match': first.headers['ETag']})
+
+        assert_equal(second.status_code, 200)
+
 
 @mock.patch('app.main.views.services.data_api_client')
 class TestDeleteDraftService(BaseApplicationTest):
@@ -1403,6 +1683,246 @@ class TestDeleteDraftService(BaseApplicationTest):
         assert_equal(res.status_code, 404)
 
 
+@mock.patch('app.main.views.services.data_api_client')
+class TestBulkDraftAction(BaseApplicationTest):
+
+    def setup(self):
+        super(TestBulkDraftAction, self).setup()
+        with self.app.test_client():
+            self.login()
+
+    def _set_up_api(self, data_api_client):
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'id': 1, 'serviceName': 'First draft', 'lot': 'scs', 'status': 'not-submitted'},
+                {'id': 2, 'serviceName': 'Second draft', 'lot': 'scs', 'status': 'not-submitted'},
+                {'id': 3, 'serviceName': 'Other lot draft', 'lot': 'iaas', 'status': 'not-submitted'},
+            ]
+        }
+
+    def _post(self, action, draft_ids, **data):
+        return self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/bulk',
+            data=dict(data, action=action, draft_id=draft_ids),
+            headers={'Accept': 'application/json'},
+        )
+
+    def test_completes_drafts_with_one_ownership_check(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self._post('complete', ['1', '2'])
+
+        assert_equal(res.status_code, 200)
+        data_api_client.find_draft_services.assert_called_once_with(1234, framework='g-cloud-7')
+        assert_false(data_api_client.get_draft_service.called)
+        assert_equal(
+            sorted(call[0] for call in data_api_client.complete_draft_service.call_args_list),
+            [('1', 'email@email.com'), ('2', 'email@email.com')]
+        )
+        assert_equal(
+            [(result['id'], result['success']) for result in json.loads(res.get_data(as_text=True))['results']],
+            [('1', True), ('2', True)]
+        )
+
+    def test_reports_each_draft_that_fails(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.copy_draft_service.side_effect = [
+            {'services': {'id': 4, 'serviceName': 'First draft', 'lot': 'scs'}},
+            HTTPError(mock.Mock(status_code=400), 'Could not copy draft'),
+        ]
+        self.app.config['DM_BULK_DRAFT_ACTION_MAX_WORKERS'] = 1
+
+        res = self._post('copy', ['1', '2', '3', '99'])
+
+        results = json.loads(res.get_data(as_text=True))['results']
+        assert_equal(
+            [(result['id'], result['success']) for result in results],
+            [('1', True), ('2', False), ('3', False), ('99', False)]
+        )
+        assert_equal(results[1]['error'], 'Could not copy draft')
+        assert_equal(results[2]['error'], 'Service not found')
+        assert_equal(data_api_client.copy_draft_service.call_count, 2)
+
+    def test_reports_unexpected_errors_with_the_other_drafts(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.delete_draft_service.side_effect = [None, ValueError('Unexpected')]
+        self.app.config['DM_BULK_DRAFT_ACTION_MAX_WORKERS'] = 1
+
+        with mock.patch.object(self.app.logger, 'exception') as log_exception:
+            res = self._post('delete', ['1', '2'], delete_confirmed='true')
+
+        assert_equal(res.status_code, 200)
+        results = json.loads(res.get_data(as_text=True))['results']
+        assert_equal(
+            [(result['id'], result['success'], result['error']) for result in results],
+            [('1', True, None), ('2', False, 'Something went wrong')]
+        )
+        assert_equal(log_exception.call_count, 1)
+
+    def test_flashes_summary_and_redirects_to_listing(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.complete_draft_service.side_effect = HTTPError(mock.Mock(status_code=400), 'Already complete')
+
+        res = self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/bulk',
+            data={'action': 'complete', 'draft_id': ['1', '2']},
+        )
+
+        assert_equal(res.status_code, 302)
+        assert_equal(res.location, 'http://localhost/suppliers/frameworks/g-cloud-7/submissions/scs')
+        with self.client.session_transaction() as session:
+            category, message = session['_flashes'][0]
+        assert_equal(category, 'bulk_action')
+        assert_equal(message['succeeded'], 0)
+        assert_equal(message['failed_count'], 2)
+        assert_equal(sorted(message['failed']), ['First draft', 'Second draft'])
+
+    def test_delete_asks_for_confirmation_first(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/bulk',
+            data={'action': 'delete', 'draft_id': ['1', '2']},
+        )
+
+        assert_equal(res.status_code, 302)
+        assert_equal(
+            res.location,
+            'http://localhost/suppliers/frameworks/g-cloud-7/submissions/scs?delete_draft_id=1&delete_draft_id=2'
+        )
+        assert_false(data_api_client.delete_draft_service.called)
+
+        res = self._post('delete', ['1', '2'], delete_confirmed='true')
+
+        assert_equal(res.status_code, 200)
+        assert_equal(data_api_client.delete_draft_service.call_count, 2)
+
+    def test_400_for_unknown_action(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self._post('publish', ['1'])
+
+        assert_equal(res.status_code, 400)
+
+    def test_400_for_too_many_drafts(self, data_api_client):
+        self._set_up_api(data_api_client)
+        self.app.config['DM_BULK_DRAFT_ACTION_LIMIT'] = 1
+
+        res = self._post('complete', ['1', '2'])
+
+        assert_equal(res.status_code, 400)
+        assert_false(data_api_client.complete_draft_service.called)
+
+    def test_404_if_framework_not_open(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.get_framework.return_value = self.framework(status='pending')
+
+        res = self._post('complete', ['1'])
+
+        assert_equal(res.status_code, 404)
+
+
+@mock.patch('app.main.views.services.data_api_client')
+class TestImportDraftServices(BaseApplicationTest):
+
+    def setup(self):
+        super(TestImportDraftServices, self).setup()
+        with self.app.test_client():
+            self.login()
+
+    def _set_up_api(self, data_api_client):
+        data_api_client.get_framework.return_value = self.framework(status='open')
+        data_api_client.find_draft_services.return_value = {
+            'services': [
+                {'id': 1, 'serviceName': 'First draft', 'lot': 'scs', 'status': 'not-submitted'},
+                {'id': 3, 'serviceName': 'Other lot draft', 'lot': 'iaas', 'status': 'not-submitted'},
+            ]
+        }
+
+    def _post(self, content, filename='services.csv'):
+        return self.client.post(
+            '/suppliers/frameworks/g-cloud-7/submissions/scs/import',
+            data={'import_file': (StringIO(content), filename)},
+            headers={'Accept': 'application/json'},
+        )
+
+    def test_starts_import_for_valid_file(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        with mock.patch('app.main.views.services.start_import_job') as start_import_job:
+            res = self._post(b'id,serviceName,serviceSummary\n,New service,Managed backup\n1,,Updated summary\n')
+
+        assert_equal(res.status_code, 202)
+        job = start_import_job.call_args[0][2]
+        assert_equal(
+            res.headers['Location'],
+            'http://localhost/suppliers/frameworks/g-cloud-7/submissions/scs/import/{}'.format(job.id)
+        )
+        assert_equal(job.rows, [
+            (1, None, {'serviceName': 'New service', 'serviceSummary': 'Managed backup'}),
+            (2, '1', {'serviceSummary': 'Updated summary'}),
+        ])
+
+    def test_import_runs_in_background_and_reports_progress(self, data_api_client):
+        self._set_up_api(data_api_client)
+        data_api_client.create_new_draft_service.return_value = {'services': {'id': 5}}
+        data_api_client.update_draft_service.side_effect = HTTPError(
+            mock.Mock(status_code=400), {'serviceSummary': 'under_50_words'})
+
+        from app.main.helpers.imports import start_import_job
+        with mock.patch('app.main.views.services.start_import_job',
+                        side_effect=lambda *args: start_import_job(*args).join()):
+            res = self._post(
+                b'[{"serviceName": "New service"}, {"id": 1, "serviceSummary": "Too long"}]', 'services.json'
+            )
+
+        data_api_client.create_new_draft_service.assert_called_once_with(
+            'g-cloud-7', 'scs', 1234, {'serviceName': 'New service'}, 'email@email.com',
+            page_questions=['serviceName'],
+        )
+        res = self.client.get(res.headers['Location'], headers={'Accept': 'application/json'})
+        progress = json.loads(res.get_data(as_text=True))
+        assert_equal(progress['status'], 'finished')
+        assert_equal(progress['succeeded'], 1)
+        assert_equal(progress['results'][0]['id'], 5)
+        assert_equal(progress['results'][1]['errors'][0]['input_name'], 'serviceSummary')
+
+    def test_400_with_errors_for_each_bad_row(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        with mock.patch('app.main.views.services.start_import_job') as start_import_job:
+            res = self._post(b'id,serviceName,colour\n,Fine,\n3,,\n,Other,blue\n')
+
+        assert_equal(res.status_code, 400)
+        assert_false(start_import_job.called)
+        rows = json.loads(res.get_data(as_text=True))['rows']
+        assert_equal(
+            [(row['row'], [error['input_name'] for error in row['errors']]) for row in rows],
+            [(2, ['id']), (3, ['colour'])]
+        )
+
+    def test_400_for_a_file_that_cant_be_read(self, data_api_client):
+        self._set_up_api(data_api_client)
+
+        res = self._post(b'serviceName', 'services.xls')
+
+        assert_equal(res.status_code, 400)
+        assert_equal(json.loads(res.get_data(as_text=True))['error'], "This file can't be read.")
+
+    def test_progress_is_404_for_another_suppliers_job(self, data_api_client):
+        self._set_up_api(data_api_client)
+        from app.main.helpers.imports import ImportJob
+        from app.cache import get_cache
+        job = ImportJob(5678, 'g-cloud-7', 'scs', [])
+        with self.app.app_context():
+            get_cache('import_jobs').set(job.id, job)
+
+        res = self.client.get('/suppliers/frameworks/g-cloud-7/submissions/scs/import/{}'.format(job.id))
+
+        assert_equal(res.status_code, 404)
+
+
 @mock.patch('dmutils.s3.S3')
 class TestSubmissionDocuments(BaseApplicationTest):
     def setup(self):
@@ -1,5 +1,7 @@
 # coding=utf-8
 
+import json
+
 from cirrus.email import send_email
 from dmapiclient import HTTPError
 import mock
@@ -1009,7 +1011,7 @@ class TestCreateSupplier(BaseApplicationTest):
     def test_should_be_an_error_if_duns_number_in_use(self, data_api_client):
         data_api_client.find_suppliers.return_value = {
             "suppliers": [
-                "one supplier", "two suppliers"
+                {"id": 1, "name": "One supplier"}, {"id": 2, "name": "Two suppliers"}
             ]
         }
         res = self.client.post(
@@ -1023,6 +1025,40 @@ class TestCreateSupplier(BaseApplicationTest):
         assert_in("A supplier account already exists with that DUNS number", page)
         assert_in("DUNS number already used", page)
 
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_only_look_up_a_duns_number_once(self, data_api_client):
+        data_api_client.find_suppliers.return_value = {"suppliers": []}
+        for _ in range(3):
+            res = self.client.post("/suppliers/duns-number", data={'duns_number': "123456789"})
+            assert_equal(res.status_code, 302)
+
+        data_api_client.find_suppliers.assert_called_once_with(duns_number="123456789")
+
+    @mock.patch("app.main.suppliers.send_email")
+    @mock.patch("app.main.suppliers.generate_token")
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_know_a_duns_number_is_used_once_its_supplier_is_created(
+            self, data_api_client, generate_token, send_email):
+        data_api_client.find_suppliers.return_value = {"suppliers": []}
+        data_api_client.create_supplier.return_value = self.supplier()
+        self.client.post("/suppliers/duns-number", data={'duns_number': "123456789"})
+
+        self.set_wizard_answers(
+            email_address="email_address",
+            phone_number="phone_number",
+            contact_name="contact_name",
+            duns_number="123456789",
+            company_name="company_name",
+            account_email_address="valid@email.com"
+        )
+        res = self.client.post("/suppliers/company-summary")
+        assert_equal(res.status_code, 302)
+
+        res = self.client.post("/suppliers/duns-number", data={'duns_number': "123456789"})
+        assert_equal(res.status_code, 400)
+        assert_in("DUNS number already used", res.get_data(as_text=True))
+        assert_equal(data_api_client.find_suppliers.call_count, 1)
+
     @mock.patch("app.main.suppliers.data_api_client")
     def test_should_allow_nine_digit_duns_number(self, data_api_client):
         data_api_client.find_suppliers.return_value = {"suppliers": []}
@@ -1057,8 +1093,7 @@ class TestCreateSupplier(BaseApplicationTest):
                     'duns_number': "  012345678  "
                 }
             )
-            assert_true("duns_number" in session)
-            assert_equal(session.get("duns_number"), "012345678")
+            assert_equal(self.get_wizard_answers().get("duns_number"), "012345678")
 
     def test_should_not_be_an_error_if_no_companies_house_number(self):
         res = self.client.post(
@@ -1107,10 +1142,10 @@ class TestCreateSupplier(BaseApplicationTest):
                     'companies_house_number': "  SC001122  "
                 }
             )
-            assert_true("companies_house_number" in session)
-            assert_equal(session.get("companies_house_number"), "SC001122")
+            assert_equal(self.get_wizard_answers().get("companies_house_number"), "SC001122")
 
     def test_should_wipe_companies_house_number_if_not_supplied(self):
+        self.set_wizard_answers(companies_house_number="SC001122")
         with self.client as c:
             res = c.post(
                 "/suppliers/companies-house-number",
@@ -1120,7 +1155,7 @@ class TestCreateSupplier(BaseApplicationTest):
             )
             assert_equal(res.status_code, 302)
             assert_equal(res.location, 'http://localhost/suppliers/company-name')
-            assert_false("companies_house_number" in session)
+            assert_false("companies_house_number" in self.get_wizard_answers())
 
     def test_should_allow_valid_company_name(self):
         res = self.client.post(
@@ -1140,8 +1175,7 @@ class TestCreateSupplier(BaseApplicationTest):
                     'company_name': "  My Company  "
                 }
             )
-            assert_true("company_name" in session)
-            assert_equal(session.get("company_name"), "My Company")
+            assert_equal(self.get_wizard_answers().get("company_name"), "My Company")
 
     def test_should_be_an_error_if_no_company_name(self):
         res = self.client.post(
@@ -1187,9 +1221,9 @@ class TestCreateSupplier(BaseApplicationTest):
                 data=contact_details
             )
 
+            answers = self.get_wizard_answers()
             for key, value in contact_details.items():
-                assert_true(key in session)
-                assert_equal(session.get(key), value.strip())
+                assert_equal(answers.get(key), value.strip())
 
     def test_should_not_allow_contact_details_without_name(self):
         res = self.client.post(
@@ -1273,8 +1307,7 @@ class TestCreateSupplier(BaseApplicationTest):
         assert_true("You must provide a contact name." in res.get_data(as_text=True))
 
     def test_should_populate_duns_from_session(self):
-        with self.client.session_transaction() as sess:
-            sess['duns_number'] = "999"
+        self.set_wizard_answers(duns_number="999")
         res = self.client.get("/suppliers/duns-number")
         assert_equal(res.status_code, 200)
         assert_equal(
@@ -1283,8 +1316,7 @@ class TestCreateSupplier(BaseApplicationTest):
             True)
 
     def test_should_populate_companies_house_from_session(self):
-        with self.client.session_transaction() as sess:
-            sess['companies_house_number'] = "999"
+        self.set_wizard_answers(companies_house_number="999")
         res = self.client.get("/suppliers/companies-house-number")
         assert_equal(res.status_code, 200)
         assert_true(
@@ -1293,8 +1325,7 @@ class TestCreateSupplier(BaseApplicationTest):
         )
 
     def test_should_populate_company_name_from_session(self):
-        with self.client.session_transaction() as sess:
-            sess['company_name'] = "Name"
+        self.set_wizard_answers(company_name="Name")
         res = self.client.get("/suppliers/company-name")
         assert_equal(res.status_code, 200)
         assert_true(
@@ -1302,10 +1333,11 @@ class TestCreateSupplier(BaseApplicationTest):
             in self.strip_all_whitespace(res.get_data(as_text=True)))
 
     def test_should_populate_contact_details_from_session(self):
-        with self.client.session_transaction() as sess:
-            sess['email_address'] = "email_address"
-            sess['contact_name'] = "contact_name"
-            sess['phone_number'] = "phone_number"
+        self.set_wizard_answers(
+            email_address="email_address",
+            contact_name="contact_name",
+            phone_number="phone_number"
+        )
         res = self.client.get("/suppliers/company-contact-details")
         assert_equal(res.status_code, 200)
         stripped_page = self.strip_all_whitespace(res.get_data(as_text=True))
@@ -1336,14 +1368,15 @@ class TestCreateSupplier(BaseApplicationTest):
     @mock.patch("app.main.suppliers.generate_token")
     def test_should_redirect_to_create_your_account_if_valid_session(self, generate_token, send_email, data_api_client):
         with self.client as c:
-            with c.session_transaction() as sess:
-                sess['email_address'] = "email_address"
-                sess['phone_number'] = "phone_number"
-                sess['contact_name'] = "contact_name"
-                sess['duns_number'] = "duns_number"
-                sess['company_name'] = "company_name"
-                sess['companies_house_number'] = "companies_house_number"
-                sess['account_email_address'] = "valid@email.com"
+            self.set_wizard_answers(
+                email_address="email_address",
+                phone_number="phone_number",
+                contact_name="contact_name",
+                duns_number="duns_number",
+                company_name="company_name",
+                companies_house_number="companies_house_number",
+                account_email_address="valid@email.com"
+            )
 
             data_api_client.create_supplier.return_value = self.supplier()
             res = c.post("/suppliers/company-summary")
@@ -1359,26 +1392,24 @@ class TestCreateSupplier(BaseApplicationTest):
                 "name": "company_name",
                 "companiesHouseNumber": "companies_house_number",
             })
-            assert_false('email_address' in session)
-            assert_false('phone_number' in session)
-            assert_false('contact_name' in session)
-            assert_false('duns_number' in session)
-            assert_false('company_name' in session)
-            assert_false('companies_house_number' in session)
-            assert_equal(session['email_supplier_id'], 12345)
-            assert_equal(session['email_company_name'], 'Supplier Name')
+            assert_equal(self.get_wizard_answers(), {
+                'email_supplier_id': 12345,
+                'email_company_name': 'Supplier Name',
+                'email_sent_to': 'valid@email.com',
+            })
 
     @mock.patch("app.main.suppliers.data_api_client")
     @mock.patch("app.main.suppliers.send_email")
     @mock.patch("app.main.suppliers.generate_token")
     def test_should_allow_missing_companies_house_number(self, generate_token, send_email, data_api_client):
-        with self.client.session_transaction() as sess:
-            sess['email_address'] = "email_address"
-            sess['phone_number'] = "phone_number"
-            sess['contact_name'] = "contact_name"
-            sess['duns_number'] = "duns_number"
-            sess['company_name'] = "company_name"
-            sess['account_email_address'] = "account_email_address"
+        self.set_wizard_answers(
+            email_address="email_address",
+            phone_number="phone_number",
+            contact_name="contact_name",
+            duns_number="duns_number",
+            company_name="company_name",
+            account_email_address="account_email_address"
+        )
 
         data_api_client.create_supplier.return_value = self.supplier()
         res = self.client.post(
@@ -1401,11 +1432,12 @@ class TestCreateSupplier(BaseApplicationTest):
 
     @mock.patch("app.main.suppliers.data_api_client")
     def test_should_be_an_error_if_missing_a_field_in_session(self, data_api_client):
-        with self.client.session_transaction() as sess:
-            sess['email_address'] = "email_address"
-            sess['phone_number'] = "phone_number"
-            sess['contact_name'] = "contact_name"
-            sess['duns_number'] = "duns_number"
+        self.set_wizard_answers(
+            email_address="email_address",
+            phone_number="phone_number",
+            contact_name="contact_name",
+            duns_number="duns_number"
+        )
 
         data_api_client.create_supplier.return_value = True
         res = self.client.post("/suppliers/company-summary")
@@ -1417,22 +1449,24 @@ class TestCreateSupplier(BaseApplicationTest):
 
     @mock.patch("app.main.suppliers.data_api_client")
     def test_should_return_503_if_api_error(self, data_api_client):
-        with self.client.session_transaction() as sess:
-            sess['email_address'] = "email_address"
-            sess['phone_number'] = "phone_number"
-            sess['contact_name'] = "contact_name"
-            sess['duns_number'] = "duns_number"
-            sess['company_name'] = "company_name"
-            sess['account_email_address'] = "account_email_address"
+        self.set_wizard_answers(
+            email_address="email_address",
+            phone_number="phone_number",
+            contact_name="contact_name",
+            duns_number="duns_number",
+            company_name="company_name",
+            account_email_address="account_email_address"
+        )
 
         data_api_client.create_supplier.side_effect = HTTPError("gone bad")
         res = self.client.post("/suppliers/company-summary")
         assert_equal(res.status_code, 503)
 
     def test_should_require_an_email_address(self):
-        with self.client.session_transaction() as sess:
-            sess['email_company_name'] = "company_name"
-            sess['email_supplier_id'] = 1234
+        self.set_wizard_answers(
+            email_company_name="company_name",
+            email_supplier_id=1234
+        )
         res = self.client.post(
             "/suppliers/create-your-account",
             data={}
@@ -1441,9 +1475,10 @@ class TestCreateSupplier(BaseApplicationTest):
         assert_true("You must provide a email address." in res.get_data(as_text=True))
 
     def test_should_not_allow_incorrect_email_address(self):
-        with self.client.session_transaction() as sess:
-            sess['email_company_name'] = "company_name"
-            sess['email_supplier_id'] = 1234
+        self.set_wizard_answers(
+            email_company_name="company_name",
+            email_supplier_id=1234
+        )
         res = self.client.post(
             "/suppliers/create-your-account",
             data={
@@ -1458,13 +1493,14 @@ class TestCreateSupplier(BaseApplicationTest):
     @mock.patch("app.main.suppliers.generate_token")
     def test_should_allow_correct_email_address(self, generate_token, send_email, data_api_client):
         with self.client as c:
-            with c.session_transaction() as sess:
-                sess['email_address'] = "email_address"
-                sess['phone_number'] = "phone_number"
-                sess['contact_name'] = "contact_name"
-                sess['duns_number'] = "duns_number"
-                sess['company_name'] = "company_name"
-                sess['account_email_address'] = "valid@email.com"
+            self.set_wizard_answers(
+                email_address="email_address",
+                phone_number="phone_number",
+                contact_name="contact_name",
+                duns_number="duns_number",
+                company_name="company_name",
+                account_email_address="valid@email.com"
+            )
 
             data_api_client.create_supplier.return_value = self.supplier()
 
@@ -1492,7 +1528,7 @@ class TestCreateSupplier(BaseApplicationTest):
 
             assert_equal(res.status_code, 302)
             assert_equal(res.location, 'http://localhost/suppliers/create-your-account-complete')
-            assert_equal(session['email_sent_to'], 'valid@email.com')
+            assert_equal(self.get_wizard_answers()['email_sent_to'], 'valid@email.com')
 
     @mock.patch("app.main.suppliers.send_email")
     @mock.patch("app.main.suppliers.generate_token")
@@ -1509,13 +1545,14 @@ class TestCreateSupplier(BaseApplicationTest):
     @mock.patch("app.main.suppliers.send_email")
     @mock.patch("app.main.suppliers.generate_token")
     def test_should_be_a_503_if_email_service_failure_on_creation_email(self, generate_token, send_email, data_api_client):
-        with self.client.session_transaction() as sess:
-            sess['email_address'] = "email_address"
-            sess['phone_number'] = "phone_number"
-            sess['contact_name'] = "contact_name"
-            sess['duns_number'] = "duns_number"
-            sess['company_name'] = "company_name"
-            sess['account_email_address'] = "valid@email.com"
+        self.set_wizard_answers(
+            email_address="email_address",
+            phone_number="phone_number",
+            contact_name="contact_name",
+            duns_number="duns_number",
+            company_name="company_name",
+            account_email_address="valid@email.com"
+        )
 
         send_email.side_effect = Exception("Failed")
         data_api_client.create_supplier.return_value = self.supplier()
@@ -1547,8 +1584,8 @@ class TestCreateSupplier(BaseApplicationTest):
 
     def test_should_show_email_address_on_create_account_complete(self):
         with self.client as c:
+            self.set_wizard_answers(email_sent_to="my@email.com")
             with c.session_transaction() as sess:
-                sess['email_sent_to'] = "my@email.com"
                 sess['other_stuff'] = True
 
             res = c.get("/suppliers/create-your-account-complete")
@@ -1559,8 +1596,7 @@ class TestCreateSupplier(BaseApplicationTest):
 
     def test_should_show_email_address_even_when_refreshed(self):
         with self.client as c:
-            with c.session_transaction() as sess:
-                sess['email_sent_to'] = 'my-email@example.com'
+            self.set_wizard_answers(email_sent_to='my-email@example.com')
 
             res = c.get('/suppliers/create-your-account-complete')
 
@@ -1571,3 +1607,128 @@ class TestCreateSupplier(BaseApplicationTest):
 
             assert_equal(res.status_code, 200)
             assert_true('An email has been sent to my-email@example.com' in res.get_data(as_text=True))
+
+    def test_should_keep_only_an_id_for_the_answers_in_the_session(self):
+        self.client.post("/suppliers/company-name", data={'company_name': "My Company"})
+        self.client.post("/suppliers/companies-house-number", data={'companies_house_number': "SC001122"})
+
+        with self.client.session_transaction() as sess:
+            assert_in('wizard_id', sess)
+            assert_not_in('company_name', sess)
+            assert_not_in('companies_house_number', sess)
+        assert_equal(
+            self.get_wizard_answers(),
+            {'company_name': "My Company", 'companies_house_number': "SC001122"}
+        )
+
+
+class TestCheckDunsNumbers(BaseApplicationTest):
+
+    def test_should_require_a_support_user(self):
+        self.login()
+        res = self.client.post("/suppliers/duns-numbers", data={'duns_numbers': "123456789"})
+        assert_equal(res.status_code, 403)
+
+    def test_should_redirect_to_login_if_not_logged_in(self):
+        res = self.client.get("/suppliers/duns-numbers")
+        assert_equal(res.status_code, 302)
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_show_which_duns_numbers_are_in_use(self, data_api_client):
+        data_api_client.find_suppliers.side_effect = lambda duns_number: {
+            "suppliers": [{"id": 1, "name": "One supplier"}] if duns_number == "111111111" else []
+        }
+        self.login_as_admin()
+
+        res = self.client.post(
+            "/suppliers/duns-numbers",
+            data={'duns_numbers': "111111111\n222222222, 111111111"}
+        )
+
+        assert_equal(res.status_code, 200)
+        page = res.get_data(as_text=True)
+        assert_in("One supplier", page)
+        assert_in("Not registered", page)
+        assert_equal(data_api_client.find_suppliers.call_count, 2)
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_return_json_results_in_order(self, data_api_client):
+        data_api_client.find_suppliers.side_effect = lambda duns_number: {
+            "suppliers": [{"id": 1, "name": "One supplier", "dunsNumber": duns_number}]
+            if duns_number == "111111111" else []
+        }
+        self.login_as_admin()
+
+        res = self.client.post(
+            "/suppliers/duns-numbers",
+            data={'duns_numbers': "222222222\n111111111"},
+            headers={'Accept': 'application/json'}
+        )
+
+        assert_equal(res.status_code, 200)
+        assert_equal(json.loads(res.get_data(as_text=True))['results'], [
+            {'dunsNumber': "222222222", 'inUse': False, 'suppliers': [], 'error': None},
+            {'dunsNumber': "111111111", 'inUse': True, 'suppliers': [{'id': 1, 'name': "One supplier"}], 'error': None},
+        ])
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_use_cached_lookups(self, data_api_client):
+        data_api_client.find_suppliers.return_value = {"suppliers": []}
+        self.client.post("/suppliers/duns-number", data={'duns_number': "123456789"})
+        self.login_as_admin()
+
+        res = self.client.post("/suppliers/duns-numbers", data={'duns_numbers': "123456789"})
+
+        assert_equal(res.status_code, 200)
+        assert_equal(data_api_client.find_suppliers.call_count, 1)
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_report_numbers_that_could_not_be_checked(self, data_api_client):
+        data_api_client.find_suppliers.side_effect = HTTPError(mock.Mock(status_code=503), "API down")
+        self.login_as_admin()
+
+        res = self.client.post(
+            "/suppliers/duns-numbers",
+            data={'duns_numbers': "123456789"},
+            headers={'Accept': 'application/json'}
+        )
+
+        assert_equal(res.status_code, 200)
+        assert_equal(json.loads(res.get_data(as_text=True))['results'][0]['error'], "API down")
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_be_an_error_for_invalid_duns_numbers(self, data_api_client):
+        self.login_as_admin()
+
+        res = self.client.post("/suppliers/duns-numbers", data={'duns_numbers': "123456789\n12345"})
+
+        assert_equal(res.status_code, 400)
+        assert_in("9 digit DUNS numbers: 12345", res.get_data(as_text=True))
+        assert_false(data_api_client.find_suppliers.called)
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_show_invalid_duns_numbers_that_are_not_ascii(self, data_api_client):
+        self.login_as_admin()
+
+        res = self.client.post("/suppliers/duns-numbers", data={'duns_numbers': u"123456789\n12345\u00e9"})
+
+        assert_equal(res.status_code, 400)
+        assert_in(u"9 digit DUNS numbers: 12345\u00e9", res.get_data(as_text=True))
+
+    @mock.patch("app.main.suppliers.data_api_client")
+    def test_should_be_an_error_for_too_many_duns_numbers(self, data_api_client):
+        self.app.config['DM_DUNS_CHECK_LIMIT'] = 2
+        self.login_as_admin()
+
+        res = self.client.post(
+            "/suppliers/duns-numbers",
+            data={'duns_numbers': "111111111\n222222222\n333333333"},
+            headers={'Accept': 'application/json'}
+        )
+
+        assert_equal(res.status_code, 400)
+        assert_equal(
+            json.loads(res.get_data(as_text=True)),
+            {'error': "You can check up to 2 DUNS numbers at a time"}
+        )
+        assert_false(data_api_client.find_suppliers.called)
@@ -120,6 +120,7 @@ class TestPostUsers(BaseApplicationTest):
             self.login()
 
             data_api_client.find_users.return_value = get_users()
+            data_api_client.get_user.return_value = None
 
             res = self.client.post('/suppliers/users/1231231231231/deactivate')
             assert_equal(res.status_code, 404)
@@ -188,3 +189,92 @@ class TestPostUsers(BaseApplicationTest):
                 self.strip_all_whitespace('Don Draper (don@scdp.com) has been removed as a contributor'),
                 self.strip_all_whitespace(res.get_data(as_text=True))
             )
+
+
+class TestSupplierUsersCache(BaseApplicationTest):
+
+    @mock.patch('app.main.views.users.data_api_client')
+    def test_users_are_fetched_once_for_several_pages(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_users.return_value = get_users()
+
+            for _ in range(3):
+                res = self.client.get('/suppliers/users')
+                assert_equal(res.status_code, 200)
+
+            data_api_client.find_users.assert_called_once_with(supplier_id=1234)
+
+    @mock.patch('app.main.views.users.data_api_client')
+    def test_deactivating_a_user_uses_the_cached_users_and_then_forgets_them(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_users.return_value = get_users()
+            self.client.get('/suppliers/users')
+
+            res = self.client.post('/suppliers/users/1/deactivate')
+            assert_equal(res.status_code, 302)
+            data_api_client.update_user.assert_called_once_with(user_id=1, active=False, updater='email@email.com')
+            assert_equal(data_api_client.find_users.call_count, 1)
+            assert_equal(data_api_client.get_user.call_count, 0)
+
+            users = get_users()
+            users['users'][1]['active'] = False
+            data_api_client.find_users.return_value = users
+            res = self.client.get('/suppliers/users')
+
+            assert_equal(data_api_client.find_users.call_count, 2)
+            assert_not_in('don@scdp.com', res.get_data(as_text=True))
+
+    @mock.patch('app.main.views.users.data_api_client')
+    def test_can_deactivate_a_user_added_since_the_users_were_cached(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_users.return_value = get_users()
+            self.client.get('/suppliers/users')
+
+            data_api_client.find_users.return_value = get_users([{
+                'id': 5,
+                'name': "Peggy Olson",
+                'emailAddress': "peggy@scdp.com",
+                'active': True,
+                'role': 'supplier',
+                'supplier': {'name': "Supplier Name", 'supplierId': 1234},
+            }])
+            res = self.client.post('/suppliers/users/5/deactivate')
+
+            assert_equal(res.status_code, 302)
+            data_api_client.update_user.assert_called_once_with(user_id=5, active=False, updater='email@email.com')
+
+    @mock.patch('app.main.views.users.data_api_client')
+    def test_can_deactivate_a_user_who_is_already_inactive(self, data_api_client):
+        with self.app.test_client():
+            self.login()
+
+            users = get_users()
+            users['users'][1]['active'] = False
+            data_api_client.find_users.return_value = users
+            data_api_client.get_user.return_value = {'users': users['users'][1]}
+            res = self.client.post('/suppliers/users/1/deactivate')
+
+            assert_equal(res.status_code, 302)
+            data_api_client.get_user.assert_called_once_with(user_id=1)
+            data_api_client.update_user.assert_called_once_with(user_id=1, active=False, updater='email@email.com')
+
+    @mock.patch('app.main.views.login.send_email')
+    @mock.patch('app.main.views.login.data_api_client')
+    @mock.patch('app.main.views.users.data_api_client')
+    def test_inviting_a_user_forgets_the_cached_users(self, data_api_client, login_data_api_client, send_email):
+        with self.app.test_client():
+            self.login()
+
+            data_api_client.find_users.return_value = get_users()
+            self.client.get('/suppliers/users')
+            res = self.client.post('/suppliers/invite-user', data={'email_address': 'peggy@scdp.com'})
+            assert_equal(res.status_code, 302)
+            self.client.get('/suppliers/users')
+
+            assert_equal(data_api_client.find_users.call_count, 2)
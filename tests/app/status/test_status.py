@@ -47,3 +47,35 @@ class TestStatus(BaseApplicationTest):
             "error", "{}".format(json_data['api_status']['status']))
         assert_in(
             "Error connecting to", "{}".format(json_data['message']))
+
+    def test_metrics_are_exposed_in_prometheus_format(self):
+        self.client.get('/suppliers/_status?ignore-dependencies')
+
+        metrics_response = self.client.get('/suppliers/_metrics')
+        assert_equal(200, metrics_response.status_code)
+        assert_in('text/plain', metrics_response.headers['Content-Type'])
+        assert_in(
+            'supplier_frontend_request_duration_seconds_count{endpoint="status.status"} 1',
+            metrics_response.get_data(as_text=True)
+        )
+
+    def test_metrics_404_when_disabled(self):
+        self.app.extensions.pop('metrics')
+
+        metrics_response = self.client.get('/suppliers/_metrics')
+        assert_equal(404, metrics_response.status_code)
+
+    def test_metrics_404_unless_the_endpoint_is_enabled(self):
+        self.app.config['DM_METRICS_ENDPOINT_ENABLED'] = False
+
+        metrics_response = self.client.get('/suppliers/_metrics')
+        assert_equal(404, metrics_response.status_code)
+
+    def test_metrics_need_the_auth_token_if_one_is_set(self):
+        self.app.config['DM_METRICS_AUTH_TOKEN'] = 'metrics-token'
+
+        assert_equal(403, self.client.get('/suppliers/_metrics').status_code)
+        assert_equal(403, self.client.get(
+            '/suppliers/_metrics', headers={'Authorization': 'Bearer wrong-token'}).status_code)
+        assert_equal(200, self.client.get(
+            '/suppliers/_metrics', headers={'Authorization': 'Bearer metrics-token'}).status_code)
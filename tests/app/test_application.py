@@ -20,6 +20,21 @@ class TestApplication(BaseApplicationTest):
             "no-cache"
         )
 
+    def test_server_timing_header(self):
+        response = self.client.get('/suppliers/create')
+
+        assert 200 == response.status_code
+        assert response.headers['Server-Timing'].startswith('render;dur=')
+        assert 'desc="1 call"' in response.headers['Server-Timing']
+        assert 'total;dur=' in response.headers['Server-Timing']
+
+    def test_server_timing_header_can_be_disabled(self):
+        self.app.config['DM_SERVER_TIMING_ENABLED'] = False
+        response = self.client.get('/suppliers/create')
+
+        assert 200 == response.status_code
+        assert 'Server-Timing' not in response.headers
+
     def test_url_with_non_canonical_trailing_slash(self):
         response = self.client.get('/suppliers/')
         assert 301 == response.status_code
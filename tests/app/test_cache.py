@@ -0,0 +1,77 @@
+from nose.tools import assert_equal, assert_is, assert_is_none
+
+from app.cache import LRUCache, get_cache
+from .helpers import BaseApplicationTest
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(object):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert_equal(cache.get('a'), 1)
+        assert_is_none(cache.get('b'))
+        assert_equal(cache.get('c'), 3)
+        assert_equal(len(cache), 2)
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(10, ttl=60, clock=clock)
+        cache.set('a', 1)
+
+        clock.now = 59
+        assert_equal(cache.get('a'), 1)
+        clock.now = 60
+        assert_equal(cache.get('a', 'missing'), 'missing')
+
+    def test_entry_ttl_overrides_cache_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(10, ttl=60, clock=clock)
+        cache.set('a', 1, ttl=10)
+        cache.set('b', 2)
+
+        clock.now = 10
+        assert_is_none(cache.get('a'))
+        assert_equal(cache.get('b'), 2)
+
+    def test_size_zero_disables_cache(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+
+        assert_is_none(cache.get('a'))
+
+    def test_delete_and_clear(self):
+        cache = LRUCache(10)
+        cache.set('a', 1)
+        cache.set('b', 2)
+
+        cache.delete('a')
+        assert_is_none(cache.get('a'))
+        cache.clear()
+        assert_equal(len(cache), 0)
+
+
+class TestGetCache(BaseApplicationTest):
+
+    def test_cache_is_configured_from_app_config_and_reused(self):
+        self.app.config['DM_SEARCH_INDEX_CACHE_SIZE'] = 3
+        self.app.config['DM_SEARCH_INDEX_CACHE_TTL'] = 30
+
+        with self.app.app_context():
+            cache = get_cache('search_index')
+            assert_equal(cache.max_size, 3)
+            assert_equal(cache.ttl, 30)
+            assert_is(get_cache('search_index'), cache)
@@ -0,0 +1,85 @@
+from nose.tools import assert_equal, assert_in, assert_is_none
+
+from app.metrics import Histogram, MetricsRegistry, RequestTimings, instrument, timed, timer, current_timings
+from .helpers import BaseApplicationTest
+
+
+class TestHistogram(object):
+
+    def test_observations_are_counted_in_inclusive_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        assert_equal(
+            list(histogram.cumulative_counts()),
+            [(0.1, 1), (1.0, 2), (float('inf'), 3)]
+        )
+        assert_equal(histogram.count, 3)
+        assert_equal(histogram.sum, 5.6)
+
+
+class TestMetricsRegistry(object):
+
+    def test_render_includes_request_and_component_histograms(self):
+        registry = MetricsRegistry(buckets=(1.0,))
+        timings = RequestTimings()
+        timings.record('api', 0.25)
+        timings.record('api', 0.25)
+        registry.observe_request('main.dashboard', timings, 0.75)
+
+        output = registry.render()
+
+        assert_in('# TYPE supplier_frontend_request_duration_seconds histogram', output)
+        assert_in('supplier_frontend_request_duration_seconds_bucket{endpoint="main.dashboard",le="1.0"} 1', output)
+        assert_in('supplier_frontend_request_duration_seconds_sum{endpoint="main.dashboard"} 0.75', output)
+        assert_in(
+            'supplier_frontend_upstream_duration_seconds_bucket{component="api",endpoint="main.dashboard",le="+Inf"} 1',
+            output
+        )
+        assert_in('supplier_frontend_upstream_calls_total{component="api",endpoint="main.dashboard"} 2', output)
+
+
+class TestTimers(BaseApplicationTest):
+
+    def test_timer_records_into_current_request(self):
+        with self.app.test_request_context('/'):
+            self.app.preprocess_request()
+            with timer('s3'):
+                pass
+
+            assert_equal(current_timings().calls, {'s3': 1})
+
+    def test_nested_timers_for_a_component_are_only_counted_once(self):
+        @timed('validate')
+        def inner():
+            return 'valid'
+
+        @timed('validate')
+        def outer():
+            return inner()
+
+        with self.app.test_request_context('/'):
+            self.app.preprocess_request()
+            assert_equal(outer(), 'valid')
+
+            assert_equal(current_timings().calls, {'validate': 1})
+
+    def test_timer_outside_of_a_request_is_ignored(self):
+        with timer('api'):
+            pass
+
+        assert_is_none(current_timings())
+
+    def test_instrument_does_not_wrap_methods_twice(self):
+        class Client(object):
+            def get_brief(self):
+                pass
+
+        client = Client()
+        instrument(client, 'api', ['get_brief'])
+        wrapped = client.get_brief
+        instrument(client, 'api', ['get_brief'])
+
+        assert client.get_brief is wrapped
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from nose.tools import assert_equal, assert_in, assert_true, assert_false
+
+from app import profiling
+from app.profiling import SamplingProfiler, sign_profile_request
+from .helpers import BaseApplicationTest
+
+
+def _sleeping_thread(duration):
+    thread = threading.Thread(target=time.sleep, args=(duration,))
+    thread.start()
+    return thread
+
+
+class TestSamplingProfiler(object):
+
+    def test_samples_are_collapsed_stacks_of_the_target_thread(self):
+        thread = _sleeping_thread(0.2)
+        profiler = SamplingProfiler(thread.ident, interval=0.01)
+        profiler.start()
+        thread.join()
+        profiler.stop()
+
+        assert_true(profiler.samples)
+        for stack, count in profiler.samples.items():
+            assert_in('run (threading.py:', stack)
+
+        line = profiler.collapsed().splitlines()[0]
+        stack, count = line.rsplit(' ', 1)
+        assert_true(int(count) > 0)
+
+    def test_interval_backs_off_when_overhead_is_too_high(self):
+        thread = _sleeping_thread(0.1)
+        profiler = SamplingProfiler(thread.ident, interval=0.001, max_overhead=0)
+        profiler.start()
+        thread.join()
+        profiler.stop()
+
+        assert_true(profiler.interval > 0.001)
+
+
+class TestProfiledRequests(BaseApplicationTest):
+
+    def setup(self):
+        self.output_dir = tempfile.mkdtemp()
+        super(TestProfiledRequests, self).setup()
+
+    def teardown(self):
+        super(TestProfiledRequests, self).teardown()
+        shutil.rmtree(self.output_dir)
+
+    def _profiled_app(self, sample_rate=0):
+        self.app.config.update({
+            'DM_PROFILER_ENABLED': True,
+            'DM_PROFILER_SAMPLE_RATE': sample_rate,
+            'DM_PROFILER_INTERVAL': 0.0001,
+            'DM_PROFILER_OUTPUT_DIR': self.output_dir,
+        })
+        profiling.init_app(self.app)
+        return self.app.test_client()
+
+    def test_request_with_signed_header_is_profiled(self):
+        client = self._profiled_app()
+        header = sign_profile_request(self.app.config['SECRET_KEY'], 'support')
+
+        response = client.get('/suppliers/create', headers={'X-Profile-Request': header})
+
+        assert_equal(200, response.status_code)
+        profiles = os.listdir(self.output_dir)
+        assert_equal(len(profiles), 1)
+        assert_true(profiles[0].endswith('-main-create_new_supplier.collapsed'))
+
+    def test_request_with_badly_signed_header_is_not_profiled(self):
+        client = self._profiled_app()
+        header = sign_profile_request('not the secret key', 'support')
+
+        client.get('/suppliers/create', headers={'X-Profile-Request': header})
+
+        assert_equal(os.listdir(self.output_dir), [])
+
+    def test_sampled_request_is_profiled(self):
+        client = self._profiled_app(sample_rate=1)
+
+        client.get('/suppliers/create')
+
+        assert_equal(len(os.listdir(self.output_dir)), 1)
+
+    def test_profiler_is_off_by_default(self):
+        assert_false(self.app.config['DM_PROFILER_ENABLED'])